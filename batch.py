@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from src.machines.batch import assemble_batch, find_programs
+from src.machines.models import MODELS
+
+
+def parse_arguments(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Assemble and check many SSEM programs in parallel")
+    parser.add_argument("sources", nargs="+", help="programs, directories searched for .asm and .snp files, or glob patterns")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="directory receiving the binary image (.img) of each program, in the layout of the sources")
+    parser.add_argument("--report", type=Path, default=None,
+                        help="JSON Lines file receiving the result of each program as it is assembled")
+    parser.add_argument("--model", choices=MODELS, default="ssem", help="model of machine the programs are written for (default: ssem)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="number of files sent to a worker at once")
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> int:
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+
+    files = find_programs(arguments.sources)
+    if not files:
+        print("Error: no program found", file=sys.stderr)
+        return 1
+    root = Path(os.path.commonpath([file.resolve().parent for file in files]))
+
+    report = open(arguments.report, "w") if arguments.report else None
+    failed = 0
+    try:
+        for result in assemble_batch(files, model=MODELS[arguments.model], workers=arguments.workers, chunk_size=arguments.chunk_size):
+            entry = result.to_dict()
+            if result.ok and arguments.output:
+                image = arguments.output / result.file.resolve().relative_to(root).with_suffix(".img")
+                image.parent.mkdir(parents=True, exist_ok=True)
+                image.write_bytes(result.image)
+                entry["image"] = str(image)
+            if report:
+                print(json.dumps(entry), file=report, flush=True)
+
+            if not result.ok:
+                failed += 1
+            for diagnostic in result.diagnostics:
+                print(f"{result.file}:{diagnostic}", file=sys.stderr)
+    finally:
+        if report:
+            report.close()
+
+    print(f"{len(files)} programs, {failed} with errors", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Benchmark of the asyncio driver
+
+Runs 100 then 1000 machines concurrently in one event loop, each one looping forever at
+its typical speed (700 instructions per second), and reports the aggregate speed reached
+compared to the target.
+
+Usage: ::
+
+    python -m benchmarks.bench_async [duration]
+"""
+
+import asyncio
+import sys
+
+from src.machines.asyncdriver import run
+from src.machines.fastssem import FastSsem
+
+
+DURATION = 3.0
+
+
+async def measure(count: int, duration: float, slice_duration: float) -> tuple:
+    """Aggregate speed of machines running concurrently, and the target"""
+    # An empty store is an endless loop of JMP 0
+    machines = [FastSsem() for _ in range(count)]
+    tasks = [asyncio.create_task(run(machine, slice_duration=slice_duration)) for machine in machines]
+
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    cycles = sum(machine.last_cycle for machine in machines)
+    return cycles / duration, sum(machine.speed for machine in machines)
+
+
+def main(duration: str = DURATION):
+    duration = float(duration)
+
+    for count in (100, 1000):
+        for slice_duration in (0.01, 0.05):
+            achieved, target = asyncio.run(measure(count, duration, slice_duration))
+            print(f"{count:>5} machines, {slice_duration * 1000:>3.0f} ms slices"
+                  f"{achieved:>12,.0f} / {target:,} ips ({100 * achieved / target:5.1f}%)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
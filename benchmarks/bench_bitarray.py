@@ -0,0 +1,79 @@
+"""Micro-benchmark of the word representation
+
+Compares the integer-backed BitArray to the former implementation based on a
+list of booleans on the conversions used by the machine at every cycle.
+
+Usage: ::
+
+    python -m benchmarks.bench_bitarray
+"""
+
+import sys
+from timeit import repeat
+
+from src.core.bitarray import BitArray
+
+
+class ListBitArray(list):
+    """Former implementation of BitArray, kept here as a point of comparison"""
+
+    def __init__(self, size: int):
+        super().__init__([False for _ in range(0, size)])
+
+    @classmethod
+    def from_int(cls, value: int, digits: int):
+        array = ListBitArray(digits)
+
+        if value >= 0:
+            bits = bin(value).split("0b")[1]
+            while len(bits) < digits:
+                bits = '0' + bits
+        else:
+            bits = bin(-value - pow(2, digits)).split("0b")[1]
+
+        bits = list(bits)
+        bits.reverse()
+        array.engrave(0, map(lambda b: b != '0', bits))
+        return array
+
+    def to_int(self) -> int:
+        bits = list(self)
+        bits.reverse()
+        value = int("0b" + ''.join(['1' if b else '0' for b in bits]), 2)
+        if value & (1 << (len(self) - 1)):
+            value -= 1 << len(self)
+        return value
+
+    def engrave(self, index: int, other):
+        for b in other:
+            self[index] = b
+            index += 1
+        return self
+
+
+def measure(statement, number: int) -> float:
+    """Best time of a statement, in nanoseconds per call"""
+    return min(repeat(statement, number=number, repeat=5)) / number * 1e9
+
+
+def main(number: int = 20000):
+    results = []
+
+    for cls in (ListBitArray, BitArray):
+        word = cls.from_int(-75637, 32)
+        opcode = cls.from_int(3, 3)
+        results.append((
+            cls.__name__,
+            measure(lambda: cls.from_int(-75637, 32), number),
+            measure(word.to_int, number),
+            measure(lambda: word.engrave(13, opcode), number),
+            sys.getsizeof(word),
+        ))
+
+    print(f"{'':<14}{'from_int':>12}{'to_int':>12}{'engrave':>12}{'bytes/word':>12}")
+    for name, from_int, to_int, engrave, size in results:
+        print(f"{name:<14}{from_int:>10.0f}ns{to_int:>10.0f}ns{engrave:>10.0f}ns{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark of the control channel
+
+Runs a machine in its own thread and measures the time taken by the run, stop and step
+commands to be applied, as well as the CPU time used by the machine thread while it is
+stopped.
+
+Usage: ::
+
+    python -m benchmarks.bench_control [repeat]
+"""
+
+import sys
+from statistics import median, quantiles
+from threading import Thread
+from time import perf_counter, process_time, sleep
+
+from src.machines.fastssem import FastSsem
+
+
+REPEAT = 200
+
+
+def latency(prepare, send, repeat: int) -> list:
+    """Times between sending a command and its application, in seconds"""
+    times = []
+    for _ in range(repeat):
+        prepare()
+        start = perf_counter()
+        send().wait()
+        times.append(perf_counter() - start)
+    return times
+
+
+def report(name: str, times: list):
+    p99 = quantiles(times, n=100)[-1]
+    print(f"{name:<10}median {median(times) * 1e6:>8.1f} µs    p99 {p99 * 1e6:>8.1f} µs")
+
+
+def main(repeat: str = REPEAT):
+    repeat = int(repeat)
+
+    # An empty store is an endless loop of JMP 0
+    machine = FastSsem()
+    thread = Thread(target=machine.start, kwargs={"stopped": True})
+    thread.start()
+
+    try:
+        control = machine.control
+
+        def stopped():
+            control.stop().wait()
+            sleep(0.002)
+
+        def running():
+            control.run().wait()
+            sleep(0.002)
+
+        report("run", latency(stopped, control.run, repeat))
+        report("stop", latency(running, control.stop, repeat))
+        report("step", latency(stopped, lambda: control.step(1), repeat))
+
+        control.stop().wait()
+        start = process_time()
+        sleep(1.0)
+        print(f"{'stopped':<10}{process_time() - start:.4f} s of CPU per second")
+
+    finally:
+        machine.control.quit()
+        thread.join()
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,78 @@
+"""Benchmark of the execution engines
+
+Runs a program (samples/ssem/fibonacci.asm by default) again and again, at most
+100000 cycles at a time, and reports the number of instructions executed per second
+by each engine. The cycles of the loops skipped by AcceleratedSsem count as executed.
+
+Usage: ::
+
+    python -m benchmarks.bench_engines [program]
+"""
+
+import sys
+from time import perf_counter
+
+from src.machines.acceleratedssem import AcceleratedSsem
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+
+
+PROGRAM = "samples/ssem/fibonacci.asm"
+
+MAX_CYCLES = 100000
+
+
+def step_by_step(machine):
+    """Run the loaded program one instruction_cycle call at a time"""
+    machine.stop_flag = False
+    for _ in range(MAX_CYCLES):
+        machine.instruction_cycle()
+        if machine.stop_flag:
+            break
+
+
+def in_one_call(machine):
+    """Run the loaded program with a single instruction_cycles call"""
+    machine.instruction_cycles(MAX_CYCLES)
+
+
+def measure(cls, method, program: str, duration: float = 1.0) -> float:
+    """Instructions per second of an engine"""
+    machine = cls(file=program)
+    program = [machine.store[address] for address in range(machine.store.word_count)]
+
+    cycles = 0
+    elapsed = 0.0
+    while elapsed < duration:
+        for address, word in enumerate(program):
+            machine.store[address] = word
+        machine.clear_state()
+
+        start = perf_counter()
+        before = machine.last_cycle
+        method(machine)
+        elapsed += perf_counter() - start
+        cycles += machine.last_cycle - before
+
+    return cycles / elapsed
+
+
+def main(program: str = PROGRAM):
+    reference = None
+
+    for cls, method in (
+        (Ssem, step_by_step),
+        (FastSsem, step_by_step),
+        (Ssem, in_one_call),
+        (FastSsem, in_one_call),
+        (CompiledSsem, in_one_call),
+        (AcceleratedSsem, in_one_call),
+    ):
+        ips = measure(cls, method, program)
+        reference = reference or ips
+        print(f"{cls.__name__:<17}{method.__name__:<14}{ips:>14,.0f} ips{ips / reference:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
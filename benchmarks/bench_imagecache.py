@@ -0,0 +1,54 @@
+"""Benchmark of loading programs through the image cache
+
+Reports the time taken to load each sample program into the store of the fast engine
+without cache, through a warm cache, and to read its source alone, for comparison.
+
+Usage: ::
+
+    python -m benchmarks.bench_imagecache
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+from src.core.intstore import IntStore
+from src.machines.assembler import Assembler
+from src.machines.imagecache import ImageCache
+from src.machines.ssemmodel import SsemModel
+
+
+PROGRAMS = ("samples/ssem/fibonacci.asm", "samples/ssem/factorct.asm", "samples/ssem/tests/JMP1Test.snp")
+
+REPEAT = 2000
+
+
+def microseconds(function) -> float:
+    """Average duration of a call, in microseconds"""
+    return timeit(function, number=REPEAT) / REPEAT * 1e6
+
+
+def main():
+    with TemporaryDirectory() as directory:
+        cache = ImageCache(directory)
+        uncached = Assembler(SsemModel, cache=None)
+        cached = Assembler(SsemModel, cache=cache)
+        store = IntStore(SsemModel.word_length, SsemModel.word_count)
+        print(f"{'':<16}{'read':>10}{'assemble':>10}{'cached':>10}  (microseconds)")
+
+        for program in PROGRAMS:
+            path = Path(program)
+            cached.load_file(path, store)
+            timings = (
+                microseconds(lambda: path.read_bytes()),
+                microseconds(lambda: uncached.load_file(path, store)),
+                microseconds(lambda: cached.load_file(path, store)),
+            )
+            print(f"{path.name:<16}" + "".join(f"{timing:>10.1f}" for timing in timings))
+
+        print()
+        print(cache.report(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark of decoding and encoding instructions
+
+Compares decoding every word of a store, and encoding as many instructions, by slicing
+BitArrays and looking the mnemonics up in the model, as the assembler used to, with the
+integer tables of the compiled instruction set.
+
+Usage: ::
+
+    python -m benchmarks.bench_instructionset
+"""
+
+from timeit import timeit
+
+from src.core.bitarray import BitArray, b
+from src.machines.assembler import Assembler
+from src.machines.instructionset import InstructionSet
+from src.machines.ssem import Ssem
+from src.machines.ssemmodel import SsemModel
+
+
+PROGRAM = "samples/ssem/fibonacci.asm"
+
+REPEAT = 2000
+
+
+def decode_with_bitarrays(model, word: BitArray) -> tuple:
+    """Decoding by slicing the word and scanning the mnemonics for an equal operation code"""
+    opcode = b(word[model.opcode_start:model.opcode_start + model.opcode_length])
+    data = b(word[model.address_start:model.address_start + model.address_length]).to_unsigned_int()
+    return model.Mnemonic(opcode), data
+
+
+def encode_with_bitarrays(model, mnemonic, data: int) -> int:
+    """Encoding by engraving the operation code and the data into a BitArray"""
+    word = BitArray(model.word_length)
+    if mnemonic in model.instructions_with_data and mnemonic in model.instructions_data_is_address:
+        word.engrave(model.address_start, BitArray.from_int(data, model.address_length))
+    word.engrave(model.opcode_start, mnemonic.value)
+    return word.to_unsigned_int()
+
+
+def microseconds(function) -> float:
+    """Average duration of a call, in microseconds"""
+    return timeit(function, number=REPEAT) / REPEAT * 1e6
+
+
+def main():
+    model = SsemModel
+    machine = Ssem(file=PROGRAM)
+    bits = [machine.store[address] for address in range(model.word_count)]
+    words = machine.store.read()
+    instructions = [(model.Mnemonic.LDN, address) for address in range(model.word_count)]
+    assembler = Assembler(model, cache=None)
+    instruction_set = InstructionSet.of(model)
+    mnemonics = instruction_set.mnemonics
+    decode, encode = instruction_set.decode, instruction_set.encode
+
+    def decode_tables():
+        for word in words:
+            opcode, data = decode(word)
+            mnemonics[opcode]
+
+    timings = {
+        "decode, BitArray": microseconds(lambda: [decode_with_bitarrays(model, word) for word in bits]),
+        "decode, assembler": microseconds(lambda: [assembler.decode_instruction(word) for word in bits]),
+        "decode, tables": microseconds(decode_tables),
+        "encode, BitArray": microseconds(lambda: [encode_with_bitarrays(model, *instruction) for instruction in instructions]),
+        "encode, tables": microseconds(lambda: [encode(*instruction) for instruction in instructions]),
+    }
+
+    print(f"Full store of {model.word_count} words (microseconds)")
+    for name, timing in timings.items():
+        print(f"{name:<20}{timing:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
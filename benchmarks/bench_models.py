@@ -0,0 +1,131 @@
+"""Benchmark of the execution loops specialized per model
+
+Compares, on the original 32x32 machine, the loop FastSsem generates for its model with
+the hand-written loop it replaced, which reads the sizes and operation codes from
+variables, then runs straight-line programs of increasing length on the 8192-word model
+to check that the time per cycle does not depend on the size of the program or store.
+
+Usage: ::
+
+    python -m benchmarks.bench_models
+"""
+
+from time import perf_counter
+
+from src.machines.abstractmachine import MachineRuntimeError
+from src.machines.assembler import Assembler
+from src.machines.fastssem import FastSsem
+from src.machines.models import Ssem8kModel
+
+
+PROGRAMS = ("samples/ssem/fibonacci.asm", "samples/ssem/factorct.asm")
+
+REPEAT = 30
+
+
+class HandWrittenSsem(FastSsem):
+    """FastSsem with the execution loop written once for all models, as before the
+    specialization"""
+
+    def instruction_cycles(self, count: int) -> int:
+        words = self._store.words
+        (word_count, modulus, mask, sign,
+         opcode_start, opcode_mask, address_start, address_mask,
+         JMP, JRP, LDN, STO, SUB, SUB2, CMP, STP) = self._constants
+
+        ci = self._ci
+        a = self._a
+        address = opcode = data = None
+        executed = 0
+        self.stop_flag = False
+
+        try:
+            while executed < count:
+                address = ci = (ci + 1) % word_count
+
+                word = words[address]
+                opcode = (word >> opcode_start) & opcode_mask
+                data = (word >> address_start) & address_mask
+                executed += 1
+
+                if opcode == LDN:
+                    a = -words[data] & mask
+                elif opcode == SUB or opcode == SUB2:
+                    a = (a - words[data]) & mask
+                elif opcode == STO:
+                    words[data] = a
+                elif opcode == CMP:
+                    if a & sign:
+                        ci += 1
+                elif opcode == JMP:
+                    ci = words[data]
+                    if ci & sign:
+                        ci -= modulus
+                elif opcode == JRP:
+                    ci = (ci + words[data]) & mask
+                    if ci & sign:
+                        ci -= modulus
+                elif opcode == STP:
+                    self.stop_flag = True
+                    break
+                else:
+                    raise MachineRuntimeError(f"Unsuported command '{opcode}'")
+
+        except IndexError:
+            raise MachineRuntimeError("Error: Out of bound memory access")
+
+        finally:
+            self._ci = ci
+            self._a = a
+            self._last_cycle += executed
+            if executed:
+                self._last_fetch = (address, opcode, data)
+
+        return executed
+
+
+def nanoseconds_per_cycle(machines: list, words: list) -> list:
+    """Duration of a cycle of each machine running a program from a reset, in nanoseconds
+
+    The machines take turns, and the best of the runs of each one is kept, so that the
+    comparison is not biased by the order of the measures or by other processes. The
+    loading of the program is not counted.
+    """
+    best = [float("inf")] * len(machines)
+    for _ in range(REPEAT):
+        for index, machine in enumerate(machines):
+            machine.clear_state()
+            machine.store.write(0, words)
+            start = perf_counter()
+            cycles = machine.run().cycles
+            best[index] = min(best[index], (perf_counter() - start) / cycles * 1e9)
+    return best
+
+
+def straight_line(length: int) -> str:
+    """Program of the given length going once through LDN, SUB and STO, then stopping"""
+    body = ("LDN 8190", "SUB 8191", "STO 8189")
+    lines = [f"{address:04d} {body[address % 3]}" for address in range(1, length)]
+    return "\n".join(lines + [f"{length:04d} STP", "8191 NUM 1"]) + "\n"
+
+
+def main():
+    print("32x32 machine (nanoseconds per cycle)")
+    print(f"{'program':<30}{'hand-written':>14}{'specialized':>14}")
+    for program in PROGRAMS:
+        words = FastSsem(file=program).store.read()
+        timings = nanoseconds_per_cycle([HandWrittenSsem(), FastSsem()], words)
+        print(f"{program:<30}" + "".join(f"{timing:>14.1f}" for timing in timings))
+
+    print()
+    print(f"{Ssem8kModel.__name__}, straight-line programs (nanoseconds per cycle)")
+    print(f"{'cycles':<10}{'hand-written':>14}{'specialized':>14}")
+    assembler = Assembler(Ssem8kModel, cache=None)
+    for length in (1024, 2048, 4096, 8188):
+        words = assembler.assemble_text(straight_line(length)).words.tolist()
+        timings = nanoseconds_per_cycle([HandWrittenSsem(model=Ssem8kModel), FastSsem(model=Ssem8kModel)], words)
+        print(f"{length:<10}" + "".join(f"{timing:>14.1f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
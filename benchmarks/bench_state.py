@@ -0,0 +1,51 @@
+"""Benchmark of saving and restoring the full state of a machine
+
+Reports the time taken to pack and unpack the state of each engine in the binary
+format, and to save it to and load it from a file.
+
+Usage: ::
+
+    python -m benchmarks.bench_state
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.machinestate import pack_state, unpack_state
+from src.machines.ssem import Ssem
+
+
+PROGRAM = "samples/ssem/fibonacci.asm"
+
+REPEAT = 10000
+
+
+def microseconds(function) -> float:
+    """Average duration of a call, in microseconds"""
+    return timeit(function, number=REPEAT) / REPEAT * 1e6
+
+
+def main():
+    with TemporaryDirectory() as directory:
+        file = Path(directory) / "state.bin"
+        print(f"{'':<14}{'pack':>10}{'unpack':>10}{'save':>10}{'load':>10}  (microseconds)")
+
+        for cls in (Ssem, FastSsem, CompiledSsem):
+            machine = cls(file=PROGRAM)
+            machine.run(max_cycles=500)
+            state = pack_state(machine)
+
+            timings = (
+                microseconds(lambda: pack_state(machine)),
+                microseconds(lambda: unpack_state(machine, state)),
+                microseconds(lambda: machine.save_state(file)),
+                microseconds(lambda: machine.load_state(file)),
+            )
+            print(f"{cls.__name__:<14}" + "".join(f"{timing:>10.1f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark of the vectorized engine
+
+Runs fibonacci.asm on an increasing number of lanes, each one computing a different
+element of the sequence, and reports the aggregate number of instructions executed per
+second, compared to FastSsem running the lanes one after the other.
+
+Usage: ::
+
+    python -m benchmarks.bench_vectorssem
+"""
+
+from time import perf_counter
+
+import numpy as np
+
+from src.core.bitarray import b
+from src.machines.fastssem import FastSsem
+from src.machines.vectorssem import VectorSsem
+
+
+PROGRAM = "samples/ssem/fibonacci.asm"
+
+MAX_CYCLES = 100000
+
+
+def one_by_one(lanes: int) -> float:
+    """Instructions per second of FastSsem running the lanes in turn, not counting the
+    loading of the program"""
+    machine = FastSsem(file=PROGRAM)
+    words = machine.store.read()
+    cycles = 0
+    elapsed = 0.0
+    for lane in range(lanes):
+        machine.clear_state()
+        machine.store.write(0, words)
+        machine.store[29] = b(lane % 46 + 1, 32)
+        start = perf_counter()
+        cycles += machine.run(max_cycles=MAX_CYCLES).cycles
+        elapsed += perf_counter() - start
+    return cycles / elapsed
+
+
+def vectorized(lanes: int) -> float:
+    """Instructions per second of VectorSsem running the lanes in lock-step"""
+    vector = VectorSsem(lanes, file=PROGRAM)
+    vector.set_word(29, np.arange(lanes) % 46 + 1)
+    start = perf_counter()
+    cycles = vector.run(MAX_CYCLES)
+    return cycles / (perf_counter() - start)
+
+
+def main():
+    for lanes in (1, 10, 100, 1000, 2000, 10000):
+        reference = one_by_one(min(lanes, 1000))
+        ips = vectorized(lanes)
+        print(f"{lanes:>6} lanes{ips:>16,.0f} ips{ips / reference:>8.1f}x FastSsem")
+
+
+if __name__ == "__main__":
+    main()
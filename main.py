@@ -1,27 +1,110 @@
 
+import argparse
 import sys
+from pathlib import Path
 from threading import Event, Thread
 
+from src.machines.abstractmachine import MachineRuntimeError, StopReason
 from src.machines.assembler import AssemblerError
+from src.machines.breakpoints import parse_breakpoint
+from src.machines.engines import ENGINES
+from src.machines.imagecache import ImageCache
+from src.machines.models import MODELS
 from src.machines.ssem import Ssem
-from src.ui.commandinterface import CommandInterface
 
 
-if __name__ == "__main__":
-    stop_event = Event()
+def parse_arguments(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Small-Scale Experimental Machine (SSEM) simulator")
+    parser.add_argument("file", nargs="?", help="program to load (.asm or .snp)")
+    parser.add_argument("--engine", choices=ENGINES, default="fast", help="execution engine (default: fast)")
+    parser.add_argument("--model", choices=MODELS, default="ssem", help="model of machine (default: ssem, 32 words of 32 bits)")
+    parser.add_argument("--headless", action="store_true", help="run the program at full speed without the interface")
+    parser.add_argument("--max-cycles", type=int, default=None, help="headless: stop after this number of cycles")
+    parser.add_argument("--dump", choices=("json", "snp", "asm"), default="json", help="headless: output format (default: json)")
+    parser.add_argument("--profile", choices=("text", "json"), default=None, help="headless: print execution counters to stderr")
+    parser.add_argument("--trace", type=Path, default=None, help="headless: record every instruction executed to this binary file")
+    parser.add_argument("--break", dest="breaks", action="append", default=[], metavar="BREAKPOINT",
+                        help="headless: stop before the instruction at an address, e.g. '7', '7 if A < 0' or 'if store[31] == 46' (repeatable)")
+    parser.add_argument("--watch", dest="watches", action="append", default=[], metavar="WATCHPOINT",
+                        help="headless: stop after an instruction reading or writing a word, e.g. '31', '31 write' or '31 if A < 0' (repeatable)")
+    parser.add_argument("--detect-loops", action="store_true", help="headless: stop as soon as the program provably loops forever")
+    parser.add_argument("--cache-stats", action="store_true", help="print the statistics of the cache of assembled programs to stderr")
+    parser.add_argument("--strict", action="store_true", help="headless: exit with status 2 when --max-cycles is reached")
+    return parser.parse_args(argv)
+
+
+def run_headless(machine: Ssem, arguments: argparse.Namespace) -> int:
+    """Run the machine until it stops and print its final state to stdout"""
+    try:
+        for spec in arguments.breaks:
+            machine.set_breakpoint(parse_breakpoint(f"break {spec}"))
+        for spec in arguments.watches:
+            machine.set_breakpoint(parse_breakpoint(f"watch {spec}"))
+        if arguments.trace:
+            machine.enable_trace(file=arguments.trace)
+    except ValueError as ex:
+        print(ex, file=sys.stderr)
+        return 1
+
+    if arguments.profile:
+        machine.enable_profiling()
 
     try:
-        if len(sys.argv) > 1:
-            ssem = Ssem(file=sys.argv[1])
+        result = machine.run(max_cycles=arguments.max_cycles, detect_loops=arguments.detect_loops)
+    except MachineRuntimeError as ex:
+        print(ex, file=sys.stderr)
+        return 1
+    finally:
+        machine.disable_trace()
+
+    if arguments.profile == "json":
+        print(machine.profiler.to_json(), file=sys.stderr)
+    elif arguments.profile == "text":
+        print(machine.profiler.report(), end="", file=sys.stderr)
+
+    if arguments.dump == "json":
+        import json
+
+        print(json.dumps({
+            "file": arguments.file,
+            "cycles": result.cycles,
+            "stop_reason": result.stop_reason.value,
+            "break": str(machine.last_break) if result.stop_reason == StopReason.BREAK else None,
+            "loop": result.loop._asdict() if result.loop else None,
+            "ci": result.ci,
+            "a": result.a,
+            "wall_time": result.wall_time,
+            "ips": result.ips,
+            "store": [machine.store[address].to_int() for address in range(machine.store.word_count)],
+        }))
+    else:
+        print(f"; cycles: {result.cycles}, stop reason: {result.stop_reason.value}, wall time: {result.wall_time:.6f} s")
+        if result.stop_reason == StopReason.BREAK:
+            print(f"; break: {machine.last_break}")
+        if result.loop:
+            print(f"; {result.loop}")
+        print(f"; CI: {result.ci}")
+        print(f"; A: {result.a}")
+        if arguments.dump == "asm":
+            print(machine.assembler.disassemble(machine.store, ci=result.ci), end="")
         else:
-            ssem = Ssem()
-        interface = CommandInterface(ssem, stop_event)
+            print(machine.assembler.dump_snp(machine.store), end="")
 
-        thread_interface = Thread(target=interface.run_interface)
-        thread_machine = Thread(target=ssem.start, kwargs={"stop_event": stop_event, "stopped": True})
+    if arguments.strict and result.stop_reason == StopReason.BUDGET:
+        return 2
+    return 0
 
-    except AssemblerError as ex:
-        print(ex)
+
+def run_interactive(machine: Ssem) -> int:
+    """Run the machine along with the command interface"""
+    from src.ui.commandinterface import CommandInterface
+
+    machine.enable_history()
+    stop_event = Event()
+    interface = CommandInterface(machine, stop_event)
+
+    thread_interface = Thread(target=interface.run_interface)
+    thread_machine = Thread(target=machine.start, kwargs={"stop_event": stop_event, "stopped": True})
 
     try:
         thread_interface.start()
@@ -32,11 +115,38 @@ if __name__ == "__main__":
 
     except KeyboardInterrupt:
         stop_event.set()
+        machine.control.quit()
         thread_machine.join()
         thread_interface.join()
 
     except Exception as ex:
         print(ex, file=sys.stderr)
         stop_event.set()
+        machine.control.quit()
         thread_machine.join()
         thread_interface.join()
+
+    return 0
+
+
+def main(argv: list = None) -> int:
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    ImageCache.enable_user_cache()
+
+    try:
+        machine = ENGINES[arguments.engine](file=arguments.file, model=MODELS[arguments.model])
+    except AssemblerError as ex:
+        print(ex, file=sys.stderr)
+        return 1
+
+    if arguments.cache_stats:
+        cache = machine.assembler.cache
+        print(cache.report() if cache else "Image cache disabled\n", end="", file=sys.stderr)
+
+    if arguments.headless:
+        return run_headless(machine, arguments)
+    return run_interactive(machine)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
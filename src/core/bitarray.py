@@ -2,52 +2,41 @@
 from typing import Iterable
 
 
-class BitArray(list):
-    """Simple implementation of bit array in the form of List of boolean values
+class BitArray:
+    """Simple implementation of bit array backed by a single masked integer
+
+    Bit 0 is the least significant bit of the integer, which matches the SSEM
+    convention of writing numbers least significant bit first.
 
     Provides manipulation routines useful for simulating a Manchester-like machine
     """
 
+    __slots__ = ("_value", "_size")
+
     def __init__(self, size: int):
-        array = [False for _ in range(0, size)]
-        super().__init__(array)
+        if size < 0:
+            raise ValueError("Size must be positive")
+        self._value = 0
+        self._size = size
 
     @classmethod
     def from_int(cls, value: int, digits: int):
         """Creates a BitArray from an integer following SSEM binary convention
 
+        Negative values are written in two's complement, down to -2^(digits-1).
+
         Arguments:
             value: integer value to translate
-        """
-        array = BitArray(digits)
-
-        # Positive value: regular conversion
-        if value >= 0:
-            # Binary transcription (note it is right-to-left in Python)
-            bits = bin(value).split("0b")[1]
-
-            # Padding with zeros
-            while len(bits) < digits:
-                bits = '0' + bits
-
-            # Reverse bits and write them in a BitArray
-            bits = list(bits)
-            bits.reverse()
-            array.engrave(0, map(lambda b: b != '0', bits))
+            digits: size of the resulting array
 
-        # Negative value: two's complement
-        else:
-            # TODO: test that
-            # Compute two's complements
-            value = -1 * value
-            bits = bin(value - pow(2, digits)).split("0b")[1]
-
-            # Reverse bits and write them in a BitArray
-            bits = list(bits)
-            bits.reverse()
-            array.engrave(0, map(lambda b: b != '0', bits))
+        Raises:
+            IndexError: the value does not fit in the given number of digits
+        """
+        limit = 1 << digits
+        if value >= limit or value < -(limit >> 1):
+            raise IndexError(f"Value {value} does not fit in {digits} digits")
 
-        return array
+        return cls._from_unsigned(value & (limit - 1), digits)
 
     @classmethod
     def from_iterable(cls, value: Iterable):
@@ -56,12 +45,15 @@ class BitArray(list):
         Arguments:
             value: Iterable containing objects that can be evaluated as boolean
         """
-        array = BitArray(len(value))
+        if isinstance(value, BitArray):
+            return cls._from_unsigned(value._value, value._size)
 
+        bits = 0
         for i in range(len(value)):
-            array[i] = bool(value[i])
+            if value[i]:
+                bits |= 1 << i
 
-        return array
+        return cls._from_unsigned(bits, len(value))
 
     @classmethod
     def from_string(cls, value: str):
@@ -73,46 +65,30 @@ class BitArray(list):
         if value.startswith("0b"):
             value = value.split("0b")[1]
 
-        array = BitArray(len(value))
-
+        bits = 0
         for i in range(len(value)):
-            array[i] = value[i] != "0"
+            if value[i] != "0":
+                bits |= 1 << i
+
+        return cls._from_unsigned(bits, len(value))
 
+    @classmethod
+    def _from_unsigned(cls, value: int, digits: int):
+        """Creates a BitArray from an unsigned integer already masked to the given size"""
+        array = cls.__new__(cls)
+        array._value = value
+        array._size = digits
         return array
 
     def to_int(self) -> int:
         """Get the integer value of the binary in SSEM format (from left to right)"""
-        def twos_complement(value, bits):
-            """compute the two's complement of integer value"""
-            if (value & (1 << (bits - 1))) != 0: # if sign bit is set e.g., 8bit: 128-255
-                value = value - (1 << bits)      # compute negative value
-            return value                         # return positive value as is
-
-        # Copy the list
-        bits = list(self)
-
-        # Reverse bit order
-        bits.reverse()
-
-        # Convert to 0 and 1 string
-        bits = "0b" + ''.join(['1' if b else '0' for b in bits])
-
-        # Convert to int
-        return twos_complement(int(bits, 2), len(self))
+        if self._size and self._value >> (self._size - 1):
+            return self._value - (1 << self._size)
+        return self._value
 
     def to_unsigned_int(self) -> int:
         """Get the integer value of the binary in SSEM format (from left to right)"""
-        # Copy the list
-        bits = list(self)
-
-        # Reverse bit order
-        bits.reverse()
-
-        # Convert to 0 and 1 string
-        bits = "0b" + ''.join(['1' if b else '0' for b in bits])
-
-        # Convert to int
-        return int(bits, 2)
+        return self._value
 
     def engrave(self, index: int, other):
         """Prints the bits of the given array to the current one at the given position
@@ -126,19 +102,63 @@ class BitArray(list):
             index: Starting position in the current array
             other: Array to print to the current one
         """
+        if isinstance(other, BitArray):
+            size = other._size
+            if 0 <= index and index + size <= self._size:
+                self._value = (self._value & ~(((1 << size) - 1) << index)) | (other._value << index)
+                return self
+
+        # Generic path, bit by bit, with the same index semantics as a list
         for b in other:
             self[index] = b
             index += 1
 
         return self
 
+    def _normalize_index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("BitArray index out of range")
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        value = self._value
+        for i in range(self._size):
+            yield bool((value >> i) & 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step == 1:
+                size = max(0, stop - start)
+                return self._from_unsigned((self._value >> start) & ((1 << size) - 1), size)
+            return BitArray.from_iterable([self[i] for i in range(start, stop, step)])
+
+        return bool((self._value >> self._normalize_index(index)) & 1)
+
+    def __setitem__(self, index: int, value):
+        index = self._normalize_index(index)
+        if value:
+            self._value |= 1 << index
+        else:
+            self._value &= ~(1 << index)
+
     def __eq__(self, other) -> bool:
-        return isinstance(other, self.__class__) and list(self) == list(other)
+        return isinstance(other, self.__class__) and self._size == other._size and self._value == other._value
+
+    # Arrays are mutable, so they cannot be used as dictionary keys
+    __hash__ = None
 
     def __str__(self) -> str:
         """Visual representation of the array similar to what is found on the SSEM"""
-        str_bits = ['_' if b else '.' for b in self]
-        return "".join(map(str, str_bits))
+        if not self._size:
+            return ""
+        bits = format(self._value, f"0{self._size}b")[::-1]
+        return bits.replace("0", ".").replace("1", "_")
 
     def __repr__(self) -> str:
         # Not a regular use of repr, but simplifies a lot the debugging
@@ -157,4 +177,3 @@ def b(value, digits: int=None) -> BitArray:
         return BitArray.from_iterable(value)
     else:
         raise ValueError(f"Unsupported type {type(value)}")
-
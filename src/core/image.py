@@ -0,0 +1,30 @@
+
+from array import array
+import sys
+
+
+def _typecode(word_length: int) -> str:
+    """Array type code holding words of the given length, 4 or 8 bytes per word"""
+    if not 0 < word_length <= 64:
+        raise ValueError(f"Unsupported word length {word_length} (from 1 to 64 bits)")
+    return "I" if word_length <= 32 and array("I").itemsize == 4 else "Q"
+
+
+def pack_words(words, word_length: int) -> bytes:
+    """Pack unsigned words into a little-endian binary image
+
+    Each word takes 4 bytes up to 32 bits, 8 bytes up to 64 bits.
+    """
+    packed = array(_typecode(word_length), words)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_words(image: bytes, word_length: int) -> list:
+    """Unpack the unsigned words of a binary image made by pack_words"""
+    packed = array(_typecode(word_length))
+    packed.frombytes(image)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tolist()
@@ -0,0 +1,65 @@
+
+from src.core.bitarray import BitArray
+from src.core.store import Store
+
+
+class IntStore(Store):
+    """Main memory of a Manchester-like machine holding each word as an unsigned integer
+
+    Meant for execution engines working on integers: they can read and write the list of
+    words directly, while the bracket operator still reads and writes BitArray.
+    """
+
+    def __init__(self, word_length: int, word_count: int):
+        self._words = []
+        super().__init__(word_length, word_count)
+
+    def __getitem__(self, address: int) -> BitArray:
+        """Get a copy of the word at the given address"""
+        return BitArray.from_int(self._words[address], self._word_length)
+
+    def __setitem__(self, address: int, word: BitArray):
+        """Replace the word at the given address"""
+        if len(word) != self._word_length:
+            raise ValueError(f"Word has a wrong length (got {len(word)}, expected {self._word_length})")
+        self._words[address] = word.to_unsigned_int()
+        self._notify(address, address + 1)
+
+    def read(self, start: int = 0, stop: int | None = None) -> list:
+        """Get the words between the given addresses as unsigned integers
+
+        Arguments:
+            start: First address to read
+            stop: Address after the last one to read, defaults to the end of the store
+        """
+        return self._words[start:stop]
+
+    def write(self, start: int, words):
+        """Replace the words starting at the given address
+
+        Arguments:
+            start: First address to write
+            words: Iterable of integers (signed or unsigned) or BitArray, one per word
+        """
+        values = self._unsigned_values(start, words)
+        self._words[start:start + len(values)] = values
+        self._notify(start, start + len(values))
+
+    @property
+    def words(self) -> list:
+        """The list of words as unsigned integers
+
+        This is the actual storage, not a copy. It is kept for the whole life of the store,
+        and writing to it does not notify the watchers.
+        """
+        return self._words
+
+    def clear(self):
+        """Fill the entire store with zeros"""
+        self._words[:] = [0] * self._word_count
+        self._notify(0, self._word_count)
+
+    def __str__(self) -> str:
+        """Get a visual representation of the store"""
+        lines = [str(self[address]) for address in range(self._word_count)]
+        return "\n".join(lines)
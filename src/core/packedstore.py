@@ -0,0 +1,110 @@
+
+import numpy as np
+
+from src.core.bitarray import BitArray
+from src.core.store import Store
+
+
+class PackedStore(Store):
+    """Main memory of a Manchester-like machine packed in a single NumPy array
+
+    Each word is kept as an unsigned integer in a contiguous array of 32 or 64
+    bits integers depending on the word length, which costs a handful of bytes
+    per word and allows bulk operations on the whole store.
+
+    Words are still read and written as BitArray through the bracket operator.
+    """
+
+    def __init__(self, word_length: int, word_count: int):
+        if not 0 < word_length <= 64:
+            raise ValueError(f"Unsupported word length {word_length} (from 1 to 64 bits)")
+
+        self._dtype = np.uint32 if word_length <= 32 else np.uint64
+        self._mask = (1 << word_length) - 1
+        super().__init__(word_length, word_count)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The NumPy type holding each word"""
+        return np.dtype(self._dtype)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the words, in bytes"""
+        return self._words.nbytes
+
+    def __getitem__(self, address: int) -> BitArray:
+        """Get a copy of the word at the given address"""
+        return BitArray.from_int(int(self._words[address]), self._word_length)
+
+    def __setitem__(self, address: int, word: BitArray):
+        """Replace the word at the given address"""
+        if len(word) != self._word_length:
+            raise ValueError(f"Word has a wrong length (got {len(word)}, expected {self._word_length})")
+        self._words[address] = word.to_unsigned_int()
+        self._notify(address, address + 1)
+
+    def read(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Get a copy of the words between the given addresses as unsigned integers
+
+        Arguments:
+            start: First address to read
+            stop: Address after the last one to read, defaults to the end of the store
+        """
+        return self._words[start:stop].copy()
+
+    def write(self, start: int, words):
+        """Replace the words starting at the given address
+
+        Arguments:
+            start: First address to write
+            words: Iterable of integers (signed or unsigned) or BitArray, one per word
+        """
+        if isinstance(words, np.ndarray) and words.dtype.kind == "u":
+            values = words
+        else:
+            values = [
+                word.to_unsigned_int() if isinstance(word, BitArray) else int(word)
+                for word in words
+            ]
+            if any(value > self._mask or value < -(self._mask + 1) for value in values):
+                raise ValueError(f"Some values do not fit in {self._word_length} bits")
+            values = np.array([value & self._mask for value in values], dtype=self._dtype)
+
+        if values.size and int(values.max()) > self._mask:
+            raise ValueError(f"Some values do not fit in {self._word_length} bits")
+        if start < 0 or start + len(values) > self._word_count:
+            raise IndexError("Writing outside of the store")
+
+        self._words[start:start + len(values)] = values
+        self._notify(start, start + len(values))
+
+    def compare(self, other) -> np.ndarray:
+        """Compare each word to the other store
+
+        Arguments:
+            other: A store of the same size or an array of unsigned integers
+
+        Returns:
+            An array of booleans, True where the words are equal
+        """
+        if isinstance(other, PackedStore):
+            other = other._words
+        elif isinstance(other, Store):
+            other = [word.to_unsigned_int() for word in other]
+
+        other = np.asarray(other, dtype=self._dtype)
+        if other.shape != self._words.shape:
+            raise ValueError(f"Cannot compare a store of {self._word_count} words to {other.shape[0]} words")
+
+        return self._words == other
+
+    def clear(self):
+        """Fill the entire store with zeros"""
+        self._words = np.zeros(self._word_count, dtype=self._dtype)
+        self._notify(0, self._word_count)
+
+    def __str__(self) -> str:
+        """Get a visual representation of the store"""
+        lines = [str(self[address]) for address in range(self._word_count)]
+        return "\n".join(lines)
@@ -1,4 +1,6 @@
 
+from typing import Callable
+
 from src.core.bitarray import BitArray
 
 
@@ -12,6 +14,7 @@ class Store:
     def __init__(self, word_length: int, word_count: int):
         self._word_length = word_length
         self._word_count = word_count
+        self._watchers = []
         self.clear()
 
     @property
@@ -31,13 +34,69 @@ class Store:
     def __setitem__(self, address: int, word: BitArray):
         """Replace the word at the given address"""
         self._store[address] = word
+        self._notify(address, address + 1)
+
+    def read(self, start: int = 0, stop: int | None = None) -> list:
+        """Get the words between the given addresses as unsigned integers
+
+        Arguments:
+            start: First address to read
+            stop: Address after the last one to read, defaults to the end of the store
+        """
+        return [word.to_unsigned_int() for word in self._store[start:stop]]
+
+    def write(self, start: int, words):
+        """Replace the words starting at the given address
+
+        Arguments:
+            start: First address to write
+            words: Iterable of integers (signed or unsigned) or BitArray, one per word
+        """
+        values = self._unsigned_values(start, words)
+        self._store[start:start + len(values)] = [BitArray._from_unsigned(value, self._word_length) for value in values]
+        self._notify(start, start + len(values))
+
+    def _unsigned_values(self, start: int, words) -> list:
+        """Check the words to write from the given address, and convert them to unsigned integers"""
+        mask = (1 << self._word_length) - 1
+        values = list(words)
+        if start < 0 or start + len(values) > self._word_count:
+            raise IndexError("Writing outside of the store")
+        if values and set(map(type, values)) == {int} and min(values) >= 0 and max(values) <= mask:
+            # Already unsigned, e.g. read from another store or from an image
+            return values
+
+        values = [word.to_unsigned_int() if isinstance(word, BitArray) else int(word) for word in values]
+        if any(value > mask or value < -(mask + 1) for value in values):
+            raise ValueError(f"Some values do not fit in {self._word_length} bits")
+        return [value & mask for value in values]
+
+    def watch(self, callback: Callable[[int, int], None]):
+        """Register a function to call whenever words are written
+
+        The function receives the first address written and the address after the last one.
+        Words modified in place (e.g. with BitArray.engrave) are not reported.
+        """
+        self._watchers.append(callback)
+
+    def unwatch(self, callback: Callable[[int, int], None]):
+        """Stop calling a function registered with watch"""
+        self._watchers.remove(callback)
+
+    def _notify(self, start: int, stop: int):
+        """Tell the watchers that the words from start to stop have been written"""
+        if start < 0:
+            start += self._word_count
+            stop += self._word_count
+        for callback in self._watchers:
+            callback(start, stop)
 
     def clear(self):
         """Fill the entire store with zeros"""
-        empty_line = BitArray(self._word_length)
         self._store = [
-            empty_line for _ in range(0, self._word_count)
+            BitArray(self._word_length) for _ in range(0, self._word_count)
         ]
+        self._notify(0, self._word_count)
 
     def __str__(self) -> str:
         """Get a visual representation of the store"""
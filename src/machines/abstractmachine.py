@@ -1,13 +1,65 @@
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
 from threading import Event
 from typing import Optional
 
+from src.machines.loopdetector import Loop
+
 
 class MachineRuntimeError(Exception):
     pass
 
 
+class StopReason(Enum):
+    """Why a run ended"""
+    STOP = "stop"
+    """A stop instruction has been executed"""
+    BUDGET = "budget"
+    """The maximum number of cycles has been reached"""
+    BREAK = "break"
+    """A breakpoint, a watchpoint or a conditional break has been hit, see Ssem.last_break"""
+    LOOP = "loop"
+    """The machine provably loops forever, see RunResult.loop"""
+
+
+@dataclass(frozen=True)
+class RunResult:
+    """Outcome of a run of a machine"""
+
+    cycles: int
+    """Number of instruction cycles performed"""
+
+    stop_reason: StopReason
+    """Why the run ended"""
+
+    ci: int
+    """Final value of the program counter"""
+
+    a: int
+    """Final value of the accumulator"""
+
+    wall_time: float
+    """Duration of the run in seconds"""
+
+    loop: Optional[Loop] = None
+    """Endless loop found when the run ended with StopReason.LOOP"""
+
+    @property
+    def ips(self) -> float:
+        """Achieved speed in instructions per second"""
+        return self.cycles / self.wall_time if self.wall_time > 0 else 0.0
+
+
+class CycleBudgetExceeded(MachineRuntimeError):
+    """Raised by a strict run reaching its maximum number of cycles"""
+
+    def __init__(self, result: RunResult):
+        super().__init__(f"Error: No stop instruction met after {result.cycles} cycles")
+        self.result = result
+
+
 class AbstractMachine(ABC):
     """Base class for a machine simulator
     """
@@ -18,6 +70,12 @@ class AbstractMachine(ABC):
         """
         ...
 
+    @abstractmethod
+    def run(self, max_cycles: Optional[int] = None, until_stop: bool = True) -> RunResult:
+        """Run the machine at full speed until a stop instruction or a number of cycles is reached
+        """
+        ...
+
     @abstractmethod
     def start(self, stop_event: Optional[Event] = None):
         """Start the machine until stop condition is met or stop is requested externally
@@ -33,4 +91,3 @@ class AbstractMachine(ABC):
     def clear_state(self):
         """Reset the program counter and registries"""
         ...
-
@@ -0,0 +1,348 @@
+
+from pathlib import Path
+from typing import NamedTuple
+
+from src.machines.fastssem import FastSsem
+from src.machines.ssemmodel import SsemModel
+
+
+_CONSTANT = -1
+"""Key of the constant term in an affine expression"""
+
+
+class _LoopPlan(NamedTuple):
+    """Effect of a number of turns of a loop, found by AcceleratedSsem._plan_loop"""
+
+    turns: int
+    """Number of full turns that can be skipped"""
+
+    length: int
+    """Number of instructions in a turn"""
+
+    variables: list
+    """Addresses of the words written in a turn, plus None for A"""
+
+    matrix: list
+    """Affine map of a turn on the variables, the last column holding the constants"""
+
+    ci: int
+    """Signed value of CI at the end of a turn"""
+
+    last_fetch: tuple
+    """Last instruction of a turn"""
+
+
+class AcceleratedSsem(FastSsem):
+    """Simulator for the SSEM skipping the turns of counted loops
+
+    Executes like FastSsem, but regularly looks at the loop the program is in: after a
+    slice of cycles, the machine goes on to the next jump, and when it jumps backwards, a
+    turn of the loop is followed from its head, computing A and the words written
+    as affine functions of their values at the beginning of the turn, since LDN, SUB and
+    STO are all affine. The tests met along the way must depend on counters, words or A
+    increased by a constant at each turn: the number of turns before a test changes its
+    outcome is then known. All these turns are applied at once, by raising the affine map
+    of a turn to that power, modulo the word size. The interpreter then goes on with the
+    turn leaving the loop.
+
+    Loops that jump or test on anything else, write their own instructions, or stop, are
+    interpreted as usual. The results, including the number of cycles, are exactly the same
+    as if every instruction had been executed.
+    """
+
+    max_loop_length = 64
+    """Maximum number of instructions in a turn of an accelerated loop"""
+
+    min_slice = 1024
+    """Number of cycles interpreted before looking for a loop"""
+
+    min_budget = 1024
+    """Number of cycles left below which loops are not worth looking at"""
+
+    max_slice = 1 << 14
+    """Number of cycles interpreted between two attempts, when no loop can be accelerated"""
+
+    def __init__(self, file: Path | None = None, model: type = SsemModel):
+        super().__init__(file, model)
+        self._slice = self.min_slice
+        self._accelerated_cycles = 0
+
+    @property
+    def accelerated_cycles(self) -> int:
+        """Number of cycles skipped by computing loops instead of executing them"""
+        return self._accelerated_cycles
+
+    def instruction_cycles(self, count: int) -> int:
+        """Performs up to the given number of instruction cycles
+
+        The machine is considered running in the meantime: the stop flag is cleared first,
+        and the cycles end early when a stop instruction is met.
+
+        Returns:
+            The number of cycles performed, including the cycles of the loops skipped
+        """
+        executed = 0
+        self.stop_flag = False
+
+        while executed < count:
+            executed += FastSsem.instruction_cycles(self, min(count - executed, self._slice))
+            if self.stop_flag or executed == count:
+                break
+
+            # Loops are only looked at once the program has jumped back
+            executed += self._run_to_jump(count - executed)
+            skipped = 0
+            if not self.stop_flag and self._jumped_backwards():
+                interpreted, skipped = self._find_loop(count - executed)
+                executed += interpreted + skipped
+            if self.stop_flag:
+                break
+            # Look again soon after a loop, less and less often when nothing can be done
+            self._slice = self.min_slice if skipped else min(2 * self._slice, self.max_slice)
+
+        return executed
+
+    def _find_loop(self, budget: int) -> tuple:
+        """Skip the turns of the loop just entered, following a turn from each of its instructions in turn
+
+        The loop has to be followed from a point where the words it tests are counters,
+        which is not always its head.
+
+        Returns:
+            The number of cycles interpreted while looking, and the number of cycles skipped
+        """
+        word_count = self.model.word_count
+        head = (self._ci + 1) % word_count
+        executed = 0
+        while budget - executed >= self.min_budget:
+            skipped = self._skip_loop(budget - executed)
+            if skipped:
+                return executed, skipped
+            executed += FastSsem.instruction_cycles(self, 1)
+            if self.stop_flag or (self._ci + 1) % word_count == head or executed == self.max_loop_length:
+                break
+        return executed, 0
+
+    def _run_to_jump(self, budget: int) -> int:
+        """Performs the cycles up to the next jump executed, within the budget and the length of a loop
+
+        Returns:
+            The number of cycles performed
+        """
+        JMP, JRP = self._constants[8:10]
+        limit = min(budget, self.max_loop_length)
+        executed = 0
+        while executed < limit:
+            executed += FastSsem.instruction_cycles(self, min(limit - executed, self._cycles_to_jump()))
+            if self.stop_flag or self._last_fetch[1] in (JMP, JRP):
+                break
+        return executed
+
+    def _cycles_to_jump(self) -> int:
+        """Number of cycles up to the next jump instruction, if no test skips it"""
+        words = self._store.words
+        (word_count, modulus, mask, sign,
+         opcode_start, opcode_mask, address_start, address_mask,
+         JMP, JRP, LDN, STO, SUB, SUB2, CMP, STP) = self._constants
+
+        address = self._ci
+        for cycles in range(1, self.max_loop_length + 1):
+            address = (address + 1) % word_count
+            opcode = (words[address] >> opcode_start) & opcode_mask
+            if opcode == JMP or opcode == JRP:
+                return cycles
+        return self.max_loop_length
+
+    def _jumped_backwards(self) -> bool:
+        """Whether the last instruction was a jump to its own address or before"""
+        if self._last_fetch is None:
+            return False
+        address, opcode, _ = self._last_fetch
+        word_count, *_, JMP, JRP, LDN, STO, SUB, SUB2, CMP, STP = self._constants
+        return (opcode == JMP or opcode == JRP) and (self._ci + 1) % word_count <= address
+
+    def _skip_loop(self, budget: int) -> int:
+        """Apply at once the turns of the current loop that fit in the given number of cycles
+
+        Returns:
+            The number of cycles skipped
+        """
+        plan = self._plan_loop(budget)
+        if plan is None:
+            return 0
+
+        modulus = self._modulus
+        words = self._store.words
+        values = [self._a if variable is None else words[variable] for variable in plan.variables] + [1]
+        power = _matrix_power(plan.matrix, plan.turns, modulus)
+        for variable, row in zip(plan.variables, power):
+            value = sum(coefficient * operand for coefficient, operand in zip(row, values)) % modulus
+            if variable is None:
+                self._a = value
+            else:
+                words[variable] = value
+
+        skipped = plan.turns * plan.length
+        self._ci = plan.ci
+        self._last_fetch = plan.last_fetch
+        self._last_cycle += skipped
+        self._accelerated_cycles += skipped
+        return skipped
+
+    def _plan_loop(self, budget: int) -> _LoopPlan | None:
+        """Follow a turn of the loop starting at the next instruction, see AcceleratedSsem
+
+        Returns:
+            How to skip the turns of the loop fitting in the given number of cycles, None
+            when the code is not a loop that can be accelerated
+        """
+        words = self._store.words
+        (word_count, modulus, mask, sign,
+         opcode_start, opcode_mask, address_start, address_mask,
+         JMP, JRP, LDN, STO, SUB, SUB2, CMP, STP) = self._constants
+
+        # Affine expressions are dictionaries of coefficients by variable: an address for
+        # a word, None for A and _CONSTANT for the constant term. The variables are the
+        # values at the beginning of the turn.
+        a = {None: 1}
+        written = {}
+        executed = set()
+        jump_words = set()
+        tests = []
+
+        def evaluate(expression: dict) -> int:
+            return sum(
+                coefficient * (1 if variable == _CONSTANT else self._a if variable is None else words[variable])
+                for variable, coefficient in expression.items()
+            ) % modulus
+
+        def read(address: int) -> dict:
+            return written.get(address, {address: 1})
+
+        ci = self._ci
+        head = (ci + 1) % word_count
+        length = 0
+        address = opcode = data = None
+        while length == 0 or (ci + 1) % word_count != head:
+            if length == self.max_loop_length:
+                return None
+            length += 1
+            address = ci = (ci + 1) % word_count
+            word = words[address]
+            opcode = (word >> opcode_start) & opcode_mask
+            data = (word >> address_start) & address_mask
+            if data >= word_count:
+                return None
+            executed.add(address)
+
+            if opcode == LDN:
+                a = _combine({}, read(data), -1, modulus)
+            elif opcode == SUB or opcode == SUB2:
+                a = _combine(a, read(data), -1, modulus)
+            elif opcode == STO:
+                written[data] = a
+            elif opcode == CMP:
+                negative = bool(evaluate(a) & sign)
+                tests.append((a, negative))
+                if negative:
+                    ci += 1
+            elif opcode == JMP:
+                jump_words.add(data)
+                ci = words[data]
+                if ci & sign:
+                    ci -= modulus
+            elif opcode == JRP:
+                jump_words.add(data)
+                ci = (ci + words[data]) & mask
+                if ci & sign:
+                    ci -= modulus
+            else:
+                return None
+
+        if written.keys() & (executed | jump_words):
+            # The loop changes its own instructions or jumps
+            return None
+
+        # The words read but never written are constants
+        def substitute(expression: dict) -> dict:
+            result = {}
+            for variable, coefficient in expression.items():
+                if variable is None or variable == _CONSTANT or variable in written:
+                    result[variable] = (result.get(variable, 0) + coefficient) % modulus
+                else:
+                    result[_CONSTANT] = (result.get(_CONSTANT, 0) + coefficient * words[variable]) % modulus
+            return result
+
+        variables = [None] + sorted(written)
+        updates = {variable: substitute(a if variable is None else written[variable]) for variable in variables}
+
+        # Number of turns before a test changes its outcome
+        turns = budget // length
+        for expression, negative in tests:
+            expression = substitute(expression)
+            step = 0
+            for variable, coefficient in expression.items():
+                if variable == _CONSTANT or not coefficient:
+                    continue
+                update = updates[variable]
+                if any(coefficient for other, coefficient in update.items() if other not in (variable, _CONSTANT)) \
+                        or update.get(variable, 0) != 1:
+                    # Not a counter
+                    return None
+                step += coefficient * update.get(_CONSTANT, 0)
+            turns = min(turns, _turns_before_sign_change(evaluate(expression), step % modulus, modulus))
+
+        size = len(variables) + 1
+        if turns < 2 or 10 * turns * length < 2 * turns.bit_length() * size ** 3:
+            # Faster to interpret
+            return None
+
+        matrix = [[updates[variable].get(other, 0) for other in variables] + [updates[variable].get(_CONSTANT, 0)]
+                  for variable in variables]
+        matrix.append([0] * (size - 1) + [1])
+        return _LoopPlan(turns, length, variables, matrix, ci, (address, opcode, data))
+
+
+def _combine(expression: dict, other: dict, factor: int, modulus: int) -> dict:
+    """Affine expression plus factor times another one"""
+    result = dict(expression)
+    for variable, coefficient in other.items():
+        result[variable] = (result.get(variable, 0) + factor * coefficient) % modulus
+    return result
+
+
+def _turns_before_sign_change(value: int, step: int, modulus: int) -> int:
+    """Number of times an unsigned value can be increased by step before its sign bit changes
+
+    Returns:
+        The number of turns keeping the sign, the sign changing at the next one
+    """
+    if step == 0:
+        return modulus  # Never changes, more than any budget
+    half = modulus >> 1
+    if step < half:
+        # Going up to the next half of the range
+        boundary = half if value < half else modulus
+        return -((value - boundary) // step)
+    step = modulus - step
+    # Going down below the start of the current half
+    floor = half if value >= half else 0
+    return (value - floor) // step + 1
+
+
+def _matrix_power(matrix: list, exponent: int, modulus: int) -> list:
+    """Square matrix raised to a power, modulo an integer"""
+    size = len(matrix)
+    result = [[int(row == column) for column in range(size)] for row in range(size)]
+    while exponent:
+        if exponent & 1:
+            result = _matrix_product(result, matrix, modulus)
+        exponent >>= 1
+        if exponent:
+            matrix = _matrix_product(matrix, matrix, modulus)
+    return result
+
+
+def _matrix_product(left: list, right: list, modulus: int) -> list:
+    columns = list(zip(*right))
+    return [[sum(x * y for x, y in zip(row, column)) % modulus for column in columns] for row in left]
@@ -1,196 +1,276 @@
 
+from array import array
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, NamedTuple, TextIO
 import re
 
-from src.core.bitarray import BitArray, b
+from src.core.bitarray import BitArray
+from src.core.image import _typecode, pack_words
 from src.core.store import Store
+from src.machines.imagecache import ImageCache
+from src.machines.instructionset import InstructionSet, Operand
+
+
+_SNP_LINE = re.compile(r"^\d+:")
+_ASM_LINE = re.compile(r"^\d+\s+\S")
+_TOKEN = re.compile(r"\S+")
+
+
+def _sniff(line: str) -> str | None:
+    """Format of the first significant line of a program, "asm", "snp" or None"""
+    if _SNP_LINE.match(line):
+        return "snp"
+    if _ASM_LINE.match(line):
+        return "asm"
+    return None
+
+
+_DEFAULT_CACHE = object()
 
 
 class AssemblerError(Exception):
-    pass
+
+    def __init__(self, message: str, diagnostics: list | None = None):
+        self.diagnostics = diagnostics or []
+        details = "".join(f"\n{diagnostic}" for diagnostic in self.diagnostics)
+        super().__init__(message + details)
+
+
+class Diagnostic(NamedTuple):
+    """Problem found in a program, located in its source"""
+
+    line: int
+    """Line number, from 1"""
+
+    column: int
+    """Column number, from 1"""
+
+    code: str
+    """Identifier of the kind of problem, e.g. "E102" for an invalid mnemonic"""
+
+    message: str
+    """Description of the problem"""
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.column}: {self.code} {self.message}"
+
+
+@dataclass
+class Assembly:
+    """Outcome of the assembly of a program, see Assembler.assemble"""
+
+    format: str | None
+    """Format of the source, "asm" or "snp", None when it could not be recognized"""
+
+    words: array
+    """Unsigned words of the store, zero where the program does not write"""
+
+    word_length: int
+    """Size of the words in bits"""
+
+    diagnostics: list = field(default_factory=list)
+    """Problems found, the words cannot be trusted if there is any"""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the program has been assembled without error"""
+        return not self.diagnostics
+
+    @property
+    def image(self) -> bytes:
+        """Words packed in a little-endian binary image, see pack_words"""
+        return pack_words(self.words, self.word_length)
 
 
 class Assembler:
     """Assembler for Manchester-like machines
+
+    Programs are either in assembly language (.asm), one instruction per line as
+    "ADDRESS MNEMONIC [DATA]", or in binary (.snp), one word per line as "ADDRESS: BITS"
+    with the least significant bit first. Comments start with ";".
+
+    The format is recognized from the first line that is not empty nor a comment, and the
+    source is read only once, line by line. Problems are collected as Diagnostics.
+
+    Programs loaded from files are kept assembled in an ImageCache, the default one unless
+    another one, or None, is given.
     """
 
-    def __init__(self, model):
+    def __init__(self, model, cache: ImageCache | None = _DEFAULT_CACHE):
         self.model = model
+        self.cache = ImageCache.default() if cache is _DEFAULT_CACHE else cache
+        self.instruction_set = InstructionSet.of(model)
 
-    def load_file(self, file: Path, store: Store):
-        """Load an assembly file into the given store
-        """
-        format = self._guess_file_format(file)
+    def assemble(self, lines: Iterable[str], format: str | None = None) -> Assembly:
+        """Assemble a program in a single pass
 
-        match format:
-            case "asm":
-                self.load_asm(file, store)
-            case "snp":
-                self.load_snp(file, store)
-            case _:
-                raise AssemblerError("File format not recognized")
+        Arguments:
+            lines: Lines of the program, e.g. an open text file
+            format: "asm" or "snp", recognized from the first significant line by default
 
-    def load_asm(self, file: Path, store: Store):
-        """Load assembly file
+        Returns:
+            The words of the store and the problems found
         """
-        store_tmp = Store(
-            word_length=store.word_length,
-            word_count=store.word_count
-        )
-
+        model = self.model
+        words = array(_typecode(model.word_length), [0]) * model.word_count
+        assembly = Assembly(format, words, model.word_length)
+        diagnostics = assembly.diagnostics
         counter = 0
-        error = False
-
-        with open(file, "r") as file:
-            for line in file:
-                # Cleaning
-                line = line[:-1].split(';')[0].strip()
-                if not line:
-                    continue
-
-                parts = line.split(' ')
-
-                # Address
-                try:
-                    address = int(parts[0])
-                    if address != counter:
-                        raise ValueError
-                except ValueError as ex:
-                    print(line)
-                    print(f"Error: invalid address, expected {counter:02d}\n")
-                    error = True
-
-                # Mnemonic
-                try:
-                    mnemonic = self.model.Mnemonic[parts[1]]
-                except KeyError:
-                    print(line)
-                    print(f"Error: invalid mnemonic '{parts[1]}'\n")
-                    error = True
-                except IndexError:
-                    print(line)
-                    print(f"Error: missing mnemonic\n")
-                    error = True
-
-                # Data
-                data = 0
-                if mnemonic in self.model.instructions_with_data:
-                    try:
-                        data = int(parts[2])
-
-                        if mnemonic in self.model.instructions_data_is_address:
-                            if not 0 <= data < store_tmp.word_count:
-                                raise ValueError()
-                    except IndexError:
-                        print(line)
-                        print(f"Error: missing data for '{mnemonic.name}' instruction\n")
-                        error = True
-                    except ValueError:
-                        print(line)
-                        print(f"Error: '{mnemonic.name}' instruction requires a valid address (from 0 to {store.word_count-1})\n")
-                        error = True
-
-                # Write the line to the store
-                word = BitArray(store_tmp.word_length)
-                if mnemonic == self.model.Mnemonic.NUM:
-                    # Write numerical value
-                    data_bits = BitArray.from_int(data, store_tmp.word_length)
-                    try:
-                        word.engrave(0, data_bits)
-                    except IndexError:
-                        print(line)
-                        print("Error: Not enough space to store binary value\n")
-                        error = True
-                else:
-                    # Write data
-                    data_bits = BitArray.from_int(data, self.model.address_length)
-                    try:
-                        word.engrave(self.model.address_start, data_bits)
-
-                        # Write op code
-                        word.engrave(self.model.opcode_start, mnemonic.value)
-                    except IndexError:
-                        print(line)
-                        print("Error: Not enough space to store binary value\n")
-                        error = True
-
-                try:
-                    store_tmp[counter] = word
-                except IndexError:
-                    print(line)
-                    print(f"Too many words for this machine (highest address is {store.word_count-1})\n")
-                    error = True
-
-                counter += 1
-
-        if error:
-            raise AssemblerError("Errors have been found in assembly program")
-
-        # Finally, write the store
-        for address, word in enumerate(store_tmp):
-            store[address] = word
-
-    def load_snp(self, file: Path, store: Store):
-        """Load binary file
+        number = 0
+
+        for number, line in enumerate(lines, 1):
+            code = line.split(";", 1)[0].rstrip()
+            tokens = [(match.group(), match.start() + 1) for match in _TOKEN.finditer(code)]
+            if not tokens:
+                continue
+
+            if assembly.format is None:
+                assembly.format = _sniff(code.strip())
+                if assembly.format is None:
+                    diagnostics.append(Diagnostic(number, tokens[0][1], "E001", "File format not recognized, expected 'ADDRESS MNEMONIC [DATA]' or 'ADDRESS: BITS'"))
+                    return assembly
+
+            if counter >= model.word_count:
+                diagnostics.append(Diagnostic(number, tokens[0][1], "E107", f"Too many words for this machine (highest address is {model.word_count - 1})"))
+                break
+
+            if assembly.format == "snp":
+                word = self._assemble_snp_line(code, number, counter, diagnostics)
+            else:
+                word = self._assemble_asm_line(tokens, number, counter, diagnostics)
+            if word is not None:
+                words[counter] = word
+            counter += 1
+
+        if assembly.format is None:
+            diagnostics.append(Diagnostic(max(number, 1), 1, "E001", "File format not recognized, the program is empty"))
+        return assembly
+
+    def _expect_address(self, token: tuple, number: int, counter: int, diagnostics: list):
+        """Check that a line starts with the address following the previous one"""
+        text, column = token
+        if not text.isdigit() or int(text) != counter:
+            diagnostics.append(Diagnostic(number, column, "E101", f"Invalid address '{text}', expected {counter:02d}"))
+
+    def _assemble_asm_line(self, tokens: list, number: int, counter: int, diagnostics: list) -> int | None:
+        """Word of an assembly line, None when it is invalid"""
+        model = self.model
+        instruction_set = self.instruction_set
+        self._expect_address(tokens[0], number, counter, diagnostics)
+
+        if len(tokens) < 2:
+            diagnostics.append(Diagnostic(number, tokens[0][1] + len(tokens[0][0]), "E103", "Missing mnemonic"))
+            return None
+        name, column = tokens[1]
+        try:
+            mnemonic = model.Mnemonic[name]
+        except KeyError:
+            diagnostics.append(Diagnostic(number, column, "E102", f"Invalid mnemonic '{name}'"))
+            return None
+
+        data = 0
+        kind = instruction_set.kinds[mnemonic]
+        if kind is not Operand.NONE:
+            if len(tokens) < 3:
+                diagnostics.append(Diagnostic(number, column + len(name), "E104", f"Missing data for '{mnemonic.name}' instruction"))
+                return None
+            text, column = tokens[2]
+            try:
+                data = int(text)
+            except ValueError:
+                data = None
+
+            if kind is Operand.ADDRESS:
+                if data is None or not 0 <= data < model.word_count:
+                    diagnostics.append(Diagnostic(number, column, "E105", f"'{mnemonic.name}' instruction requires a valid address (from 0 to {model.word_count - 1})"))
+                    return None
+            elif data is None or not -(1 << model.word_length) <= data < (1 << model.word_length):
+                diagnostics.append(Diagnostic(number, column, "E106", f"'{text}' is not a number that fits in {model.word_length} bits"))
+                return None
+
+        if mnemonic.value is None:
+            return data & ((1 << model.word_length) - 1)
+        return instruction_set.encode(mnemonic, data)
+
+    def _assemble_snp_line(self, code: str, number: int, counter: int, diagnostics: list) -> int | None:
+        """Word of a binary line, None when it is invalid"""
+        word_length = self.model.word_length
+        address, _, bits = code.partition(":")
+        column = len(address) - len(address.lstrip()) + 1
+        self._expect_address((address.strip(), column), number, counter, diagnostics)
+
+        tokens = [(match.group(), len(address) + 2 + match.start()) for match in _TOKEN.finditer(bits)]
+        if not tokens:
+            diagnostics.append(Diagnostic(number, len(code) + 1, "E202", "Missing word"))
+            return None
+        bits, column = tokens[0]
+        if bits.strip("01"):
+            diagnostics.append(Diagnostic(number, column, "E204", f"Invalid word '{bits}', expected only 0s and 1s"))
+            return None
+        if len(bits) != word_length:
+            diagnostics.append(Diagnostic(number, column, "E203", f"Word has a wrong length (got {len(bits)}, expected {word_length})"))
+            return None
+        return int(bits[::-1], 2)
+
+    def assemble_file(self, file: Path | TextIO, format: str | None = None) -> Assembly:
+        """Assemble a program from a file, given by its path or already open, see assemble"""
+        if hasattr(file, "read"):
+            return self.assemble(file, format)
+        with open(file, "r") as source:
+            return self.assemble(source, format)
+
+    def assemble_text(self, text: str, format: str | None = None) -> Assembly:
+        """Assemble a program held in a string, see assemble"""
+        return self.assemble(text.splitlines(), format)
+
+    def load(self, assembly: Assembly, store: Store):
+        """Write an assembled program into a store, all at once
+
+        Raises:
+            AssemblerError: if problems have been found in the program
         """
-        store_tmp = Store(
-            word_length=store.word_length,
-            word_count=store.word_count
-        )
+        if not assembly.ok:
+            raise AssemblerError("Errors have been found in assembly program", assembly.diagnostics)
+        store.write(0, assembly.words)
 
-        counter = 0
-        error = False
+    def load_file(self, file: Path | TextIO, store: Store):
+        """Load a program, in assembly language or binary, from a file into the given store
 
-        with open(file, "r") as file:
-            for line in file:
-                # Cleaning
-                line = line[:-1].split(';')[0].strip()
-                if not line:
-                    continue
+        Files given by their path go through the cache, if any: the source is read at once
+        and only assembled when its image is not found.
+        """
+        if self.cache is None or hasattr(file, "read"):
+            self.load(self.assemble_file(file), store)
+            return
+
+        with open(file, "rb") as input:
+            source = input.read()
+        key = self.cache.key(source, self.model)
+        words = self.cache.get(key, self.model)
+        if words is None:
+            assembly = self.assemble_text(source.decode())
+            self.load(assembly, store)
+            self.cache.put(key, assembly.words, self.model.word_length)
+        else:
+            store.write(0, words)
+
+    def load_text(self, text: str, store: Store):
+        """Load a program, in assembly language or binary, from a string into the given store"""
+        self.load(self.assemble_text(text), store)
+
+    def load_asm(self, file: Path | TextIO, store: Store):
+        """Load assembly file
+        """
+        self.load(self.assemble_file(file, "asm"), store)
 
-                parts = line.split(": ")
-
-                # Address
-                try:
-                    address = int(parts[0])
-                    if address != counter:
-                        raise ValueError
-                except ValueError:
-                    print(line)
-                    print(f"Error: invalid address, expected {counter:02d}\n")
-                    error = True
-
-                # Word
-                try:
-                    word = b(parts[1])
-                except IndexError:
-                    print(line)
-                    print(f"Error: missing word\n")
-                    error = True
-
-                if len(word) != store.word_length:
-                    print(line)
-                    print(f"Error: word has a wrong length (got {len(word)}, expected {store.word_length}\n")
-                    error = True
-
-                try:
-                    store_tmp[counter] = word
-                except IndexError:
-                    print(line)
-                    print(f"Too many words for this machine (highest address is {store.word_count-1})\n")
-                    error = True
-
-                counter += 1
-
-        if error:
-            raise AssemblerError("Errors have been found in assembly program")
-
-        # Finally, write the store
-        for address, word in enumerate(store_tmp):
-            store[address] = word
+    def load_snp(self, file: Path | TextIO, store: Store):
+        """Load binary file
+        """
+        self.load(self.assemble_file(file, "snp"), store)
 
     def _guess_file_format(self, file: Path) -> str:
-        """Open the file and try to guess its format from its content
+        """Open the file and guess its format from its first significant line
 
         Can distinguish binary representation (.snp file) from assembly (.asm file)
 
@@ -199,16 +279,9 @@ class Assembler:
         """
         with open(file, "r") as file:
             for line in file:
-                # Cleaning
-                line = line[:-1].split(';')[0].strip()
-                if not line:
-                    continue
-
-                if re.match("^\d+: [01]+$", line):
-                    return "snp"
-
-                if re.match("^\d+ \w+( \d+)?$", line):
-                    return "asm"
+                line = line.split(";", 1)[0].strip()
+                if line:
+                    return _sniff(line)
 
         return None
 
@@ -221,27 +294,88 @@ class Assembler:
         Returns:
             (command, data)
         """
-        try:
-            # Read operation code (e.g. on SSEM, bits 13, 14 and 15)
-            opcode = b(word[self.model.opcode_start:self.model.opcode_start+self.model.opcode_length])
-
-            ## Read data (e.g. on SSEM, bits 0, 1, 2, 3 and 4)
-            data = b(word[self.model.address_start:self.model.address_start+self.model.address_length]).to_unsigned_int()
-        except IndexError:
+        instruction_set = self.instruction_set
+        if len(word) < instruction_set.decoded_length:
             raise AssemblerError(f"Error: Cannot read instruction, the given word is too short")
 
-        try:
-            command = self.model.Mnemonic(opcode)
-        except ValueError:
+        opcode, data = instruction_set.decode(word.to_unsigned_int())
+        command = instruction_set.mnemonics[opcode]
+        if command is None:
             raise AssemblerError(f"Error: Opcode '{opcode}' not recognized")
 
-
         return (command, data)
 
-    def disassemble(self, store: Store) -> str:
-        """Produce an assembly string from the given store
-
-        It will try its best efforts to differentiate NUM to instructions, but does not guarranty a perfect result.
+    def dump_snp(self, store: Store) -> str:
+        """Produce a binary representation (.snp file) of the given store
         """
-        raise NotImplementedError
-
+        lines = [
+            f"{address:04d}: {''.join('1' if bit else '0' for bit in store[address])}\n"
+            for address in range(store.word_count)
+        ]
+        return "".join(lines)
+
+    def disassemble(self, store: Store, ci: int = 0) -> str:
+        """Produce an assembly program (.asm file) from the given store
+
+        The words that can be executed when the machine starts from a reset (CI at 0) or
+        from the given CI, following jumps and both outcomes of tests, are written as
+        instructions, and all the others as NUM. So are the instructions that would not
+        be assembled back into the same word, with unused bits set or an address out of
+        the store: loading the program always gives back the same store.
+
+        Code written by the program itself, or jumps through words it changes, cannot be
+        followed: the result is then only a best effort.
+        """
+        model = self.model
+        instruction_set = self.instruction_set
+        words = store.read()
+        word_count = len(words)
+        mnemonics = instruction_set.mnemonics
+        addressed = [operand is Operand.ADDRESS for operand in instruction_set.operands]
+        JMP, JRP, CMP, STP = (instruction_set.opcodes[model.Mnemonic[name]] for name in ("JMP", "JRP", "CMP", "STP"))
+        opcode_start = instruction_set.opcode_start
+        address_start = instruction_set.address_start
+        opcode_mask = instruction_set.opcode_mask
+        address_mask = instruction_set.address_mask
+        sign = 1 << (model.word_length - 1)
+        mask = (sign << 1) - 1
+
+        # Words reachable from the first instructions
+        code = bytearray(word_count)
+        pending = [1 % word_count, (ci + 1) % word_count]
+        while pending:
+            address = pending.pop()
+            while not code[address]:
+                code[address] = 1
+                word = words[address]
+                opcode = (word >> opcode_start) & opcode_mask
+                data = (word >> address_start) & address_mask
+                if opcode == JMP or opcode == JRP:
+                    if data >= word_count:
+                        break
+                    # CI is signed, as in the engines, which matters for store sizes that are not powers of two
+                    target = (words[data] + (address if opcode == JRP else 0)) & mask
+                    address = (((target ^ sign) - sign) + 1) % word_count
+                elif opcode == STP:
+                    break
+                else:
+                    if opcode == CMP:
+                        pending.append((address + 2) % word_count)
+                    address = (address + 1) % word_count
+
+        width = max(2, len(str(word_count - 1)))
+        lines = []
+        for address, word in enumerate(words):
+            if code[address]:
+                opcode = (word >> opcode_start) & opcode_mask
+                mnemonic = mnemonics[opcode]
+                if addressed[opcode]:
+                    data = (word >> address_start) & address_mask
+                    if data < word_count and word == (opcode << opcode_start | data << address_start):
+                        lines.append(f"{address:0{width}d} {mnemonic.name} {data}\n")
+                        continue
+                elif mnemonic is not None and word == opcode << opcode_start:
+                    lines.append(f"{address:0{width}d} {mnemonic.name}\n")
+                    continue
+            lines.append(f"{address:0{width}d} NUM {(word ^ sign) - sign}\n")
+        return "".join(lines)
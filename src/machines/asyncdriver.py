@@ -0,0 +1,65 @@
+
+from time import perf_counter
+from typing import Optional
+
+from src.machines.abstractmachine import CycleBudgetExceeded, RunResult, StopReason
+from src.machines.loopdetector import Loop
+from src.machines.pacer import Pacer
+
+
+async def run(machine, max_cycles: Optional[int] = None, strict: bool = False,
+              slice_duration: float = 0.01, max_lag: float = 0.05) -> RunResult:
+    """Run a machine at its speed within an asyncio event loop
+
+    The instructions are executed in batches by a Pacer (see Pacer), the event loop being
+    free to run other tasks between two batches. Many machines, each one at its own speed,
+    can then share a single thread. Since they all run on the thread of the event loop,
+    other tasks can read and change the machines between two batches without any lock.
+
+    The run ends at the first stop instruction, breakpoint or endless loop detected (see
+    Ssem.enable_loop_detection), or when max_cycles is reached. Cancelling
+    the task running it stops the machine after the current batch.
+
+    Arguments:
+        machine: Machine to run, see Ssem
+        max_cycles: Maximum number of cycles to perform, no limit by default
+        strict: Raise CycleBudgetExceeded instead of returning when max_cycles is reached
+        slice_duration: Time between two batches of instructions, in seconds
+        max_lag: Delay after which instructions not executed in time are dropped, in seconds
+
+    Returns:
+        The number of cycles performed, why the run ended, the final CI and A and timings
+    """
+    pacer = Pacer(machine, slice_duration=slice_duration, max_lag=max_lag)
+    executed = 0
+    reason = StopReason.BUDGET
+    start = perf_counter()
+    machine.last_break = None
+
+    try:
+        while max_cycles is None or executed < max_cycles:
+            limit = None if max_cycles is None else max_cycles - executed
+            executed += await pacer.step_async(limit=limit)
+
+            if machine.stop_flag:
+                if machine.last_break is None:
+                    reason = StopReason.STOP
+                else:
+                    reason = StopReason.LOOP if isinstance(machine.last_break, Loop) else StopReason.BREAK
+                break
+    finally:
+        machine.stop_flag = True
+
+    result = RunResult(
+        cycles=executed,
+        stop_reason=reason,
+        ci=machine.ci.to_int(),
+        a=machine.a.to_int(),
+        wall_time=perf_counter() - start,
+        loop=machine.last_break if reason == StopReason.LOOP else None,
+    )
+
+    if strict and reason == StopReason.BUDGET:
+        raise CycleBudgetExceeded(result)
+
+    return result
@@ -0,0 +1,120 @@
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from glob import glob
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+import math
+import os
+
+from src.machines.assembler import Assembler, Diagnostic
+from src.machines.ssemmodel import SsemModel
+
+
+SUFFIXES = (".asm", ".snp")
+"""Suffixes of the programs found in directories"""
+
+
+class BatchResult(NamedTuple):
+    """Outcome of the assembly of one program of a batch"""
+
+    file: Path
+    """Program assembled"""
+
+    format: str | None
+    """Format of the program, "asm" or "snp", None when it could not be recognized"""
+
+    diagnostics: list
+    """Problems found, see Diagnostic"""
+
+    image: bytes | None
+    """Words of the store packed as by pack_words, None when there are problems"""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the program has been assembled without error"""
+        return not self.diagnostics
+
+    def to_dict(self) -> dict:
+        """Result as plain values, for a JSON report"""
+        return {
+            "file": str(self.file),
+            "format": self.format,
+            "ok": self.ok,
+            "diagnostics": [diagnostic._asdict() for diagnostic in self.diagnostics],
+        }
+
+
+def find_programs(patterns: Iterable) -> list:
+    """Programs designated by paths, directories or glob patterns, without duplicates
+
+    Directories are searched recursively for .asm and .snp files, glob patterns (which may
+    use ** to go through directories) are expanded, and other paths are taken as they are.
+    """
+    files = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            files += sorted(file for file in path.rglob("*") if file.suffix in SUFFIXES and file.is_file())
+        elif any(character in str(pattern) for character in "*?["):
+            files += sorted(Path(file) for file in glob(str(pattern), recursive=True) if Path(file).is_file())
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+
+def assemble_batch(files: list, model=SsemModel, workers: int | None = None,
+                   chunk_size: int | None = None) -> Iterator[BatchResult]:
+    """Assemble many programs in parallel worker processes
+
+    The workers are started once and each one keeps its Assembler for all the files it
+    is given, in chunks. Results are produced as soon as their chunk is done, in no
+    particular order.
+
+    Arguments:
+        files: Programs to assemble (.asm or .snp)
+        model: Model of machine the programs are written for, SsemModel by default
+        workers: Number of worker processes, one per CPU by default
+        chunk_size: Number of files sent to a worker at once, by default the files are
+            split in 4 chunks per worker, of at most 16 files
+
+    Yields:
+        The result of each file, see BatchResult
+    """
+    files = [Path(file) for file in files]
+    if not files:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    chunk_size = chunk_size or max(1, min(16, math.ceil(len(files) / (workers * 4))))
+    chunks = [files[start:start + chunk_size] for start in range(0, len(files), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(model,)) as executor:
+        futures = [executor.submit(_assemble_files, chunk) for chunk in chunks]
+        try:
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+_assembler = None
+"""Assembler of a worker process, see _start_worker"""
+
+
+def _start_worker(model):
+    global _assembler
+    _assembler = Assembler(model, cache=None)
+
+
+def _assemble_files(files: list) -> list:
+    """Assemble files in a worker process"""
+    results = []
+    for file in files:
+        try:
+            with open(file, "r") as source:
+                assembly = _assembler.assemble(source)
+        except (OSError, UnicodeDecodeError) as ex:
+            results.append(BatchResult(file, None, [Diagnostic(0, 0, "E002", f"Cannot read file: {ex}")], None))
+            continue
+        results.append(BatchResult(file, assembly.format, assembly.diagnostics, assembly.image if assembly.ok else None))
+    return results
@@ -0,0 +1,279 @@
+
+import ast
+
+from src.machines.instructionset import InstructionSet
+from src.machines.observer import Observer
+
+
+class Condition:
+    """Predicate on the state of a machine, written as a Python expression
+
+    The expression can use A and CI, and the words of the store as store[address], all as
+    signed integers, with comparisons, arithmetic and boolean operators. For example:
+    "A < 0", "store[31] == 46" or "A == 0 and store[29] > 10".
+
+    The expression is checked and compiled once. The names and addresses it depends on are
+    known, so that it is only evaluated when they may have changed.
+    """
+
+    _nodes = (
+        ast.Expression, ast.Compare, ast.BoolOp, ast.UnaryOp, ast.BinOp, ast.Name, ast.Subscript,
+        ast.Constant, ast.Load, ast.And, ast.Or, ast.Not, ast.USub, ast.UAdd, ast.Invert,
+        ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod, ast.BitAnd, ast.BitOr, ast.BitXor,
+        ast.LShift, ast.RShift, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    )
+    """Syntax allowed in an expression"""
+
+    def __init__(self, text: str):
+        self.text = text.strip()
+        try:
+            tree = ast.parse(self.text, mode="eval")
+        except SyntaxError:
+            raise ValueError(f"Invalid condition '{self.text}'")
+
+        self.uses_a = False
+        self.uses_ci = False
+        addresses = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, self._nodes):
+                raise ValueError(f"Unsupported syntax in condition '{self.text}'")
+            if isinstance(node, ast.Constant) and type(node.value) is not int:
+                raise ValueError(f"Only integers are allowed in condition '{self.text}'")
+            if isinstance(node, ast.Name):
+                if node.id not in ("A", "CI", "store"):
+                    raise ValueError(f"Unknown name '{node.id}' in condition '{self.text}', use A, CI or store[address]")
+                self.uses_a |= node.id == "A"
+                self.uses_ci |= node.id == "CI"
+            if isinstance(node, ast.Subscript):
+                if not (isinstance(node.value, ast.Name) and node.value.id == "store"
+                        and isinstance(node.slice, ast.Constant)):
+                    raise ValueError(f"Only store[address] can be indexed in condition '{self.text}'")
+                addresses.add(node.slice.value)
+            if isinstance(node, ast.Name) and node.id == "store" and not any(
+                isinstance(parent, ast.Subscript) and parent.value is node for parent in ast.walk(tree)
+            ):
+                raise ValueError(f"store must be indexed by an address in condition '{self.text}'")
+
+        self.addresses = frozenset(addresses)
+        self._code = compile(tree, f"<condition {self.text}>", "eval")
+
+    def __call__(self, machine) -> bool:
+        """Evaluate the condition on the current state of the machine"""
+        sign = 1 << (machine.model.word_length - 1)
+        ci, a = machine._registers()
+        store = {address: (machine._word(address) ^ sign) - sign for address in self.addresses}
+        namespace = {"A": (a ^ sign) - sign, "CI": ci, "store": store}
+        try:
+            return bool(eval(self._code, {"__builtins__": {}}, namespace))
+        except ArithmeticError:
+            return False
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class Breakpoint:
+    """Stops the machine before it executes the instruction at an address"""
+
+    def __init__(self, address: int, condition: Condition | str | None = None):
+        """
+        Arguments:
+            address: Address of the instruction
+            condition: Only stop when this condition is true, see Condition
+        """
+        self.address = address
+        self.condition = Condition(condition) if isinstance(condition, str) else condition
+        self.number = None
+
+    def __str__(self) -> str:
+        description = f"break at {self.address:02d}"
+        if self.condition:
+            description += f" if {self.condition}"
+        return description
+
+
+class Watchpoint:
+    """Stops the machine after an instruction reads or writes a word of the store"""
+
+    def __init__(self, address: int, read: bool = True, write: bool = True, condition: Condition | str | None = None):
+        """
+        Arguments:
+            address: Address of the word
+            read: Stop after the instructions reading the word (LDN, SUB, JMP, JRP)
+            write: Stop after the instructions writing the word (STO)
+            condition: Only stop when this condition is true, see Condition
+        """
+        if not read and not write:
+            raise ValueError("A watchpoint watches reads, writes or both")
+        self.address = address
+        self.read = read
+        self.write = write
+        self.condition = Condition(condition) if isinstance(condition, str) else condition
+        self.number = None
+
+    def __str__(self) -> str:
+        access = "read/write" if self.read and self.write else "read" if self.read else "write"
+        description = f"watch {self.address:02d} ({access})"
+        if self.condition:
+            description += f" if {self.condition}"
+        return description
+
+
+class ConditionalBreak:
+    """Stops the machine as soon as a condition becomes true
+
+    The condition is only evaluated after the instructions that may change its value: LDN
+    and SUB for A, STO at the addresses it reads, any instruction for CI.
+    """
+
+    def __init__(self, condition: Condition | str):
+        self.condition = Condition(condition) if isinstance(condition, str) else condition
+        self.number = None
+        self._was_true = False
+
+    def __str__(self) -> str:
+        return f"break if {self.condition}"
+
+    def check(self, machine) -> bool:
+        """Evaluate the condition, True when it has just become true"""
+        is_true = self.condition(machine)
+        became_true = is_true and not self._was_true
+        self._was_true = is_true
+        return became_true
+
+
+def parse_breakpoint(text: str):
+    """Create a breakpoint from a command
+
+    Commands are "break ADDRESS", "watch ADDRESS" or "break if CONDITION". A watchpoint
+    watches reads and writes, unless "read" or "write" follows its address. The first two
+    can be followed by "if CONDITION". For example: "break 7 if A < 0", "watch 31 write"
+    or "break if store[31] == 46".
+
+    Returns:
+        A Breakpoint, a Watchpoint or a ConditionalBreak
+    """
+    command, _, rest = text.strip().partition(" ")
+    target, _, condition = (" " + rest.strip()).partition(" if ")
+    words = target.split()
+    condition = condition.strip() or None
+
+    if command == "break" and not words:
+        if condition is None:
+            raise ValueError("Missing address or condition, e.g. 'break 7' or 'break if A < 0'")
+        return ConditionalBreak(condition)
+
+    if command not in ("break", "watch") or not words or not words[0].isdigit():
+        raise ValueError(f"Invalid command '{text.strip()}', expected 'break ADDRESS', 'watch ADDRESS' or 'break if CONDITION'")
+    address = int(words[0])
+
+    if command == "break":
+        if len(words) > 1:
+            raise ValueError(f"Unexpected '{' '.join(words[1:])}' after the address")
+        return Breakpoint(address, condition)
+
+    access = words[1:]
+    if access not in ([], ["read"], ["write"]):
+        raise ValueError(f"Expected 'read' or 'write' after the address, got '{' '.join(access)}'")
+    return Watchpoint(address, read=access != ["write"], write=access != ["read"], condition=condition)
+
+
+class Breakpoints(Observer):
+    """Breakpoints, watchpoints and conditional breaks of a machine
+
+    They are indexed by address and operation code when added, so that each instruction
+    only costs a couple of lookups, and conditions are only evaluated where they matter.
+
+    The breakpoints are checked by a machine on which they have been set, see
+    Ssem.add_breakpoint. They are only changed by the thread running the machine, but can
+    be iterated from any other one: each change replaces the list of breakpoints instead
+    of modifying it, so that iterating always goes through a consistent snapshot.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        instruction_set = InstructionSet.of(model)
+        self._sto = instruction_set.opcodes[model.Mnemonic.STO]
+        self._reading = instruction_set.opcodes_of("JMP", "JRP", "LDN", "SUB")
+        self._changing_a = instruction_set.opcodes_of("LDN", "SUB")
+        self._all = ()
+        self._numbers = 0
+        self._index()
+
+    def __iter__(self):
+        """Breakpoints in the order they have been added"""
+        return iter(self._all)
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def add(self, breakpoint):
+        """Add a Breakpoint, a Watchpoint or a ConditionalBreak, and give it a number"""
+        self._numbers += 1
+        breakpoint.number = self._numbers
+        self._all += (breakpoint,)
+        self._index()
+        return breakpoint
+
+    def remove(self, breakpoint):
+        """Remove a breakpoint, given as an object or by number"""
+        if isinstance(breakpoint, int):
+            matching = [candidate for candidate in self._all if candidate.number == breakpoint]
+            if not matching:
+                raise KeyError(f"No breakpoint number {breakpoint}")
+            breakpoint = matching[0]
+        if breakpoint not in self._all:
+            raise KeyError(f"No breakpoint {breakpoint}")
+        self._all = tuple(candidate for candidate in self._all if candidate is not breakpoint)
+        self._index()
+
+    def _index(self):
+        """Sort the breakpoints by the address or the instruction that triggers them"""
+        self._at = {}
+        self._reads = {}
+        self._writes = {}
+        self._after_a = []
+        self._after_any = []
+        for breakpoint in self._all:
+            if isinstance(breakpoint, Breakpoint):
+                self._at.setdefault(breakpoint.address, []).append(breakpoint)
+            elif isinstance(breakpoint, Watchpoint):
+                if breakpoint.read:
+                    self._reads.setdefault(breakpoint.address, []).append(breakpoint)
+                if breakpoint.write:
+                    self._writes.setdefault(breakpoint.address, []).append(breakpoint)
+            else:
+                condition = breakpoint.condition
+                if condition.uses_ci:
+                    self._after_any.append(breakpoint)
+                    continue
+                if condition.uses_a:
+                    self._after_a.append(breakpoint)
+                for address in condition.addresses:
+                    self._writes.setdefault(address, []).append(breakpoint)
+
+    def before_cycle(self, machine, address: int, opcode: int, data: int):
+        for breakpoint in self._at.get(address, ()):
+            if breakpoint.condition is None or breakpoint.condition(machine):
+                return breakpoint
+        return None
+
+    def after_cycle(self, machine, address: int, opcode: int, data: int,
+                    previous_ci: int, previous_a: int, a: int, overwritten: int | None):
+        candidates = []
+        if opcode == self._sto:
+            candidates += self._writes.get(data, ())
+        elif opcode in self._reading:
+            candidates += self._reads.get(data, ())
+        if opcode in self._changing_a:
+            candidates += self._after_a
+        candidates += self._after_any
+
+        fired = None
+        for breakpoint in candidates:
+            if isinstance(breakpoint, ConditionalBreak):
+                if breakpoint.check(machine) and fired is None:
+                    fired = breakpoint
+            elif fired is None and (breakpoint.condition is None or breakpoint.condition(machine)):
+                fired = breakpoint
+        return fired
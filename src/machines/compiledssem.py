@@ -0,0 +1,273 @@
+
+from pathlib import Path
+
+from src.core.intstore import IntStore
+from src.machines.fastssem import FastSsem
+from src.machines.ssemmodel import SsemModel
+
+
+class CompiledSsem(FastSsem):
+    """Simulator for the SSEM compiling straight-line code to Python functions
+
+    A block is a run of consecutive instructions up to the next jump, test or stop
+    instruction. The first time the machine fetches an instruction, the block starting
+    there is translated to Python source, compiled and kept for the next times.
+
+    Compiling a block takes as long as interpreting a few thousand instructions: the
+    machine only starts compiling once it has run warm_up_cycles cycles with the loop of
+    FastSsem, so that short programs are not slowed down.
+
+    Programs can modify their own instructions: blocks are forgotten as soon as one of the
+    words they cover is written, either by a STO instruction or from outside. Blocks that
+    the program itself keeps rewriting are not compiled anymore, their instructions are
+    interpreted.
+    """
+
+    warm_up_cycles = 100_000
+    """Number of cycles interpreted before blocks are compiled"""
+
+    max_recompilations = 8
+    """Number of times a block can be recompiled before its start is left to the interpreter"""
+
+    max_cached_functions = 4096
+    """Number of compiled functions kept for code coming back to a previous content"""
+
+    _INTERPRETED = object()
+    """Marks a block start left to the interpreter"""
+
+    def __init__(self, file: Path | None = None, model: type = SsemModel):
+        super().__init__(file, model)
+
+        # Compiled blocks by start address, as (function, length, stops, last instruction)
+        self._blocks = [None] * self.model.word_count
+        # Start addresses of the blocks covering each address
+        self._covering = [set() for _ in range(self.model.word_count)]
+        self._recompilations = [0] * self.model.word_count
+        self._warm_cycles = 0
+        # Compiled functions by instructions, reused when the same code is compiled again
+        self._functions = {}
+        self._store.watch(self._forget)
+
+    @property
+    def store(self) -> IntStore:
+        return self._store
+
+    @store.setter
+    def store(self, store: IntStore):
+        previous = getattr(self, "_store", None)
+        FastSsem.store.fset(self, store)
+        if hasattr(self, "_blocks"):
+            previous.unwatch(self._forget)
+            store.watch(self._forget)
+            self._forget(0, store.word_count)
+
+    @property
+    def compiled_blocks(self) -> int:
+        """Number of blocks currently compiled"""
+        return sum(1 for block in self._blocks if block is not None and block is not self._INTERPRETED)
+
+    def instruction_cycles(self, count: int) -> int:
+        """Performs up to the given number of instruction cycles
+
+        The machine is considered running in the meantime: the stop flag is cleared first,
+        and the cycles end early when a stop instruction is met.
+
+        Returns:
+            The number of cycles performed
+        """
+        executed = 0
+        if self._warm_cycles < self.warm_up_cycles:
+            # No block compiled yet: the stores need not be checked
+            executed = FastSsem.instruction_cycles(self, min(count, self.warm_up_cycles - self._warm_cycles))
+            self._warm_cycles += executed
+            if self.stop_flag or executed == count:
+                return executed
+
+        blocks = self._blocks
+        words = self._store.words
+        word_count = self.model.word_count
+        interpreted = self._INTERPRETED
+        ci = self._ci
+        a = self._a
+        last_fetch = self._last_fetch
+        compiled = 0
+        self.stop_flag = False
+
+        try:
+            while executed < count:
+                start = (ci + 1) % word_count
+                block = blocks[start]
+                if block is None:
+                    block = self._compile_block(start)
+
+                if block is interpreted or count - executed < block[1]:
+                    # Not enough cycles left to run the longest path of the block, or code rewritten too often
+                    self._ci, self._a = ci, a
+                    try:
+                        executed += self._interpret(1)
+                    finally:
+                        ci, a, last_fetch = self._ci, self._a, self._last_fetch
+                    if self.stop_flag:
+                        break
+                    continue
+
+                ci, a, cycles, last_fetch = block[0](words, a, count - executed)
+                executed += cycles
+                compiled += cycles
+
+        finally:
+            self._ci = ci
+            self._a = a
+            self._last_fetch = last_fetch
+            self._last_cycle += compiled
+
+        return executed
+
+    def _record_cycles(self, count: int, records: list) -> int:
+        """Performs instruction cycles with the recording interpreter, forgetting the blocks overwritten"""
+        sto = self._opcodes[self.model.Mnemonic.STO]
+        start = len(records)
+        try:
+            return FastSsem._record_cycles(self, count, records)
+        finally:
+            for index in range(start + 1, len(records), 4):
+                if records[index] == sto:
+                    data = records[index + 1]
+                    self._invalidate(data, data + 1)
+
+    def _interpret(self, count: int) -> int:
+        """Performs instruction cycles with the interpreter, forgetting the blocks overwritten"""
+        sto = self._opcodes[self.model.Mnemonic.STO]
+        executed = FastSsem.instruction_cycles(self, count)
+        _, opcode, data = self._last_fetch
+        if opcode == sto:
+            self._invalidate(data, data + 1)
+        return executed
+
+    def _invalidate(self, start: int, stop: int):
+        """Forget the blocks covering the words from start to stop, overwritten by the program itself"""
+        for address in range(start, stop):
+            for block_start in self._covering[address]:
+                if self._blocks[block_start] is not None:
+                    self._recompilations[block_start] += 1
+        self._forget(start, stop)
+
+    def _forget(self, start: int, stop: int):
+        """Forget the blocks covering the words from start to stop"""
+        for address in range(start, stop):
+            for block_start in self._covering[address]:
+                self._blocks[block_start] = None
+            self._covering[address].clear()
+
+    def _compile_block(self, start: int):
+        """Translate the block starting at the given address into a Python function
+
+        The block goes on through the tests, which become early exits, and ends with the
+        next jump. When the jump leads back to the start of the block, the function keeps
+        looping as long as the cycle budget allows another full pass.
+
+        The function takes the store, A and the cycle budget, and returns CI, A, the number
+        of cycles performed and the last instruction executed.
+
+        Returns:
+            (function, length of the longest path) or _INTERPRETED when the first
+            instruction cannot be compiled or the block keeps being rewritten
+        """
+        words = self._store.words
+        word_count, modulus, mask, sign, \
+            opcode_start, opcode_mask, address_start, address_mask, \
+            JMP, JRP, LDN, STO, SUB, SUB2, CMP, STP = self._constants
+
+        if self._recompilations[start] > self.max_recompilations:
+            self._blocks[start] = self._INTERPRETED
+            self._covering[start].add(start)
+            return self._INTERPRETED
+
+        # Find the instructions of the block, up to the next jump
+        instructions = []
+        address = start
+        while address < word_count:
+            word = words[address]
+            opcode = (word >> opcode_start) & opcode_mask
+            data = (word >> address_start) & address_mask
+            if data >= word_count or self._mnemonics[opcode] is None or opcode == STP:
+                # Left to the interpreter, which stops the machine or reports the error
+                break
+            instructions.append((address, opcode, data))
+            address += 1
+            if opcode in (JMP, JRP):
+                break
+
+        if not instructions:
+            self._blocks[start] = self._INTERPRETED
+            self._covering[start].add(start)
+            return self._INTERPRETED
+
+        length = len(instructions)
+        key = tuple(instructions)
+        function = self._functions.get(key)
+        if function is None:
+            function = self._generate_function(instructions)
+            if len(self._functions) >= self.max_cached_functions:
+                self._functions.clear()
+            self._functions[key] = function
+
+        block = (function, length)
+        self._blocks[start] = block
+        for covered in range(start, start + length):
+            self._covering[covered].add(start)
+
+        return block
+
+    def _generate_function(self, instructions: list):
+        """Compile the Python function executing the given instructions, see _compile_block"""
+        word_count, modulus, mask, sign, \
+            opcode_start, opcode_mask, address_start, address_mask, \
+            JMP, JRP, LDN, STO, SUB, SUB2, CMP, STP = self._constants
+
+        start = instructions[0][0]
+        length = len(instructions)
+        constants = {}
+        lines = [
+            f"def block_{start:02d}(words, a, budget):",
+            f"    cycles = 0",
+            f"    while True:",
+        ]
+        for position, (address, opcode, data) in enumerate(instructions, start=1):
+            fetch = f"fetch_{address:02d}"
+            constants[fetch] = (address, opcode, data)
+
+            lines.append(f"        # {address:02d} {self._mnemonics[opcode].name} {data:02d}")
+            if opcode == LDN:
+                lines.append(f"        a = -words[{data}] & {mask}")
+            elif opcode == SUB or opcode == SUB2:
+                lines.append(f"        a = (a - words[{data}]) & {mask}")
+            elif opcode == STO:
+                # Leave as soon as some compiled code is overwritten
+                lines.append(f"        words[{data}] = a")
+                lines.append(f"        if covering[{data}]:")
+                lines.append(f"            invalidate({data}, {data + 1})")
+                lines.append(f"            return {address}, a, cycles + {position}, {fetch}")
+            elif opcode == CMP:
+                lines.append(f"        if a & {sign}:")
+                lines.append(f"            return {address + 1}, a, cycles + {position}, {fetch}")
+            elif opcode == JMP:
+                lines.append(f"        ci = words[{data}]")
+            elif opcode == JRP:
+                lines.append(f"        ci = ({address} + words[{data}]) & {mask}")
+
+        last_address, last_opcode, _ = instructions[-1]
+        if last_opcode in (JMP, JRP):
+            lines.append(f"        if ci & {sign}:")
+            lines.append(f"            ci -= {modulus}")
+        else:
+            # Stopped before the end of the store or an instruction left to the interpreter
+            lines.append(f"        ci = {last_address}")
+        lines.append(f"        cycles += {length}")
+        lines.append(f"        if (ci + 1) % {word_count} != {start} or cycles + {length} > budget:")
+        lines.append(f"            return ci, a, cycles, fetch_{last_address:02d}")
+
+        namespace = {"covering": self._covering, "invalidate": self._invalidate, **constants}
+        exec(compile("\n".join(lines), f"<block {start:02d}>", "exec"), namespace)
+
+        return namespace[f"block_{start:02d}"]
@@ -0,0 +1,85 @@
+
+from collections import deque
+from threading import Condition, Event
+from typing import Optional
+
+
+class MachineControl:
+    """Channel to drive a machine running in its own thread from other threads
+
+    Commands are queued and applied by the machine thread between two batches of
+    instructions, so they never interfere with an instruction being executed. Each
+    command returns an Event set once it has been applied.
+
+    A stopped machine waits on the channel and is woken up by the next command.
+    """
+
+    def __init__(self):
+        self._condition = Condition()
+        self._commands = deque()
+
+    def _send(self, name: str, value=None) -> Event:
+        done = Event()
+        with self._condition:
+            self._commands.append((name, value, done))
+            self._condition.notify_all()
+        return done
+
+    def run(self) -> Event:
+        """Resume the execution"""
+        return self._send("run")
+
+    def stop(self) -> Event:
+        """Stop the execution"""
+        return self._send("stop")
+
+    def toggle(self) -> Event:
+        """Resume the execution if the machine is stopped, stop it otherwise"""
+        return self._send("toggle")
+
+    def step(self, count: int = 1) -> Event:
+        """Stop the execution, then perform the given number of instruction cycles"""
+        return self._send("step", count)
+
+    def step_back(self, count: int = 1) -> Event:
+        """Stop the execution, then undo the given number of instruction cycles (see Ssem.step_back)"""
+        return self._send("back", count)
+
+    def reset(self) -> Event:
+        """Reset the program counter and the accumulator"""
+        return self._send("reset")
+
+    def set_speed(self, speed: int) -> Event:
+        """Change the target speed, in instructions per second"""
+        return self._send("speed", speed)
+
+    def call(self, function) -> Event:
+        """Call a function with the machine as argument, e.g. to change its breakpoints safely"""
+        return self._send("call", function)
+
+    def quit(self) -> Event:
+        """End the thread running the machine"""
+        return self._send("quit")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a command to be sent
+
+        Arguments:
+            timeout: Maximum time to wait in seconds, forever by default
+
+        Returns:
+            True if a command is pending
+        """
+        with self._condition:
+            return bool(self._condition.wait_for(lambda: self._commands, timeout))
+
+    def take(self) -> list:
+        """Remove the pending commands from the channel
+
+        Returns:
+            A list of (name, value, done event)
+        """
+        with self._condition:
+            commands = list(self._commands)
+            self._commands.clear()
+        return commands
@@ -0,0 +1,14 @@
+
+from src.machines.acceleratedssem import AcceleratedSsem
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+
+
+ENGINES = {
+    "reference": Ssem,
+    "fast": FastSsem,
+    "compiled": CompiledSsem,
+    "accelerated": AcceleratedSsem,
+}
+"""Execution engines by name, e.g. for the --engine option of the simulator"""
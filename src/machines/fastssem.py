@@ -0,0 +1,120 @@
+
+from pathlib import Path
+
+from src.core.bitarray import BitArray
+from src.core.intstore import IntStore
+from src.machines.specialization import specialized_cycles
+from src.machines.ssem import Ssem
+from src.machines.ssemmodel import SsemModel
+
+
+class FastSsem(Ssem):
+    """Simulator for the SSEM executing on plain integers
+
+    Behaves exactly like Ssem, but CI, A and the store are kept as integers masked to the
+    word length. BitArrays are only built when ci, a or the words of the store are read.
+
+    CI is kept signed, as the original fetch works on its signed value, while A and the
+    words of the store are kept unsigned.
+
+    The execution loop is generated for the model of the machine, its constants written
+    in the code, see specialization.specialized_cycles.
+    """
+
+    store_class = IntStore
+
+    def __init__(self, file: Path | None = None, model: type = SsemModel):
+        self._ci = 0
+        self._a = 0
+        self._last_fetch = None
+
+        super().__init__(file, model)
+
+        model = self.model
+        instruction_set = self.instruction_set
+        self._modulus = 1 << model.word_length
+        self._mask = self._modulus - 1
+        self._sign = 1 << (model.word_length - 1)
+
+        # Everything the execution loop needs, unpacked at once into local variables
+        self._constants = (
+            model.word_count, self._modulus, self._mask, self._sign,
+            instruction_set.opcode_start, instruction_set.opcode_mask,
+            instruction_set.address_start, instruction_set.address_mask,
+            *(self._opcodes[model.Mnemonic[name]] for name in ("JMP", "JRP", "LDN", "STO", "SUB", "SUB2", "CMP", "STP")),
+        )
+        self._specialized_cycles = specialized_cycles(model)
+
+    @property
+    def ci(self) -> BitArray:
+        return BitArray.from_int(self._ci, self.model.word_length)
+
+    @ci.setter
+    def ci(self, value: BitArray):
+        self._ci = value.to_int()
+
+    @property
+    def a(self) -> BitArray:
+        return BitArray.from_int(self._a, self.model.word_length)
+
+    @a.setter
+    def a(self, value: BitArray):
+        self._a = value.to_unsigned_int()
+
+    @property
+    def store(self) -> IntStore:
+        return self._store
+
+    @store.setter
+    def store(self, store: IntStore):
+        if not isinstance(store, IntStore):
+            raise TypeError(f"{self.__class__.__name__} requires an IntStore, got {type(store).__name__}")
+        self._store = store
+
+    @property
+    def last_instruction(self) -> str:
+        if self._last_fetch is None:
+            return ""
+        address, opcode, data = self._last_fetch
+        return f"{address:02d} {self._mnemonics[opcode].name} {data:02d}"
+
+    def _registers(self) -> tuple:
+        return self._ci, self._a
+
+    def _instruction(self, address: int) -> tuple:
+        return self.instruction_set.decode(self._store.words[address])
+
+    def _word(self, address: int) -> int:
+        return self._store.words[address]
+
+    def _restore(self, ci: int, a: int, cycle: int):
+        self._ci = ci
+        self._a = a
+        self._last_cycle = cycle
+
+    def _set_last_fetch(self, fetch: tuple | None):
+        self._last_fetch = fetch
+
+    def instruction_cycle(self) -> str:
+        """Performs one instruction cycle
+
+        It first increments the program counter, then decodes the next instruction and executes it.
+        """
+        stopped = self.stop_flag
+        self.instruction_cycles(1)
+        self.stop_flag = self.stop_flag or stopped
+        return self.last_instruction
+
+    def instruction_cycles(self, count: int) -> int:
+        """Performs up to the given number of instruction cycles
+
+        The machine is considered running in the meantime: the stop flag is cleared first,
+        and the cycles end early when a stop instruction is met.
+
+        Returns:
+            The number of cycles performed
+        """
+        return self._specialized_cycles(self, count)
+
+    def _record_cycles(self, count: int, records: list) -> int:
+        return specialized_cycles(self.model, recording=True)(self, count, records)
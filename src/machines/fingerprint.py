@@ -0,0 +1,43 @@
+
+
+class Fingerprint:
+    """Hash of the state of a machine: CI, A and the words of the store
+
+    The hash of the store is the exclusive or of the hashes of its words, each one mixed
+    with its address, so that writing a word only updates two terms instead of hashing
+    the whole store again. The fingerprint of the whole state then costs a single hash
+    per cycle.
+
+    Equal states have equal fingerprints. Different states almost always have different
+    ones, but they must still be compared to prove that they are equal.
+    """
+
+    def __init__(self, words: list):
+        """
+        Arguments:
+            words: Unsigned values of the words of the store
+        """
+        self._terms = [hash((address, word)) for address, word in enumerate(words)]
+        self._store = 0
+        for term in self._terms:
+            self._store ^= term
+
+    @property
+    def store(self) -> int:
+        """Fingerprint of the store alone"""
+        return self._store
+
+    def write(self, address: int, word: int):
+        """Update the fingerprint after a word has been written
+
+        Arguments:
+            address: Address of the word
+            word: Unsigned value written
+        """
+        term = hash((address, word))
+        self._store ^= self._terms[address] ^ term
+        self._terms[address] = term
+
+    def state(self, ci: int, a: int) -> int:
+        """Fingerprint of the whole state of the machine, given its CI and A"""
+        return hash((ci, a, self._store))
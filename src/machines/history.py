@@ -0,0 +1,176 @@
+
+from array import array
+from collections import deque
+from typing import NamedTuple
+
+from src.machines.instructionset import InstructionSet
+from src.machines.observer import Observer
+from src.machines.ssemmodel import SsemModel
+
+
+class Delta(NamedTuple):
+    """What an instruction cycle changed, to undo it"""
+
+    cycle: int
+    """Number of the cycle, as counted by the machine once it has been performed"""
+
+    address: int
+    """Address of the instruction"""
+
+    opcode: int
+    """Operation code of the instruction"""
+
+    data: int
+    """Data of the instruction"""
+
+    ci: int
+    """Signed value of CI before the instruction"""
+
+    a: int
+    """Unsigned value of A before the instruction"""
+
+    overwritten: int | None
+    """Previous value of the word written by a STO instruction at the address given by data"""
+
+
+class Checkpoint(NamedTuple):
+    """Full state of the machine after a cycle"""
+
+    cycle: int
+    ci: int
+    a: int
+    words: list
+
+
+class History(Observer):
+    """Record of the past states of a machine, to step backwards
+
+    Every instruction cycle adds a delta to a log: the previous CI and A, and the word
+    overwritten by a STO instruction. Undoing the latest cycles replays the log backwards,
+    in a time proportional to the number of cycles undone. The log is a ring buffer: only
+    the latest deltas are kept.
+
+    A full checkpoint of the machine is also taken periodically. A past state older than
+    the log can still be reached by restoring the previous checkpoint and running the
+    machine forward from there.
+
+    The history is filled by a machine on which it has been enabled, see Ssem.enable_history.
+    It assumes that the machine only changes through its instructions: writing to the store
+    from outside makes the past states inaccurate.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, checkpoint_interval: int = 1 << 12, max_checkpoints: int = 64,
+                 model=SsemModel):
+        """
+        Arguments:
+            capacity: Number of deltas kept in the log
+            checkpoint_interval: Number of cycles between two checkpoints
+            max_checkpoints: Number of the latest checkpoints kept
+            model: Model of the machine, which gives the size of the addresses
+        """
+        if capacity < 1 or checkpoint_interval < 1 or max_checkpoints < 1:
+            raise ValueError("The capacity, the checkpoint interval and the number of checkpoints must be at least one")
+
+        self.capacity = capacity
+        self.checkpoint_interval = checkpoint_interval
+        self._cycles = array("q", bytes(8 * capacity))
+        typecode = InstructionSet.of(model).address_typecode
+        self._addresses = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._opcodes = array("B", bytes(capacity))
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._ci = array("q", bytes(8 * capacity))
+        self._a = array("Q", bytes(8 * capacity))
+        self._overwritten = array("Q", bytes(8 * capacity))
+        self._written = array("b", bytes(capacity))
+        self._start = 0
+        self._length = 0
+        self.checkpoints = deque(maxlen=max_checkpoints)
+
+    def __len__(self) -> int:
+        """Number of deltas in the log"""
+        return self._length
+
+    @property
+    def oldest_cycle(self) -> int | None:
+        """Earliest cycle that can be reached, None when nothing has been recorded"""
+        if self._length:
+            first = self._cycles[self._start] - 1
+            return min(first, self.checkpoints[0].cycle) if self.checkpoints else first
+        return self.checkpoints[0].cycle if self.checkpoints else None
+
+    def clear(self):
+        """Forget the whole history"""
+        self._start = 0
+        self._length = 0
+        self.checkpoints.clear()
+
+    def checkpoint(self, machine):
+        """Save the full state of the machine"""
+        self.checkpoints.append(Checkpoint(machine.last_cycle, machine.ci.to_int(), machine.a.to_unsigned_int(), machine.store.read()))
+
+    def after_cycle(self, machine, address: int, opcode: int, data: int,
+                    previous_ci: int, previous_a: int, a: int, overwritten: int | None):
+        cycle = machine.last_cycle
+        if self._length == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+            self._length -= 1
+        position = (self._start + self._length) % self.capacity
+        self._cycles[position] = cycle
+        self._addresses[position] = address
+        self._opcodes[position] = opcode
+        self._data[position] = data
+        self._ci[position] = previous_ci
+        self._a[position] = previous_a
+        self._written[position] = overwritten is not None
+        self._overwritten[position] = overwritten or 0
+        self._length += 1
+
+        if cycle % self.checkpoint_interval == 0:
+            self.checkpoint(machine)
+
+    def delta(self, back: int = 0) -> Delta:
+        """Delta of a recorded cycle
+
+        Arguments:
+            back: Position from the latest delta, 0 being the latest
+        """
+        if not 0 <= back < self._length:
+            raise IndexError("No such delta in the history")
+        position = (self._start + self._length - 1 - back) % self.capacity
+        return Delta(
+            self._cycles[position], self._addresses[position], self._opcodes[position], self._data[position],
+            self._ci[position], self._a[position], self._overwritten[position] if self._written[position] else None,
+        )
+
+    def pop(self) -> Delta:
+        """Remove the latest delta from the log and return it"""
+        delta = self.delta()
+        self._length -= 1
+        return delta
+
+    def truncate(self, cycle: int):
+        """Forget the deltas and the checkpoints after the given cycle"""
+        while self._length and self.delta().cycle > cycle:
+            self._length -= 1
+        while self.checkpoints and self.checkpoints[-1].cycle > cycle:
+            self.checkpoints.pop()
+
+    def checkpoint_before(self, cycle: int) -> Checkpoint | None:
+        """Latest checkpoint taken at or before the given cycle, None if there is none"""
+        for checkpoint in reversed(self.checkpoints):
+            if checkpoint.cycle <= cycle:
+                return checkpoint
+        return None
+
+    def last_write(self, address: int, sto: int) -> Delta | None:
+        """Latest delta of a STO instruction writing at the given address, None if there is none
+
+        Arguments:
+            address: Address written
+            sto: Operation code of the STO instruction
+        """
+        for back in range(self._length):
+            delta = self.delta(back)
+            if delta.opcode == sto and delta.data == address:
+                return delta
+        return None
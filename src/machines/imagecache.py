@@ -0,0 +1,211 @@
+
+from array import array
+from functools import lru_cache
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+
+from src.core.image import _typecode, pack_words, unpack_words
+
+
+VERSION = 1
+"""Version of the layout of the entries, part of their keys"""
+
+SUFFIX = ".img"
+
+
+class ImageCache:
+    """On-disk cache of the images of assembled programs
+
+    Entries are addressed by a hash of the source of the program and of the geometry and
+    instruction set of the model it is assembled for, so that any change of either one
+    leads to another entry. An entry holds the words of the store packed as by pack_words:
+    loading a program found in the cache only costs reading the source to hash it and
+    reading the image.
+
+    Entries are written to a temporary file renamed once complete, so that concurrent
+    processes never see a partial image. Reading an entry marks it as recently used, and
+    the least recently used entries are evicted when the total size of the cache exceeds
+    its bound. The directory is only scanned for that when the size of the entries,
+    measured on the first write then counted up on the next ones, goes over the bound.
+
+    Errors of the file system are never raised: the cache then behaves as if empty.
+    """
+
+    max_size = 64 << 20
+    """Default bound of the total size of the entries, in bytes"""
+
+    def __init__(self, directory: Path, max_size: int | None = None):
+        """
+        Arguments:
+            directory: Directory of the entries, created when needed
+            max_size: Bound of the total size of the entries, in bytes
+        """
+        self.directory = Path(directory)
+        self._directory = str(directory)
+        if max_size is not None:
+            self.max_size = max_size
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @classmethod
+    def default(cls) -> "ImageCache | None":
+        """Cache used by assemblers unless told otherwise
+
+        Located in the SSEM_IMAGE_CACHE environment variable. There is none when it is
+        not set or empty: programs are only cached once enabled, e.g. by enable_user_cache.
+        """
+        directory = os.environ.get("SSEM_IMAGE_CACHE")
+        return cls(directory) if directory else None
+
+    @staticmethod
+    def enable_user_cache():
+        """Make the default cache the one of the user, unless SSEM_IMAGE_CACHE is already set
+
+        Called by the command line tools. The cache is then in the user cache directory,
+        e.g. ~/.cache/ssem/images, for the current process and the ones it starts.
+        """
+        directory = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "ssem" / "images"
+        os.environ.setdefault("SSEM_IMAGE_CACHE", str(directory))
+
+    @staticmethod
+    def key(source: bytes, model) -> str:
+        """Key of the entry of a program assembled for a model"""
+        digest = _model_digest(model).copy()
+        digest.update(source)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + SUFFIX)
+
+    def get(self, key: str, model) -> list | None:
+        """Unsigned words of an entry, None when it is missing"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as input:
+                image = input.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        if len(image) != model.word_count * array(_typecode(model.word_length)).itemsize:
+            # Damaged entry
+            self._remove(Path(path))
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return unpack_words(image, model.word_length)
+
+    def put(self, key: str, words, word_length: int):
+        """Store the unsigned words of an assembled program, then evict entries if needed"""
+        image = pack_words(words, word_length)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "wb") as output:
+                    output.write(image)
+                os.replace(temporary, self._path(key))
+            except BaseException:
+                self._remove(Path(temporary))
+                raise
+        except OSError:
+            return
+        self.writes += 1
+
+        if self._size is None:
+            self._size = sum(entry[1] for entry in self._entries())
+        else:
+            self._size += len(image)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _entries(self) -> list:
+        """Paths, sizes and times of last use of the entries, least recently used first"""
+        entries = []
+        try:
+            paths = list(self.directory.glob("*" + SUFFIX))
+        except OSError:
+            return entries
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def _evict(self):
+        """Remove the least recently used entries until the cache fits in its bound"""
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            if self._remove(path):
+                size -= entry_size
+                self.evictions += 1
+        self._size = size
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+        except OSError:
+            return False
+        return True
+
+    def clear(self):
+        """Remove all the entries"""
+        for _, _, path in self._entries():
+            self._remove(path)
+        self._size = None
+
+    def stats(self) -> dict:
+        """Counters of this cache object, with the number and total size of the entries on disk"""
+        entries = self._entries()
+        return {
+            "directory": str(self.directory),
+            "entries": len(entries),
+            "size": sum(entry[1] for entry in entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+    def report(self) -> str:
+        """Human readable summary of the statistics"""
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"]
+        ratio = f" ({100 * stats['hits'] / lookups:.1f}% hits)" if lookups else ""
+        return (f"Image cache {stats['directory']}\n"
+                f"  entries: {stats['entries']}, {stats['size']} of {stats['max_size']} bytes\n"
+                f"  hits: {stats['hits']}, misses: {stats['misses']}{ratio}\n"
+                f"  writes: {stats['writes']}, evictions: {stats['evictions']}\n")
+
+
+@lru_cache(maxsize=None)
+def _model_digest(model):
+    """Hash of the geometry and instruction set of a model, to be completed with a source"""
+    instructions = tuple(
+        (mnemonic.name,
+         None if mnemonic.value is None else mnemonic.value.to_unsigned_int(),
+         mnemonic in model.instructions_with_data,
+         mnemonic in model.instructions_data_is_address)
+        for mnemonic in model.Mnemonic
+    )
+    geometry = (VERSION, model.word_length, model.word_count, model.opcode_start, model.opcode_length,
+                model.address_start, model.address_length, instructions)
+    return hashlib.sha256(repr(geometry).encode())
@@ -0,0 +1,99 @@
+
+from array import array
+from enum import Enum
+
+
+class Operand(Enum):
+    """Kind of data an instruction takes"""
+
+    NONE = "none"
+    """No data, e.g. CMP or STP"""
+
+    ADDRESS = "address"
+    """Address of a word of the store, e.g. LDN or JMP"""
+
+    VALUE = "value"
+    """Value of a whole word, e.g. NUM"""
+
+
+class InstructionSet:
+    """Instruction set of a model compiled into tables indexed by integers
+
+    Models describe their instructions with BitArray operation codes, convenient to read
+    but slow to look up: an enumeration cannot find a member by an unhashable value. The
+    tables are built once per model class (see of) and shared by the assembler, the
+    disassembler and the engines, turning decoding and encoding into list indexing.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.word_length = model.word_length
+        self.word_count = model.word_count
+        self.opcode_start = model.opcode_start
+        self.opcode_mask = (1 << model.opcode_length) - 1
+        self.address_start = model.address_start
+        self.address_mask = (1 << model.address_length) - 1
+        self.decoded_length = max(model.opcode_start + model.opcode_length, model.address_start + model.address_length)
+        """Number of bits needed to decode an instruction"""
+        address_length = max(model.address_length, (model.word_count - 1).bit_length())
+        self.address_typecode = "H" if address_length <= 16 else "I" if address_length <= 32 and array("I").itemsize == 4 else "Q"
+        """Array type code holding the addresses and the data of the instructions"""
+
+        size = 1 << model.opcode_length
+        self.mnemonics = [None] * size
+        """Instruction of each operation code, None for unused codes"""
+        self.operands = [Operand.NONE] * size
+        """Kind of data of each operation code"""
+        self.handlers = [None] * size
+        """Name of the operation executed by each operation code, e.g. "SUB" for SUB2"""
+
+        self.opcodes = {}
+        """Operation code of each instruction"""
+        self.encodings = {}
+        """Operation code of each instruction, shifted to its place in a word"""
+        self.kinds = {}
+        """Kind of data of each mnemonic, including the ones that are not instructions"""
+
+        operations = getattr(model, "operations", {})
+        for mnemonic in model.Mnemonic:
+            if mnemonic in model.instructions_data_is_address:
+                kind = Operand.ADDRESS
+            elif mnemonic in model.instructions_with_data:
+                kind = Operand.VALUE
+            else:
+                kind = Operand.NONE
+            self.kinds[mnemonic] = kind
+            if mnemonic.value is None:
+                continue
+
+            opcode = mnemonic.value.to_unsigned_int()
+            self.opcodes[mnemonic] = opcode
+            self.encodings[mnemonic] = opcode << self.opcode_start
+            self.mnemonics[opcode] = mnemonic
+            self.operands[opcode] = kind
+            self.handlers[opcode] = operations.get(mnemonic, mnemonic).name
+
+    @classmethod
+    def of(cls, model) -> "InstructionSet":
+        """Compiled instruction set of a model, built on the first call for its class"""
+        key = model if isinstance(model, type) else type(model)
+        compiled = _compiled.get(key)
+        if compiled is None:
+            compiled = _compiled[key] = cls(model)
+        return compiled
+
+    def opcodes_of(self, *handlers: str) -> frozenset:
+        """Operation codes executing any of the given operations, given by their names"""
+        return frozenset(opcode for opcode, handler in enumerate(self.handlers) if handler in handlers)
+
+    def decode(self, word: int) -> tuple:
+        """Operation code and data of an unsigned word"""
+        return (word >> self.opcode_start) & self.opcode_mask, (word >> self.address_start) & self.address_mask
+
+    def encode(self, mnemonic, data: int = 0) -> int:
+        """Unsigned word of an instruction"""
+        return self.encodings[mnemonic] | data << self.address_start
+
+
+_compiled = {}
+"""Instruction sets already compiled, by model class"""
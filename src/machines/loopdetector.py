@@ -0,0 +1,161 @@
+
+from typing import NamedTuple
+
+from src.machines.fingerprint import Fingerprint
+from src.machines.observer import Observer
+
+
+class Loop(NamedTuple):
+    """Endless loop found by a LoopDetector"""
+
+    entry_cycle: int
+    """Cycle after which the machine first enters the loop, as counted by the machine"""
+
+    entry_address: int
+    """Address of the first instruction executed in the loop"""
+
+    period: int
+    """Number of cycles after which the state of the machine repeats"""
+
+    def __str__(self) -> str:
+        return f"loop of {self.period} cycles entered at cycle {self.entry_cycle}, address {self.entry_address:02d}"
+
+
+class _State(NamedTuple):
+    """Full state of the machine after a cycle"""
+
+    cycle: int
+    fingerprint: int
+    ci: int
+    a: int
+    words: list
+
+
+class LoopDetector(Observer):
+    """Detector of the endless loops of a machine, stopping it as soon as its state repeats
+
+    The machine being deterministic, it loops forever once its state (CI, A and the store)
+    repeats. The states are compared with Brent's cycle detection: a single saved state is
+    compared to every new one, and replaced by the current state each time the number of
+    cycles since it was saved reaches a power of two. The loop is then found after fewer
+    than three times the cycles needed to enter it and go around it once.
+
+    States are compared through their fingerprints (see Fingerprint), kept up to date on
+    every write, and only compared word by word when the fingerprints are equal. A reported
+    loop is therefore certain.
+
+    Once a loop is found, its entry point is located by replaying the run from the first
+    state on two copies of the machine, one period apart.
+
+    The detector is fed by a machine on which loop detection has been enabled, see
+    Ssem.enable_loop_detection. Changes made to the machine from outside, between or during
+    runs, restart the detection from the current state.
+    """
+
+    def __init__(self, machine):
+        """
+        Arguments:
+            machine: Machine to watch, its current state being the first one
+        """
+        self.machine = machine
+        self.word_count = machine.model.word_count
+        self._sto = machine.instruction_set.opcodes[machine.model.Mnemonic.STO]
+        self._written = []
+        self._store = machine.store
+        self._store.watch(self._on_write)
+        self.restart()
+
+    def close(self):
+        """Stop watching the store of the machine"""
+        self._store.unwatch(self._on_write)
+
+    def restart(self):
+        """Start the detection again from the current state of the machine"""
+        machine = self.machine
+        if machine.store is not self._store:
+            # The store has been replaced
+            self._store.unwatch(self._on_write)
+            self._store = machine.store
+            self._store.watch(self._on_write)
+        words = _words(machine.store)
+        ci, a = machine._registers()
+        self._fingerprint = Fingerprint(words)
+        self._first = _State(machine.last_cycle, self._fingerprint.state(ci, a), ci, a, words)
+        self._saved = self._first
+        self._power = 1
+        self._distance = 0
+        self._registers = (ci, a)
+        self._written.clear()
+
+    def _on_write(self, start: int, stop: int):
+        self._written.append((start, stop))
+
+    def before_cycle(self, machine, address: int, opcode: int, data: int):
+        if self._written or machine._registers() != self._registers or machine.store is not self._store:
+            # The machine has been changed from outside since the last cycle
+            self.restart()
+        return None
+
+    def after_cycle(self, machine, address: int, opcode: int, data: int,
+                    previous_ci: int, previous_a: int, a: int, overwritten: int | None):
+        fingerprint = self._fingerprint
+        if opcode == self._sto:
+            fingerprint.write(data, a)
+            if self._written == [(data, data + 1)]:
+                self._written.clear()
+        if self._written or self._registers != (previous_ci, previous_a):
+            # The machine has been changed from outside while stopped before the instruction
+            self.restart()
+            return None
+
+        ci = machine._registers()[0]
+        self._registers = (ci, a)
+        state = fingerprint.state(ci, a)
+        saved = self._saved
+        self._distance += 1
+
+        if state == saved.fingerprint and ci == saved.ci and a == saved.a and _words(machine.store) == saved.words:
+            loop = self._locate(self._distance)
+            self.restart()
+            return loop
+
+        if self._distance == self._power:
+            self._saved = _State(machine.last_cycle, state, ci, a, _words(machine.store))
+            self._power *= 2
+            self._distance = 0
+        return None
+
+    def _locate(self, period: int) -> Loop:
+        """Find where the loop starts by replaying the run from the first state"""
+        first = self._first
+        behind = self._copy(first)
+        ahead = self._copy(first)
+        self._advance(ahead, period)
+
+        cycle = first.cycle
+        while behind._registers() != ahead._registers() or _words(behind.store) != _words(ahead.store):
+            self._advance(behind, 1)
+            self._advance(ahead, 1)
+            cycle += 1
+
+        return Loop(cycle, (behind._registers()[0] + 1) % self.word_count, period)
+
+    def _copy(self, state: _State):
+        """Machine of the same engine as the one watched, in the given state"""
+        copy = type(self.machine)(model=self.machine.model)
+        copy.store.write(0, state.words)
+        copy._restore(state.ci, state.a, state.cycle)
+        return copy
+
+    @staticmethod
+    def _advance(machine, cycles: int):
+        """Perform exactly the given number of cycles, going on after stop instructions"""
+        while cycles > 0:
+            cycles -= machine.instruction_cycles(cycles)
+        machine.stop_flag = True
+
+
+def _words(store) -> list:
+    """Unsigned values of the words of a store as a list, a PackedStore giving an array"""
+    words = store.read()
+    return words if type(words) is list else words.tolist()
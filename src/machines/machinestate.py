@@ -0,0 +1,93 @@
+
+from pathlib import Path
+import re
+import struct
+
+from src.core.image import pack_words, unpack_words
+
+
+MAGIC = b"SSEMSTA"
+
+VERSION = 1
+
+HEADER = struct.Struct("<7sBBIqQQd")
+"""Magic, version, word length, word count, CI (signed), A (unsigned), cycle counter, speed"""
+
+_SNP_FIELDS = re.compile(r"^; (cycles|speed|CI|A): (-?[\d.]+)$", re.MULTILINE)
+
+
+def pack_state(machine) -> bytes:
+    """Full state of a machine in the compact binary format
+
+    The header holds CI, A, the cycle counter and the speed, followed by the words of the
+    store packed as by pack_words.
+    """
+    model = machine.model
+    ci, a = machine._registers()
+    header = HEADER.pack(MAGIC, VERSION, model.word_length, model.word_count, ci, a, machine.last_cycle, machine.speed)
+    return header + pack_words(machine.store.read(), model.word_length)
+
+
+def unpack_state(machine, state: bytes):
+    """Restore the state of a machine from the binary format made by pack_state"""
+    model = machine.model
+    try:
+        magic, version, word_length, word_count, ci, a, cycle, speed = HEADER.unpack_from(state)
+    except struct.error:
+        raise ValueError("Truncated machine state")
+    if magic != MAGIC:
+        raise ValueError("Not a machine state")
+    if version != VERSION:
+        raise ValueError(f"Unsupported machine state version {version}")
+    if (word_length, word_count) != (model.word_length, model.word_count):
+        raise ValueError(f"State of a {word_count}x{word_length} store, the machine has a {model.word_count}x{model.word_length} one")
+
+    words = unpack_words(memoryview(state)[HEADER.size:], word_length)
+    if len(words) != word_count:
+        raise ValueError("Truncated machine state")
+
+    machine.store.write(0, words)
+    machine._restore(ci, a, cycle)
+    machine._set_last_fetch(None)
+    machine.speed = int(speed) if speed.is_integer() else speed
+
+
+def save_state(machine, file: Path):
+    """Write the full state of a machine to a file
+
+    Files ending with .snp are written as text, the store as in an .snp program and the
+    registers in comments before it. Other files are written in the binary format.
+    """
+    if Path(file).suffix == ".snp":
+        ci, a = machine._registers()
+        sign = 1 << (machine.model.word_length - 1)
+        text = (f"; cycles: {machine.last_cycle}\n; speed: {machine.speed}\n"
+                f"; CI: {ci}\n; A: {(a ^ sign) - sign}\n{machine.assembler.dump_snp(machine.store)}")
+        with open(file, "w") as output:
+            output.write(text)
+    else:
+        with open(file, "wb") as output:
+            output.write(pack_state(machine))
+
+
+def load_state(machine, file: Path):
+    """Restore the state of a machine from a file written by save_state
+
+    Binary files are read at once. For .snp files, the registers missing from the comments
+    are set to zero, so that any .snp program can be loaded.
+    """
+    if Path(file).suffix != ".snp":
+        with open(file, "rb") as input:
+            unpack_state(machine, input.read())
+        return
+
+    with open(file, "r") as input:
+        text = input.read()
+    fields = dict(_SNP_FIELDS.findall(text))
+    machine.assembler.load(machine.assembler.assemble_text(text, "snp"), machine.store)
+    a = int(fields.get("A", 0)) % (1 << machine.model.word_length)
+    machine._restore(int(fields.get("CI", 0)), a, int(fields.get("cycles", 0)))
+    machine._set_last_fetch(None)
+    if "speed" in fields:
+        speed = float(fields["speed"])
+        machine.speed = int(speed) if speed.is_integer() else speed
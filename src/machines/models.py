@@ -0,0 +1,76 @@
+
+from src.machines.ssemmodel import SsemModel
+
+
+MODELS = {}
+"""Models of machines by name, see register_model"""
+
+
+def register_model(name: str, model: type) -> type:
+    """Make a model available by name, e.g. to the --model option of the simulator
+
+    Raises:
+        ValueError: if the fields of the instructions do not fit in the words, overlap, or
+            cannot address the whole store
+    """
+    opcode = range(model.opcode_start, model.opcode_start + model.opcode_length)
+    address = range(model.address_start, model.address_start + model.address_length)
+    if not 0 < model.word_length <= 64:
+        raise ValueError(f"Model '{name}': words must have from 1 to 64 bits, not {model.word_length}")
+    if max(opcode.stop, address.stop) > model.word_length:
+        raise ValueError(f"Model '{name}': the instructions do not fit in {model.word_length} bits")
+    if set(opcode) & set(address):
+        raise ValueError(f"Model '{name}': the operation code and the address overlap")
+    if not 0 < model.word_count <= 1 << model.address_length:
+        raise ValueError(f"Model '{name}': {model.address_length} bits cannot address {model.word_count} words")
+
+    MODELS[name] = model
+    return model
+
+
+def model_variant(name: str, base: type = SsemModel, **attributes) -> type:
+    """Create and register a model differing from another one by some attributes
+
+    Example: ::
+
+        model_variant("ssem-1k", word_count=1024, address_length=10)
+    """
+    model = type(f"{base.__name__}_{name.replace('-', '_')}", (base,), dict(attributes))
+    model.__doc__ = f"{base.__name__} with {', '.join(f'{key}={value}' for key, value in attributes.items())}"
+    return register_model(name, model)
+
+
+def get_model(name: str) -> type:
+    """Model registered under the given name
+
+    Raises:
+        ValueError: if there is no such model
+    """
+    try:
+        return MODELS[name]
+    except KeyError:
+        raise ValueError(f"Unknown model '{name}', expected one of {', '.join(MODELS)}")
+
+
+class Ssem8kModel(SsemModel):
+    """SSEM with a store of 8192 words, addressed by 13 bits right below the operation code"""
+
+    word_count = 8192
+
+    address_length = 13
+
+
+class Manchester40Model(SsemModel):
+    """SSEM instruction set on 40-bit words, the size of the words of the later Manchester
+    machines, with a store of 1024 words"""
+
+    word_length = 40
+
+    word_count = 1024
+
+    address_length = 10
+
+
+register_model("ssem", SsemModel)
+register_model("ssem-8k", Ssem8kModel)
+register_model("manchester-40", Manchester40Model)
@@ -0,0 +1,63 @@
+
+
+class Observer:
+    """Something following the instructions executed by a machine, e.g. Profiler or Trace
+
+    Observers are attached to a machine with Ssem.observe. While at least one is attached,
+    the machine performs its cycles one at a time and reports each of them to every
+    observer; without any, it executes at full speed. Observers that are all batched are
+    given the instructions after each batch of cycles instead, the machine staying in its
+    execution loop in the meantime.
+
+    Instructions are given as integers: the opcode is the value of the operation code bits
+    and the data is the value of the address bits. Words and A are unsigned integers.
+    """
+
+    batched = False
+    """Whether the observer only needs after_cycles, and never stops the machine"""
+
+    def before_cycle(self, machine, address: int, opcode: int, data: int):
+        """Called before an instruction is executed
+
+        Arguments:
+            machine: Machine about to execute the instruction
+            address: Address of the instruction
+            opcode: Operation code of the instruction
+            data: Data of the instruction
+
+        Returns:
+            Anything but None to stop the machine before the instruction, the reason being
+            kept in the last_break attribute of the machine. When the machine resumes, the
+            instruction is executed without calling before_cycle again.
+        """
+        return None
+
+    def after_cycle(self, machine, address: int, opcode: int, data: int,
+                    previous_ci: int, previous_a: int, a: int, overwritten: int | None):
+        """Called once an instruction has been executed
+
+        Arguments:
+            machine: Machine executing the instruction, already updated
+            address: Address of the instruction
+            opcode: Operation code of the instruction
+            data: Data of the instruction
+            previous_ci: Signed value of CI before the instruction
+            previous_a: Value of A before the instruction
+            a: Value of A after the instruction
+            overwritten: Previous value of the word written by a STO instruction, None for
+                the other instructions
+
+        Returns:
+            Anything but None to stop the machine after the instruction, the reason being
+            kept in the last_break attribute of the machine
+        """
+        return None
+
+    def after_cycles(self, machine, records: list):
+        """Called once a batch of instructions has been executed, for batched observers
+
+        Arguments:
+            machine: Machine executing the instructions, already updated
+            records: Address, opcode, data and value of A after the instruction, for each
+                instruction in turn, one after the other in a single list
+        """
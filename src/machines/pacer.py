@@ -0,0 +1,146 @@
+
+from collections import deque
+from statistics import pstdev
+from time import perf_counter, sleep
+from typing import Callable, Optional
+
+
+class Pacer:
+    """Runs a machine at its target speed by time slices
+
+    Instead of pausing after every instruction, the pacer keeps track of how many instructions
+    are due since the last slice, executes them in one batch, then waits until the next batch
+    is due. The fraction of instruction left from a batch is carried over to the next one, so
+    that the error does not build up over time.
+
+    When the target cannot be reached, batches are sized from the measured speed of the
+    machine, so that it still runs as fast as it can while being interruptible between slices.
+    """
+
+    window = 128
+    """Number of slices the achieved speed and the jitter are computed over"""
+
+    def __init__(self, machine, slice_duration: float = 0.01, max_lag: float = 0.05,
+                 clock: Callable[[], float] = perf_counter):
+        """
+        Arguments:
+            machine: Machine to run, with a speed in instructions per second and instruction_cycles
+            slice_duration: Time between two batches of instructions, in seconds
+            max_lag: Delay after which instructions not executed in time are dropped instead of
+                being caught up, in seconds
+            clock: Function giving the current time in seconds
+        """
+        self.machine = machine
+        self.slice_duration = slice_duration
+        self.max_lag = max_lag
+        self.clock = clock
+        self._engine_speed = 10000.0
+        self.reset()
+
+    def reset(self):
+        """Forget the past slices, e.g. when the machine has been stopped
+
+        The first instruction is due right away, so that the machine resumes without delay.
+        """
+        self._last_time = None
+        self._due = 1.0
+        self._slices = deque(maxlen=self.window)
+        self._lateness = deque(maxlen=self.window)
+
+    @property
+    def target(self) -> float:
+        """Target speed in instructions per second"""
+        return self.machine.speed
+
+    @property
+    def achieved(self) -> float:
+        """Speed measured over the last slices, in instructions per second"""
+        if len(self._slices) < 2:
+            return 0.0
+        elapsed = self._slices[-1][0] - self._slices[0][0]
+        executed = sum(cycles for _, cycles in list(self._slices)[1:])
+        return executed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def jitter(self) -> float:
+        """Standard deviation of the delay between the planned and the actual start of the slices, in seconds"""
+        if len(self._lateness) < 2:
+            return 0.0
+        return pstdev(self._lateness)
+
+    def step(self, wait: Callable[[float], object] = sleep, limit: Optional[int] = None) -> int:
+        """Execute the instructions due since the last step, then wait for the next slice
+
+        Arguments:
+            wait: Function pausing for the given number of seconds
+            limit: Maximum number of instructions to execute
+
+        Returns:
+            The number of cycles performed
+        """
+        now, executed = self._execute_due(limit)
+
+        delay = self._delay(now)
+        if delay > 0:
+            planned = self.clock() + delay
+            wait(delay)
+            self._lateness.append(self.clock() - planned)
+
+        return executed
+
+    async def step_async(self, limit: Optional[int] = None) -> int:
+        """Same as step, awaiting the next slice instead of blocking
+
+        The event loop is given a chance to run other tasks even when the next slice is
+        already due.
+        """
+        # Only imported when needed, asyncio being slow to import
+        import asyncio
+
+        now, executed = self._execute_due(limit)
+
+        delay = self._delay(now)
+        if delay > 0:
+            planned = self.clock() + delay
+            await asyncio.sleep(delay)
+            self._lateness.append(self.clock() - planned)
+        else:
+            await asyncio.sleep(0)
+
+        return executed
+
+    def _execute_due(self, limit: Optional[int]) -> tuple:
+        """Execute the instructions due since the last step
+
+        Returns:
+            (start time of the slice, number of cycles performed)
+        """
+        speed = self.machine.speed
+        now = self.clock()
+        if self._last_time is not None:
+            self._due += (now - self._last_time) * speed
+        self._last_time = now
+
+        # Instructions late by more than max_lag are not caught up
+        self._due = min(self._due, max(1.0, speed * self.max_lag))
+
+        executed = 0
+        count = min(int(self._due), max(1, int(self._engine_speed * self.slice_duration)))
+        if limit is not None:
+            count = min(count, limit)
+        if count > 0:
+            start = self.clock()
+            executed = self.machine.instruction_cycles(count)
+            duration = self.clock() - start
+            if duration > 0 and executed == count:
+                self._engine_speed = 0.5 * self._engine_speed + 0.5 * (executed / duration)
+            self._due = 0.0 if self.machine.stop_flag else self._due - executed
+
+        self._slices.append((now, executed))
+        return now, executed
+
+    def _delay(self, now: float) -> float:
+        """Time to wait until a full slice of instructions is due, in seconds"""
+        speed = self.machine.speed
+        batch = max(1.0, speed * self.slice_duration)
+        return (batch - self._due) / speed - (self.clock() - now)
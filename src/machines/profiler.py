@@ -0,0 +1,108 @@
+
+import json
+
+from src.machines.instructionset import InstructionSet
+from src.machines.observer import Observer
+
+
+class Profiler(Observer):
+    """Counters of the instructions executed by a machine
+
+    For every address of the store, it counts the instructions executed there, the reads
+    and writes of the word by the instructions, and how often a CMP instruction at this
+    address skipped the next instruction (taken) or not. It also counts the instructions
+    executed by mnemonic.
+
+    The profiler is filled by a machine on which profiling has been enabled, see
+    Ssem.enable_profiling.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._mnemonics = InstructionSet.of(model).mnemonics
+        self._sign = 1 << (model.word_length - 1)
+        self.reset()
+
+    def reset(self):
+        """Set all the counters back to zero"""
+        word_count = self.model.word_count
+        self.executions = [0] * word_count
+        self.reads = [0] * word_count
+        self.writes = [0] * word_count
+        self.cmp_taken = [0] * word_count
+        self.cmp_not_taken = [0] * word_count
+        self.mnemonics = {mnemonic: 0 for mnemonic in self.model.Mnemonic if mnemonic.value is not None}
+
+    @property
+    def cycles(self) -> int:
+        """Number of instruction cycles counted"""
+        return sum(self.executions)
+
+    def after_cycle(self, machine, address: int, opcode: int, data: int,
+                    previous_ci: int, previous_a: int, a: int, overwritten: int | None):
+        self.record(address, self._mnemonics[opcode], data, bool(previous_a & self._sign))
+
+    def record(self, address: int, mnemonic, data: int, negative: bool):
+        """Count an instruction executed
+
+        Arguments:
+            address: Address of the instruction
+            mnemonic: Instruction executed
+            data: Data of the instruction
+            negative: Whether the accumulator was negative before the execution
+        """
+        Mnemonic = self.model.Mnemonic
+
+        self.executions[address] += 1
+        self.mnemonics[mnemonic] += 1
+
+        match mnemonic:
+            case Mnemonic.JMP | Mnemonic.JRP | Mnemonic.LDN | Mnemonic.SUB | Mnemonic.SUB2:
+                self.reads[data] += 1
+            case Mnemonic.STO:
+                self.writes[data] += 1
+            case Mnemonic.CMP:
+                if negative:
+                    self.cmp_taken[address] += 1
+                else:
+                    self.cmp_not_taken[address] += 1
+
+    def counters(self) -> dict:
+        """Copy of the counters, by address and by mnemonic"""
+        return {
+            "cycles": self.cycles,
+            "executions": list(self.executions),
+            "reads": list(self.reads),
+            "writes": list(self.writes),
+            "cmp_taken": list(self.cmp_taken),
+            "cmp_not_taken": list(self.cmp_not_taken),
+            "mnemonics": {mnemonic.name: count for mnemonic, count in self.mnemonics.items()},
+        }
+
+    def to_json(self) -> str:
+        """Counters as a JSON document"""
+        return json.dumps(self.counters())
+
+    def report(self) -> str:
+        """Human readable table of the counters, leaving out the addresses never used"""
+        cycles = self.cycles
+        lines = [
+            f"Cycles: {cycles}",
+            "",
+            "Addr  Executed       %     Reads    Writes  CMP taken  not taken",
+        ]
+        for address in range(self.model.word_count):
+            counts = (self.executions[address], self.reads[address], self.writes[address],
+                      self.cmp_taken[address], self.cmp_not_taken[address])
+            if not any(counts):
+                continue
+            executed, reads, writes, taken, not_taken = counts
+            share = 100 * executed / cycles if cycles else 0.0
+            lines.append(f"{address:4d}  {executed:8d}  {share:5.1f}%  {reads:8d}  {writes:8d}  {taken:9d}  {not_taken:9d}")
+
+        lines += ["", "Mnemonic  Executed       %"]
+        for mnemonic, executed in self.mnemonics.items():
+            share = 100 * executed / cycles if cycles else 0.0
+            lines.append(f"{mnemonic.name:<8}  {executed:8d}  {share:5.1f}%")
+
+        return "\n".join(lines) + "\n"
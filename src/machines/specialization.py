@@ -0,0 +1,128 @@
+
+from src.machines.abstractmachine import MachineRuntimeError
+from src.machines.instructionset import InstructionSet
+
+
+_TEMPLATE = '''
+def instruction_cycles(machine, count{records}):
+    words = machine._store.words
+    ci = machine._ci
+    a = machine._a
+    address = opcode = data = None
+    executed = 0
+    machine.stop_flag = False
+
+    try:
+        while executed < count:
+            # Fetch
+            address = ci = {fetch}
+
+            # Decode
+            word = words[address]
+            opcode = {opcode}
+            data = {data}
+            executed += 1
+
+            # Execute, most frequent instructions first
+{execute}
+            else:
+                raise MachineRuntimeError(f"Unsuported command '{{opcode}}'")
+{record}
+    except IndexError:
+        # The faulting cycle is not counted, as in Ssem
+        executed -= 1
+        raise MachineRuntimeError("Error: Out of bound memory access")
+
+    finally:
+        machine._ci = ci
+        machine._a = a
+        machine._last_cycle += executed
+        if executed:
+            machine._last_fetch = (address, opcode, data)
+
+    return executed
+'''
+
+_OPERATIONS = {
+    "LDN": "a = -words[data] & {mask}",
+    "SUB": "a = (a - words[data]) & {mask}",
+    "STO": "words[data] = a",
+    "CMP": "if a & {sign}:\n    ci += 1",
+    "JMP": "ci = words[data]\nif ci & {sign}:\n    ci -= {modulus}",
+    "JRP": "ci = (ci + words[data]) & {mask}\nif ci & {sign}:\n    ci -= {modulus}",
+    "STP": "{record}machine.stop_flag = True\nbreak",
+}
+"""Code of each operation, in the order of the tests of the execution loop"""
+
+
+_RECORD = "records += (address, opcode, data, a)\n"
+"""Code appending an instruction executed to the records of a recording loop"""
+
+
+def specialized_cycles(model, recording: bool = False):
+    """Execution loop of FastSsem generated for a model, built on the first call for its class
+
+    The loop is the one of FastSsem, with the sizes, masks and operation codes of the
+    model written as constants, the fields extracted without shift or mask when they are
+    not needed, and the program counter wrapped with a mask when the store size is a power
+    of two. Each operation is tested with all the operation codes executing it.
+
+    The recording loop also takes a list, extended after each instruction with its
+    address, operation code, data and the value of A, see FastSsem._record_cycles.
+
+    Returns:
+        A function performing instruction cycles on a FastSsem, taking the machine and
+        the maximum number of cycles, and returning the number of cycles performed
+    """
+    key = (model if isinstance(model, type) else type(model), recording)
+    function = _specialized.get(key)
+    if function is None:
+        function = _specialized[key] = _compile(model, recording)
+    return function
+
+
+def specialized_source(model, recording: bool = False) -> str:
+    """Source of the execution loop generated for a model, see specialized_cycles"""
+    instruction_set = InstructionSet.of(model)
+    word_count = model.word_count
+    modulus = 1 << model.word_length
+    record = _RECORD if recording else ""
+    constants = {"mask": hex(modulus - 1), "sign": hex(modulus >> 1), "modulus": hex(modulus), "record": record}
+
+    branches = []
+    for operation, code in _OPERATIONS.items():
+        opcodes = sorted(instruction_set.opcodes_of(operation))
+        if not opcodes:
+            continue
+        test = " or ".join(f"opcode == {opcode}" for opcode in opcodes)
+        body = "\n".join(" " * 16 + line for line in code.format(**constants).splitlines())
+        branches.append(f"{' ' * 12}{'elif' if branches else 'if'} {test}:\n{body}")
+
+    return _TEMPLATE.format(
+        fetch=f"(ci + 1) & {word_count - 1}" if word_count & (word_count - 1) == 0 else f"(ci + 1) % {word_count}",
+        opcode=_field("word", instruction_set.opcode_start, instruction_set.opcode_mask, model.word_length),
+        data=_field("word", instruction_set.address_start, instruction_set.address_mask, model.word_length),
+        execute="\n".join(branches),
+        records=", records" if recording else "",
+        record=" " * 12 + record if recording else "",
+    )
+
+
+def _field(word: str, start: int, mask: int, word_length: int) -> str:
+    """Expression extracting a field from a word"""
+    shifted = f"({word} >> {start})" if start else word
+    if start + mask.bit_length() >= word_length:
+        # Nothing above the field
+        return shifted
+    return f"{shifted} & {mask}"
+
+
+def _compile(model, recording: bool):
+    namespace = {"MachineRuntimeError": MachineRuntimeError}
+    name = f"{getattr(model, '__name__', type(model).__name__)} {'recording ' if recording else ''}cycles"
+    exec(compile(specialized_source(model, recording), f"<{name}>", "exec"), namespace)
+    return namespace["instruction_cycles"]
+
+
+_specialized = {}
+"""Execution loops already generated, by model class and recording flag"""
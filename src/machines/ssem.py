@@ -1,14 +1,24 @@
 
 from pathlib import Path
 from threading import Event
-from time import perf_counter, sleep
+from time import perf_counter
 from typing import Optional
 
 from src.core.bitarray import BitArray, b
 from src.core.store import Store
-from src.machines.abstractmachine import AbstractMachine, MachineRuntimeError
+from src.machines.abstractmachine import AbstractMachine, CycleBudgetExceeded, MachineRuntimeError, RunResult, StopReason
 from src.machines.assembler import Assembler
+from src.machines.breakpoints import Breakpoint, Breakpoints, ConditionalBreak, Watchpoint
+from src.machines.control import MachineControl
+from src.machines.history import History
+from src.machines.instructionset import InstructionSet
+from src.machines.loopdetector import Loop, LoopDetector
+from src.machines.machinestate import load_state, save_state
+from src.machines.observer import Observer
+from src.machines.pacer import Pacer
+from src.machines.profiler import Profiler
 from src.machines.ssemmodel import SsemModel
+from src.machines.trace import Trace
 
 
 class Ssem(AbstractMachine):
@@ -28,31 +38,90 @@ class Ssem(AbstractMachine):
             - STP: Stop the execution
         - Address size: 5 bits
         - Typically performs at around 700 instructions per seconds
+
+    Other models, with larger stores or words, can be simulated as well (see models.py).
     """
 
-    def __init__(self, file: Path | None = None):
-        self.model = SsemModel()
+    store_class = Store
+    """Type of store created for the machine"""
+
+    run_chunk_size = 1 << 20
+    """Maximum number of cycles performed in one go by run"""
+
+    observed_batch_size = 1 << 12
+    """Maximum number of cycles performed in one go when all the observers are batched"""
+
+    def __init__(self, file: Path | None = None, model: type = SsemModel):
+        """
+        Arguments:
+            file: Program to load (.asm or .snp)
+            model: Model of the machine, the original SSEM by default, see models.MODELS
+        """
+        self.model = model
         self.speed = self.model.typical_speed
         self.assembler = Assembler(model=self.model)
 
-        self.store = Store(self.model.word_length, self.model.word_count)
+        # Operation codes as integers, for the observers and the faster engines
+        self.instruction_set = InstructionSet.of(self.model)
+        self._opcodes = self.instruction_set.opcodes
+        self._mnemonics = self.instruction_set.mnemonics
+
+        self._store = None
+        self.store = self.store_class(self.model.word_length, self.model.word_count)
         self.ci = BitArray(self.model.word_length)
         self.a = BitArray(self.model.word_length)
         self.stop_flag = True
+        self.pacer = Pacer(self)
+        self.control = MachineControl()
+        self._observers = []
+        self._profiler = None
+        self._trace = None
+        self._history = None
+        self._loop_detector = None
+        self._breakpoints = Breakpoints(self.model)
+        self.last_break = None
+        self._resume_address = None
 
         self._last_cycle = 0
-        self._last_instruction = ""
+        self._last_fetch = None
+
+        self._decode_cache_hits = 0
+        self._decode_cache_misses = 0
 
         if file:
             self.assembler.load_file(file, self.store)
 
+    @property
+    def store(self) -> Store:
+        return self._store
+
+    @store.setter
+    def store(self, store: Store):
+        if self._store is not None:
+            self._store.unwatch(self._invalidate_decoded)
+        self._store = store
+        self._decoded = [None] * store.word_count
+        store.watch(self._invalidate_decoded)
+
+    @property
+    def decode_cache_stats(self) -> dict:
+        """Number of decoded instructions found in the cache (hits) or decoded from the store (misses)"""
+        return {"hits": self._decode_cache_hits, "misses": self._decode_cache_misses}
+
+    def _invalidate_decoded(self, start: int, stop: int):
+        """Forget the decoded instructions of the words that have been written"""
+        self._decoded[start:stop] = [None] * (stop - start)
+
     @property
     def last_cycle(self):
         return self._last_cycle
 
     @property
-    def last_instruction(self):
-        return self._last_instruction
+    def last_instruction(self) -> str:
+        if self._last_fetch is None:
+            return ""
+        address, command, data = self._last_fetch
+        return f"{address:02d} {command.name} {data:02d}"
 
     @property
     def is_running(self):
@@ -63,15 +132,26 @@ class Ssem(AbstractMachine):
 
         It first increments the program counter, then decodes the next instruction and executes it.
         """
+        self._instruction_cycle()
+        return self.last_instruction
+
+    def _instruction_cycle(self):
+        """Performs one instruction cycle, see instruction_cycle"""
         # Fetch
         ci_int = self.ci.to_int()
         ci_int += 1
         ci_int %= self.model.word_count  # Program counter loops back to the begining when it exceeds the store boundaries
         self.ci = b(ci_int, self.model.word_length)
 
-        # Decode
-        word = self.store[ci_int]
-        command, data = self.assembler.decode_instruction(word)
+        # Decode (words are decoded once until they are written again)
+        decoded = self._decoded[ci_int]
+        if decoded is None:
+            decoded = self.assembler.decode_instruction(self.store[ci_int])
+            self._decoded[ci_int] = decoded
+            self._decode_cache_misses += 1
+        else:
+            self._decode_cache_hits += 1
+        command, data = decoded
 
         # Execute
         try:
@@ -79,10 +159,327 @@ class Ssem(AbstractMachine):
         except IndexError:
             raise MachineRuntimeError("Error: Out of bound memory access")
 
-        self._last_instruction = f"{ci_int:02d} {command.name} {data:02d}"
+        self._last_fetch = (ci_int, command, data)
         self._last_cycle += 1
 
-        return self._last_instruction
+    def instruction_cycles(self, count: int) -> int:
+        """Performs up to the given number of instruction cycles
+
+        The machine is considered running in the meantime: the stop flag is cleared first,
+        and the cycles end early when a stop instruction is met.
+
+        Returns:
+            The number of cycles performed
+        """
+        self.stop_flag = False
+        executed = 0
+        instruction_cycle = self._instruction_cycle
+
+        while executed < count and not self.stop_flag:
+            instruction_cycle()
+            executed += 1
+
+        return executed
+
+    def observe(self, observer: Observer):
+        """Report every instruction executed from now on to the given observer
+
+        Observed cycles are performed one at a time, which makes any engine much slower,
+        unless all the observers are batched, see Observer.
+        When no observer is left, nothing remains of the observation in the execution: the
+        observed methods only shadow the ones of the class on this instance.
+        """
+        if not self._observers:
+            self.instruction_cycle = self._observed_instruction_cycle
+            self.instruction_cycles = self._observed_instruction_cycles
+        self._observers.append(observer)
+
+    def unobserve(self, observer: Observer):
+        """Stop reporting the instructions executed to an observer attached with observe"""
+        self._observers.remove(observer)
+        if not self._observers:
+            del self.instruction_cycle
+            del self.instruction_cycles
+
+    def _registers(self) -> tuple:
+        """Signed value of CI and unsigned value of A"""
+        return self.ci.to_int(), self.a.to_unsigned_int()
+
+    def _instruction(self, address: int) -> tuple:
+        """Operation code and data of the instruction at the given address, as integers"""
+        decoded = self._decoded[address]
+        if decoded is None:
+            decoded = self._decoded[address] = self.assembler.decode_instruction(self.store[address])
+        command, data = decoded
+        return self._opcodes[command], data
+
+    def _word(self, address: int) -> int:
+        """Unsigned value of the word at the given address"""
+        return self.store[address].to_unsigned_int()
+
+    def _observed_instruction_cycle(self) -> str:
+        """Same as instruction_cycle, reporting the instruction to the observers"""
+        stopped = self.stop_flag
+        self._observed_instruction_cycles(1)
+        self.stop_flag = self.stop_flag or stopped
+        return self.last_instruction
+
+    def _observed_instruction_cycles(self, count: int) -> int:
+        """Same as instruction_cycles, reporting the instructions to the observers"""
+        observers = self._observers
+        if all(observer.batched for observer in observers):
+            return self._batched_instruction_cycles(count)
+
+        instruction_cycles = type(self).instruction_cycles
+        word_count = self.model.word_count
+        sto = self._opcodes[self.model.Mnemonic.STO]
+        executed = 0
+        self.stop_flag = False
+        self.last_break = None
+        # The instruction a breakpoint stopped before is executed when resuming
+        resume_address, self._resume_address = self._resume_address, None
+
+        while executed < count and not self.stop_flag:
+            ci, a = self._registers()
+            address = (ci + 1) % word_count
+            opcode, data = self._instruction(address)
+            if address != resume_address:
+                for observer in observers:
+                    if fired := observer.before_cycle(self, address, opcode, data):
+                        self.last_break = fired
+                if self.last_break is not None:
+                    self._resume_address = address
+                    self.stop_flag = True
+                    break
+            resume_address = None
+            overwritten = self._word(data) if opcode == sto and data < word_count else None
+            if not instruction_cycles(self, 1):
+                break
+            after = self._registers()[1]
+            for observer in observers:
+                if fired := observer.after_cycle(self, address, opcode, data, ci, a, after, overwritten):
+                    self.last_break = fired
+            executed += 1
+            if self.last_break is not None:
+                self.stop_flag = True
+
+        return executed
+
+    def _batched_instruction_cycles(self, count: int) -> int:
+        """Same as instruction_cycles, reporting the instructions to batched observers"""
+        executed = 0
+        self.stop_flag = False
+        self.last_break = None
+        self._resume_address = None
+
+        while executed < count and not self.stop_flag:
+            records = []
+            try:
+                executed += self._record_cycles(min(count - executed, self.observed_batch_size), records)
+            finally:
+                # Including the instructions executed before an error
+                for observer in self._observers:
+                    observer.after_cycles(self, records)
+
+        return executed
+
+    def _record_cycles(self, count: int, records: list) -> int:
+        """Performs instruction cycles, extending the records after each instruction, see Observer.after_cycles
+
+        Returns:
+            The number of cycles performed
+        """
+        instruction_cycles = type(self).instruction_cycles
+        word_count = self.model.word_count
+        executed = 0
+        self.stop_flag = False
+
+        while executed < count and not self.stop_flag:
+            address = (self._registers()[0] + 1) % word_count
+            opcode, data = self._instruction(address)
+            if not instruction_cycles(self, 1):
+                break
+            records += (address, opcode, data, self._registers()[1])
+            executed += 1
+
+        return executed
+
+    @property
+    def profiler(self) -> Optional[Profiler]:
+        """Counters of the profiling mode, None when profiling is disabled"""
+        return self._profiler
+
+    def enable_profiling(self) -> Profiler:
+        """Count the instructions executed from now on, see Profiler
+
+        Returns:
+            The profiler filled by the machine
+        """
+        if self._profiler is None:
+            self._profiler = Profiler(self.model)
+            self.observe(self._profiler)
+        return self._profiler
+
+    def disable_profiling(self):
+        """Go back to the regular execution, forgetting the counters"""
+        if self._profiler is not None:
+            self.unobserve(self._profiler)
+            self._profiler = None
+
+    @property
+    def breakpoints(self) -> Breakpoints:
+        """Breakpoints, watchpoints and conditional breaks set on the machine"""
+        return self._breakpoints
+
+    def add_breakpoint(self, address: int, condition: str | None = None) -> Breakpoint:
+        """Stop the machine before it executes the instruction at an address, see Breakpoint
+
+        Breakpoints are only checked while some are set: without any, the machine executes
+        at full speed.
+
+        Arguments:
+            address: Address of the instruction
+            condition: Only stop when this condition is true, e.g. "A < 0", see Condition
+        """
+        return self.set_breakpoint(Breakpoint(address, condition))
+
+    def add_watchpoint(self, address: int, read: bool = True, write: bool = True, condition: str | None = None) -> Watchpoint:
+        """Stop the machine after an instruction reads or writes a word, see Watchpoint
+
+        Arguments:
+            address: Address of the word
+            read: Stop after the instructions reading the word
+            write: Stop after the instructions writing the word
+            condition: Only stop when this condition is true, see Condition
+        """
+        return self.set_breakpoint(Watchpoint(address, read=read, write=write, condition=condition))
+
+    def add_condition(self, condition: str) -> ConditionalBreak:
+        """Stop the machine as soon as a condition becomes true, e.g. "store[31] == 46", see Condition"""
+        return self.set_breakpoint(ConditionalBreak(condition))
+
+    def check_breakpoint(self, breakpoint):
+        """Check that the addresses of a breakpoint and of its condition are in the store
+
+        Raises:
+            ValueError: if an address is out of the store
+        """
+        address = getattr(breakpoint, "address", 0)
+        if not 0 <= address < self.model.word_count:
+            raise ValueError(f"Address {address} out of the store")
+        condition = breakpoint.condition
+        if condition is not None:
+            for address in sorted(condition.addresses):
+                if not 0 <= address < self.model.word_count:
+                    raise ValueError(f"Address {address} out of the store in condition '{condition}'")
+
+    def set_breakpoint(self, breakpoint):
+        """Add a Breakpoint, a Watchpoint or a ConditionalBreak, e.g. one made by parse_breakpoint
+
+        Raises:
+            ValueError: if an address is out of the store, see check_breakpoint
+        """
+        self.check_breakpoint(breakpoint)
+        if not self._breakpoints:
+            self.observe(self._breakpoints)
+        return self._breakpoints.add(breakpoint)
+
+    def remove_breakpoint(self, breakpoint):
+        """Remove a breakpoint, a watchpoint or a conditional break, given as an object or by number"""
+        self._breakpoints.remove(breakpoint)
+        if not self._breakpoints:
+            self.unobserve(self._breakpoints)
+            self._resume_address = None
+
+    def clear_breakpoints(self):
+        """Remove all the breakpoints"""
+        for breakpoint in list(self._breakpoints):
+            self.remove_breakpoint(breakpoint)
+
+    @property
+    def trace(self) -> Optional[Trace]:
+        """Instructions recorded by the trace mode, None when tracing is disabled"""
+        return self._trace
+
+    def enable_trace(self, capacity: int = Trace.default_capacity, file: Path | None = None) -> Trace:
+        """Record the instructions executed from now on, see Trace
+
+        Arguments:
+            capacity: Number of the latest instructions kept in memory
+            file: Binary file receiving every instruction, none by default
+
+        Returns:
+            The trace filled by the machine
+        """
+        if self._trace is None:
+            self._trace = Trace(self.model, capacity=capacity, file=file)
+            self.observe(self._trace)
+        return self._trace
+
+    def disable_trace(self):
+        """Stop recording the instructions, closing the trace file if any"""
+        if self._trace is not None:
+            self.unobserve(self._trace)
+            self._trace.close()
+            self._trace = None
+
+    def run(self, max_cycles: Optional[int] = None, until_stop: bool = True, strict: bool = False,
+            detect_loops: bool = False) -> RunResult:
+        """Run the machine at full speed, without any pause between instructions
+
+        Arguments:
+            max_cycles: Maximum number of cycles to perform, no limit by default
+            until_stop: End the run at the first stop instruction, otherwise carry on
+                with the next instruction until max_cycles is reached
+            strict: Raise CycleBudgetExceeded instead of returning when max_cycles is reached
+            detect_loops: End the run as soon as the machine provably loops forever, for this
+                run only when loop detection is not enabled, see enable_loop_detection
+
+        Returns:
+            The number of cycles performed, why the run ended, the final CI and A and timings
+        """
+        if max_cycles is None and not until_stop:
+            raise ValueError("A run that does not end on stop instructions needs a maximum number of cycles")
+
+        executed = 0
+        reason = StopReason.BUDGET
+        start = perf_counter()
+        self.last_break = None
+        temporary_detector = detect_loops and self._loop_detector is None
+        if temporary_detector:
+            self.enable_loop_detection()
+
+        try:
+            while max_cycles is None or executed < max_cycles:
+                count = self.run_chunk_size if max_cycles is None else min(max_cycles - executed, self.run_chunk_size)
+                executed += self.instruction_cycles(count)
+
+                if self.last_break is not None:
+                    reason = StopReason.LOOP if isinstance(self.last_break, Loop) else StopReason.BREAK
+                    break
+                if self.stop_flag and until_stop:
+                    reason = StopReason.STOP
+                    break
+        finally:
+            if temporary_detector:
+                self.disable_loop_detection()
+
+        wall_time = perf_counter() - start
+        self.stop_flag = True
+
+        result = RunResult(
+            cycles=executed,
+            stop_reason=reason,
+            ci=self.ci.to_int(),
+            a=self.a.to_int(),
+            wall_time=wall_time,
+            loop=self.last_break if reason == StopReason.LOOP else None,
+        )
+
+        if strict and reason == StopReason.BUDGET:
+            raise CycleBudgetExceeded(result)
+
+        return result
 
     def _execute(self, command, data: BitArray):
         """Execute an instruction
@@ -96,7 +493,8 @@ class Ssem(AbstractMachine):
                 # Jump to the instruction at address CI + value of S
                 value = self.store[data].to_int()
                 ci_int = self.ci.to_int()
-                self.ci = b(value + ci_int, self.model.word_length)
+                # Wraps around as the adder of the machine
+                self.ci = b((value + ci_int) & ((1 << self.model.word_length) - 1), self.model.word_length)
 
             case self.model.Mnemonic.LDN:
                 # Fetch the negated value
@@ -111,8 +509,8 @@ class Ssem(AbstractMachine):
             case self.model.Mnemonic.SUB | self.model.Mnemonic.SUB2:
                 s_int = self.store[data].to_int()
                 a_int = self.a.to_int()
-                # Save (accumulator - S) to the accumulator
-                self.a = b(a_int - s_int, self.model.word_length)
+                # Save (accumulator - S) to the accumulator, wrapping around as the subtractor of the machine
+                self.a = b((a_int - s_int) & ((1 << self.model.word_length) - 1), self.model.word_length)
 
             case self.model.Mnemonic.CMP:
                 # Skip next line if accumulator is negative
@@ -128,20 +526,217 @@ class Ssem(AbstractMachine):
 
     def start(self, stop_event: Optional[Event] = None, stopped: bool = False):
         """Start the machine until stop instruction is met
+
+        The instructions are executed at the pace given by the speed attribute, in batches
+        (see Pacer). Other threads drive the machine through its control channel, whose
+        commands are applied between batches. A stopped machine waits for the next command.
+
+        The machine runs until the quit command is received or the stop event is set. Note
+        that setting the stop event does not wake up a stopped machine, send quit as well.
         """
         self.stop_flag = stopped
+        if stop_event is None:
+            stop_event = Event()
+        self.pacer.reset()
 
         while not stop_event.is_set():
-            while not self.stop_flag:
-                start = perf_counter()
+            for name, value, done in self.control.take():
+                if name == "quit":
+                    done.set()
+                    return
+                self._apply_command(name, value)
+                done.set()
 
-                self.instruction_cycle()
+            if self.stop_flag:
+                self.control.wait()
+            else:
+                self.pacer.step(wait=self.control.wait)
 
-                if stop_event is not None and stop_event.is_set():
-                    return
+    @property
+    def history(self) -> Optional[History]:
+        """Past states recorded to step backwards, None when the history is disabled"""
+        return self._history
+
+    def enable_history(self, capacity: int = 1 << 16, checkpoint_interval: int = 1 << 12, max_checkpoints: int = 64) -> History:
+        """Record the past states from now on, to step backwards, see History
+
+        Arguments:
+            capacity: Number of cycles that can be undone one by one
+            checkpoint_interval: Number of cycles between two full copies of the state
+            max_checkpoints: Number of full copies of the state kept
+
+        Returns:
+            The history filled by the machine
+        """
+        if self._history is None:
+            self._history = History(capacity, checkpoint_interval, max_checkpoints, model=self.model)
+            self._history.checkpoint(self)
+            self.observe(self._history)
+        return self._history
+
+    def disable_history(self):
+        """Stop recording the past states, forgetting them"""
+        if self._history is not None:
+            self.unobserve(self._history)
+            self._history = None
+
+    @property
+    def loop_detector(self) -> Optional[LoopDetector]:
+        """Detector of endless loops, None when loop detection is disabled"""
+        return self._loop_detector
+
+    def enable_loop_detection(self) -> LoopDetector:
+        """Stop the machine as soon as it provably loops forever, see LoopDetector
+
+        The loop found is kept in last_break, and runs end with StopReason.LOOP.
+
+        Returns:
+            The detector fed by the machine
+        """
+        if self._loop_detector is None:
+            self._loop_detector = LoopDetector(self)
+            self.observe(self._loop_detector)
+        return self._loop_detector
+
+    def disable_loop_detection(self):
+        """Stop detecting endless loops"""
+        if self._loop_detector is not None:
+            self.unobserve(self._loop_detector)
+            self._loop_detector.close()
+            self._loop_detector = None
+
+    def step_back(self, count: int = 1) -> int:
+        """Undo the latest instruction cycles, as far as the history goes
+
+        Returns:
+            The number of cycles undone
+        """
+        oldest = self._require_history().oldest_cycle
+        target = max(self.last_cycle - count, oldest if oldest is not None else self.last_cycle)
+        undone = self.last_cycle - target
+        self.goto_cycle(target)
+        return undone
+
+    def goto_cycle(self, cycle: int):
+        """Bring the machine back (or forward) to its state after the given cycle
+
+        Going back undoes the cycles one by one, or restores the nearest checkpoint and runs
+        forward from there, whichever is the shortest. Going forward runs the machine.
+        The machine is stopped afterwards.
+        """
+        history = self._require_history()
+        current = self.last_cycle
+
+        if cycle < current:
+            oldest = history.oldest_cycle
+            if oldest is None or cycle < oldest:
+                raise MachineRuntimeError(f"Error: Cycle {cycle} is not in the history anymore")
+
+            undo = current - cycle if len(history) and history.delta(len(history) - 1).cycle - 1 <= cycle else None
+            checkpoint = history.checkpoint_before(cycle)
+            replay = cycle - checkpoint.cycle if checkpoint else None
+
+            if undo is not None and (replay is None or undo <= replay):
+                for _ in range(undo):
+                    delta = history.pop()
+                    if delta.overwritten is not None:
+                        self.store.write(delta.data, [delta.overwritten])
+                    self._restore(delta.ci, delta.a, delta.cycle - 1)
+                history.truncate(cycle)
+                self._set_last_fetch(history.delta()[1:4] if len(history) else None)
+            else:
+                history.truncate(checkpoint.cycle)
+                self.store.write(0, checkpoint.words)
+                self._restore(checkpoint.ci, checkpoint.a, checkpoint.cycle)
+                self._set_last_fetch(None)
+
+        # Breakpoints must not interrupt the replay
+        suspended = bool(self._breakpoints)
+        if suspended:
+            self.unobserve(self._breakpoints)
+        try:
+            remaining = cycle - self.last_cycle
+            while remaining > 0:
+                executed = self.instruction_cycles(remaining)
+                if not executed:
+                    break
+                remaining -= executed
+        finally:
+            if suspended:
+                self.observe(self._breakpoints)
+
+        self.stop_flag = True
+
+    def rewind_to_write(self, address: int) -> Optional[int]:
+        """Go back to the state before the latest STO instruction writing at the given address
+
+        Returns:
+            The cycle reached, None if no such write is in the history
+        """
+        delta = self._require_history().last_write(address, self._opcodes[self.model.Mnemonic.STO])
+        if delta is None:
+            return None
+        self.goto_cycle(delta.cycle - 1)
+        return delta.cycle - 1
+
+    def _require_history(self) -> History:
+        if self._history is None:
+            raise MachineRuntimeError("Error: The history is not enabled")
+        return self._history
+
+    def _restore(self, ci: int, a: int, cycle: int):
+        """Set CI (signed), A (unsigned) and the cycle count"""
+        self.ci = BitArray.from_int(ci, self.model.word_length)
+        self.a = BitArray.from_int(a, self.model.word_length)
+        self._last_cycle = cycle
+
+    def _set_last_fetch(self, fetch: Optional[tuple]):
+        """Set the last instruction from (address, opcode, data) as integers"""
+        if fetch is None:
+            self._last_fetch = None
+        else:
+            address, opcode, data = fetch
+            self._last_fetch = (address, self._mnemonics[opcode], data)
+
+    def _apply_command(self, name: str, value):
+        """Apply a command received from the control channel"""
+        match name:
+            case "run" | "toggle" if self.stop_flag:
+                self.stop_flag = False
+                self.pacer.reset()
+
+            case "stop" | "toggle":
+                self.stop_flag = True
+
+            case "step":
+                self.instruction_cycles(value)
+                self.stop_flag = True
+
+            case "back":
+                self.step_back(value)
+                self.stop_flag = True
+
+            case "reset":
+                self.clear_state()
+                self.pacer.reset()
+
+            case "speed":
+                self.speed = value
+
+            case "call":
+                value(self)
+
+    def save_state(self, file: Path):
+        """Write CI, A, the cycle counter, the speed and the store to a file
+
+        The state is written in a compact binary format, or as text when the file ends
+        with .snp, see machinestate.save_state.
+        """
+        save_state(self, file)
 
-                sleep(max(0, (1 / self.speed) - (perf_counter() - start)))
-            sleep(0.1)
+    def load_state(self, file: Path):
+        """Restore the state written by save_state, or an .snp program with its registers"""
+        load_state(self, file)
 
     def clear_memory(self):
         """Reset the store to zero"""
@@ -149,6 +744,7 @@ class Ssem(AbstractMachine):
 
     def clear_state(self):
         """Reset the program counter and the accumulator to zero"""
+        self._resume_address = None
         self.ci = BitArray(self.model.word_length)
         self.a = BitArray(self.model.word_length)
 
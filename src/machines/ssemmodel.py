@@ -63,3 +63,8 @@ class SsemModel:
     )
     """Commands of which data must be an address"""
 
+    operations = {
+        Mnemonic.SUB2: Mnemonic.SUB,
+    }
+    """Instructions performing the operation of another one"""
+
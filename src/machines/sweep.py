@@ -0,0 +1,175 @@
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import product, repeat
+from pathlib import Path
+import csv
+import math
+import os
+
+from src.core.image import pack_words, unpack_words
+from src.machines.abstractmachine import StopReason
+from src.machines.fastssem import FastSsem
+from src.machines.ssemmodel import SsemModel
+
+
+@dataclass
+class SweepResult:
+    """Outcome of every run of a sweep, one column per quantity
+
+    Runs are ordered like the points of the grid: the last patched address varies first.
+    """
+
+    addresses: tuple
+    """Patched addresses"""
+
+    parameters: list
+    """Values written at the patched addresses, one tuple per run"""
+
+    cycles: array
+    """Number of cycles performed by each run"""
+
+    stopped: array
+    """1 for the runs ended by a stop instruction, 0 for the runs reaching the maximum number of cycles"""
+
+    ci: array
+    """Final signed value of the program counter of each run"""
+
+    a: array
+    """Final signed value of the accumulator of each run"""
+
+    words: array
+    """Final signed values of the stores, word_count words per run"""
+
+    word_count: int
+    """Number of words in each store"""
+
+    def __len__(self) -> int:
+        return len(self.parameters)
+
+    def stop_reason(self, run: int) -> StopReason:
+        """Why the given run ended"""
+        return StopReason.STOP if self.stopped[run] else StopReason.BUDGET
+
+    def store(self, run: int) -> list:
+        """Final signed values of the words of the store of the given run"""
+        return self.words[run * self.word_count:(run + 1) * self.word_count].tolist()
+
+    def to_csv(self, file: Path):
+        """Write the results as CSV, one line per run"""
+        with open(file, "w", newline="") as output:
+            writer = csv.writer(output)
+            writer.writerow(
+                [f"patch_{address:02d}" for address in self.addresses]
+                + ["cycles", "stop_reason", "ci", "a"]
+                + [f"word_{address:02d}" for address in range(self.word_count)]
+            )
+            for run, parameters in enumerate(self.parameters):
+                writer.writerow(
+                    [*parameters, self.cycles[run], self.stop_reason(run).value, self.ci[run], self.a[run], *self.store(run)]
+                )
+
+    def to_npz(self, file: Path):
+        """Write the results as a NumPy archive, which requires NumPy
+
+        The archive holds the arrays addresses, parameters (runs x patched addresses),
+        cycles, stopped, ci, a and store (runs x word count).
+        """
+        import numpy as np
+
+        np.savez_compressed(
+            file,
+            addresses=np.array(self.addresses, dtype=np.int64).reshape(-1),
+            parameters=np.array(self.parameters, dtype=np.int64).reshape(len(self), len(self.addresses)),
+            cycles=np.frombuffer(self.cycles, dtype=np.int64),
+            stopped=np.frombuffer(self.stopped, dtype=np.int8).astype(bool),
+            ci=np.frombuffer(self.ci, dtype=np.int64),
+            a=np.frombuffer(self.a, dtype=np.int64),
+            store=np.frombuffer(self.words, dtype=np.int64).reshape(len(self), self.word_count),
+        )
+
+
+def _run_points(engine: type, model: type, image: bytes, addresses: tuple, points: list, max_cycles: int) -> tuple:
+    """Run the program image once per point in a worker process
+
+    Returns:
+        (cycles, stopped, ci, a, words) columns of the runs, words being flattened
+    """
+    machine = engine(model=model)
+    word_length = machine.model.word_length
+    sign = 1 << (word_length - 1)
+    program = unpack_words(image, word_length)
+    columns = (array("q"), array("b"), array("q"), array("q"), array("q"))
+    cycles, stopped, ci, a, words = columns
+
+    for point in points:
+        machine.store.write(0, program)
+        for address, value in zip(addresses, point):
+            machine.store.write(address, [value])
+        machine.clear_state()
+
+        result = machine.run(max_cycles=max_cycles)
+
+        cycles.append(result.cycles)
+        stopped.append(result.stop_reason == StopReason.STOP)
+        ci.append(result.ci)
+        a.append(result.a)
+        words.extend(word - (word & sign) * 2 for word in machine.store.read())
+
+    return columns
+
+
+def sweep(file: Path, patches: dict, max_cycles: int, engine: type = FastSsem,
+          workers: int | None = None, chunk_size: int | None = None, model: type = SsemModel) -> SweepResult:
+    """Run a program for every combination of values of some words of the store
+
+    The program is assembled once, then shipped to the worker processes as a binary
+    image along with chunks of points of the grid. Each run starts from the program,
+    with the patched words written, CI and A at zero.
+
+    Arguments:
+        file: Program to run (.asm or .snp)
+        patches: Values to try by address, e.g. {29: range(1, 47)}
+        max_cycles: Maximum number of cycles of each run
+        engine: Machine class running the program, FastSsem by default
+        workers: Number of worker processes, one per CPU by default
+        chunk_size: Number of runs sent to a worker at once, by default the runs are
+            split in 4 chunks per worker
+        model: Model of the machine, the original SSEM by default
+
+    Returns:
+        The results of the runs, see SweepResult
+    """
+    machine = engine(file=file, model=model)
+    word_count = machine.model.word_count
+    image = pack_words(machine.store.read(), machine.model.word_length)
+
+    addresses = tuple(patches)
+    points = list(product(*(tuple(values) for values in patches.values())))
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, math.ceil(len(points) / (workers * 4)))
+    chunks = [points[start:start + chunk_size] for start in range(0, len(points), chunk_size)]
+
+    result = SweepResult(
+        addresses=addresses,
+        parameters=points,
+        cycles=array("q"),
+        stopped=array("b"),
+        ci=array("q"),
+        a=array("q"),
+        words=array("q"),
+        word_count=word_count,
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for cycles, stopped, ci, a, words in executor.map(
+            _run_points, repeat(engine), repeat(model), repeat(image), repeat(addresses), chunks, repeat(max_cycles)
+        ):
+            result.cycles.extend(cycles)
+            result.stopped.extend(stopped)
+            result.ci.extend(ci)
+            result.a.extend(a)
+            result.words.extend(words)
+
+    return result
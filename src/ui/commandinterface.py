@@ -1,12 +1,12 @@
 
 from threading import Event
 from time import sleep
-from timeit import default_timer as timer
 from curses import wrapper
 import curses
 
 from src.core.bitarray import BitArray
 from src.machines.abstractmachine import AbstractMachine
+from src.machines.breakpoints import Breakpoint, Watchpoint, parse_breakpoint
 
 
 class InterfaceError(Exception):
@@ -28,6 +28,7 @@ class CommandInterface:
         self.current_bit_representation = 0
         self.store_scroll = 0
         self.main_panel_height = 0
+        self.message = ""
 
     def _add_text(self, window, position: int, text: str, attributes = None) -> int:
         """Helper to chain multiple string prints to a window
@@ -50,30 +51,34 @@ class CommandInterface:
 
         # //// QUIT ////
         if c == ord('q'):
-            self.stop_event.set()
+            self._quit()
 
         # //// SPEED DOWN ////
         elif c == ord("k"):
-            if self.machine.speed <= 10:
-                if self.machine.speed - 1 > 0:
-                    self.machine.speed -= 1
-            elif self.machine.speed <= 100:
-                self.machine.speed -= 10
+            speed = self.machine.speed
+            if speed <= 10:
+                if speed - 1 > 0:
+                    speed -= 1
+            elif speed <= 100:
+                speed -= 10
             else:
-                self.machine.speed -= 100
+                speed -= 100
+            self.machine.control.set_speed(speed)
 
         # //// SPEED UP ////
         elif c == ord("i"):
-            if self.machine.speed < 10:
-                self.machine.speed += 1
-            elif self.machine.speed < 100:
-                self.machine.speed += 10
-            elif self.machine.speed < 10000000:
-                self.machine.speed += 100
+            speed = self.machine.speed
+            if speed < 10:
+                speed += 1
+            elif speed < 100:
+                speed += 10
+            elif speed < 10000000:
+                speed += 100
+            self.machine.control.set_speed(speed)
 
         # //// RUN/STOP ////
         elif c == ord('p'):
-            self.machine.stop_flag = not self.machine.stop_flag
+            self.machine.control.toggle()
 
         # //// SCROLL UP ////
         elif c == curses.KEY_UP:
@@ -87,13 +92,72 @@ class CommandInterface:
 
         # //// STEP ////
         elif c == curses.KEY_F10:
-            self.machine.stop_flag = True
-            self.machine.instruction_cycle()
+            self.machine.control.step(1)
+
+        # //// STEP BACK ////
+        elif c == curses.KEY_F9:
+            self.machine.control.step_back(1)
 
         # //// DISPLAY ////
         elif c == ord("d"):
             self.current_bit_representation = (self.current_bit_representation + 1) % len(self.BIT_REPRESENTATIONS)
 
+        # //// TOGGLE BREAKPOINT ////
+        elif c == ord("b"):
+            self.machine.control.call(self._toggle_breakpoint)
+
+        # //// BREAKPOINT COMMAND ////
+        elif c == ord(":"):
+            self._breakpoint_command(stdscr)
+
+    def _toggle_breakpoint(self, machine):
+        """Add or remove a breakpoint at the next instruction, called by the machine thread"""
+        address = (machine.ci.to_int() + 1) % machine.model.word_count
+        existing = [bp for bp in machine.breakpoints if isinstance(bp, Breakpoint) and bp.address == address]
+        if existing:
+            for breakpoint in existing:
+                machine.remove_breakpoint(breakpoint)
+        else:
+            machine.add_breakpoint(address)
+
+    def _deleter(self, number: int):
+        """Function removing a breakpoint by number, to be called by the machine thread"""
+        def delete(machine):
+            try:
+                machine.remove_breakpoint(number)
+            except KeyError as ex:
+                self.message = ex.args[0]
+        return delete
+
+    def _breakpoint_command(self, stdscr):
+        """Prompt for a breakpoint command: "break 7 if A < 0", "watch 31 write", "delete 2"..."""
+        prompt = curses.newwin(1, curses.COLS, curses.LINES - 1, 0)
+        prompt.addstr(0, 0, ":")
+        curses.echo()
+        curses.curs_set(1)
+        try:
+            text = prompt.getstr(0, 1, curses.COLS - 2).decode(errors="replace").strip()
+        finally:
+            curses.noecho()
+            curses.curs_set(0)
+            self.bottom_bar.touchwin()
+
+        self.message = ""
+        command, _, argument = text.partition(" ")
+        try:
+            if not text:
+                return
+            elif command == "delete" and argument.strip().isdigit():
+                self.machine.control.call(self._deleter(int(argument)))
+            elif command == "clear":
+                self.machine.control.call(lambda machine: machine.clear_breakpoints())
+            else:
+                breakpoint = parse_breakpoint(text)
+                self.machine.check_breakpoint(breakpoint)
+                self.machine.control.call(lambda machine: machine.set_breakpoint(breakpoint))
+        except ValueError as ex:
+            self.message = str(ex)
+
     def _word_str(self, word: BitArray) -> str:
         """Represents a word according to the current style
 
@@ -113,7 +177,7 @@ class CommandInterface:
             stdscr: Screen instanciated by Curses
         """
         if curses.LINES < 24 or curses.COLS < 80:
-            self.stop_event.set()
+            self._quit()
             raise InterfaceError("Terminal size is too small. Need minimum 80x24.")
 
         stdscr.clear()
@@ -127,9 +191,9 @@ class CommandInterface:
 
         top_bar = curses.newwin( 0,0, 0,0)
         self.main_panel_height = self.machine.store.word_count + 4  # The store height + CI + A + empty line
-        self.main_panel_width = self.machine.store.word_length + 25  # The store width + margin
+        self.main_panel_width = self.machine.store.word_length + 48  # The store width + margin + breakpoints
         pad = curses.newpad(self.main_panel_height, self.main_panel_width)
-        bottom_bar = curses.newwin( 0,0, curses.LINES-1,0)
+        bottom_bar = self.bottom_bar = curses.newwin( 0,0, curses.LINES-1,0)
 
         position = 0
         position = self._add_text(bottom_bar, position, " Q ", curses.A_REVERSE | curses.color_pair(4))
@@ -138,26 +202,24 @@ class CommandInterface:
         position = self._add_text(bottom_bar, position, " RUN/STOP  ")
         position = self._add_text(bottom_bar, position, "F10", curses.A_REVERSE | curses.color_pair(4))
         position = self._add_text(bottom_bar, position, " STEP  ")
+        position = self._add_text(bottom_bar, position, "F9 ", curses.A_REVERSE | curses.color_pair(4))
+        position = self._add_text(bottom_bar, position, " BACK  ")
         position = self._add_text(bottom_bar, position, " I ", curses.A_REVERSE | curses.color_pair(4))
-        position = self._add_text(bottom_bar, position, " SPEED UP  ")
+        position = self._add_text(bottom_bar, position, " FASTER  ")
         position = self._add_text(bottom_bar, position, " K ", curses.A_REVERSE | curses.color_pair(4))
-        position = self._add_text(bottom_bar, position, " SPEED DOWN  ")
+        position = self._add_text(bottom_bar, position, " SLOWER  ")
         position = self._add_text(bottom_bar, position, " D ", curses.A_REVERSE | curses.color_pair(4))
         position = self._add_text(bottom_bar, position, " DISPLAY  ")
 
         refresh_frequency = 30  # refreshs per seconds
-        last_cycles = 0
-        last_refresh_time = timer()
 
         while True:
             self._handle_input(stdscr)
 
             # //// TOP BAR ////
             status = "RUNNING" if self.machine.is_running else "STOPPED"
-            current_speed = int((self.machine.last_cycle - last_cycles) / (timer() - last_refresh_time))
-            last_cycles = self.machine.last_cycle
-            last_refresh_time = timer()
-            s = f"[ STATUS: {status} ]  [ CYCLES: {last_cycles} ]  [ {self.machine.last_instruction} ]  [ SPEED: {current_speed:2d}/{self.machine.speed} ips ] "
+            current_speed = int(self.machine.pacer.achieved)
+            s = f"[ STATUS: {status} ]  [ CYCLES: {self.machine.last_cycle} ]  [ {self.machine.last_instruction} ]  [ SPEED: {current_speed:2d}/{self.machine.speed} ips ] "
             top_bar.addstr(0, 0, s, curses.color_pair(4))
 
             # //// THE STORE ////
@@ -168,11 +230,30 @@ class CommandInterface:
             pad.addstr(2, 0, f" {self._word_str(self.machine.a)}", curses.A_BOLD | curses.color_pair(2))
             pad.addstr(2, self.machine.model.word_length+2, f"A  = {a_int:11}")
 
+            breakpoints = list(self.machine.breakpoints)
+            marks = {}
+            for breakpoint in breakpoints:
+                if isinstance(breakpoint, (Breakpoint, Watchpoint)):
+                    mark = "B" if isinstance(breakpoint, Breakpoint) else "W"
+                    marks[breakpoint.address] = "".join(sorted(set(marks.get(breakpoint.address, "") + mark)))
+
             for i, word in enumerate(self.machine.store):
                 if i == ci_int:
                     pad.addstr(i+4, 0, f">{self._word_str(word)}", curses.A_BOLD | curses.color_pair(7))
                 else:
                     pad.addstr(i+4, 0, f" {self._word_str(word)}", curses.A_BOLD | curses.color_pair(2))
+                pad.addstr(i+4, self.machine.model.word_length+2, f"{i:02d} {marks.get(i, ''):2}", curses.color_pair(1))
+
+            # //// BREAKPOINTS ////
+            column = self.machine.model.word_length + 9
+            width = self.main_panel_width - column - 1
+            pad.addstr(4, column, "BREAKPOINTS  B: at next  ':' command".ljust(width)[:width], curses.A_BOLD)
+            lines = [self.message] if self.message else []
+            fired = self.machine.last_break
+            lines += [f"{'*' if bp is fired else ' '}{bp.number:2d} {bp}" for bp in breakpoints]
+            for row in range(5, self.main_panel_height):
+                line = lines[row - 5] if row - 5 < len(lines) else ""
+                pad.addstr(row, column, line.ljust(width)[:width])
 
             pad.refresh( self.store_scroll,0, 0,0, curses.LINES-2,curses.COLS-1 )
             top_bar.refresh()
@@ -187,8 +268,13 @@ class CommandInterface:
         try:
             wrapper(self._go)
         except InterfaceError as ex:
-            self.stop_event.set()
+            self._quit()
             print(ex)
         except:
-            self.stop_event.set()
+            self._quit()
             raise
+
+    def _quit(self):
+        """End the interface and the thread running the machine"""
+        self.stop_event.set()
+        self.machine.control.quit()
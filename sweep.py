@@ -0,0 +1,78 @@
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.machines.assembler import AssemblerError
+from src.machines.engines import ENGINES
+from src.machines.imagecache import ImageCache
+from src.machines.models import MODELS
+from src.machines.sweep import sweep
+
+
+def parse_patch(text: str) -> tuple:
+    """Parse ADDRESS=VALUES, VALUES being a comma separated list or a START:STOP[:STEP] range"""
+    try:
+        address, values = text.split("=")
+        if ":" in values:
+            values = range(*(int(bound) for bound in values.split(":")))
+        else:
+            values = [int(value) for value in values.split(",")]
+        return int(address), values
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid patch '{text}', expected e.g. 29=1:47 or 29=1,2,3")
+
+
+def parse_arguments(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a SSEM program for every combination of patched store words")
+    parser.add_argument("file", help="program to run (.asm or .snp)")
+    parser.add_argument("--patch", type=parse_patch, action="append", required=True,
+                        help="values to write at an address, e.g. 29=1:47 or 29=1,2,3 (repeatable)")
+    parser.add_argument("--max-cycles", type=int, required=True, help="maximum number of cycles of each run")
+    parser.add_argument("--engine", choices=ENGINES, default="fast", help="execution engine (default: fast)")
+    parser.add_argument("--model", choices=MODELS, default="ssem", help="model of machine (default: ssem)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="number of runs sent to a worker at once")
+    parser.add_argument("--output", type=Path, required=True, help="results file, .csv or .npz")
+    arguments = parser.parse_args(argv)
+
+    word_count = MODELS[arguments.model].word_count
+    for address, _ in arguments.patch:
+        if not 0 <= address < word_count:
+            parser.error(f"patch address {address} out of the store of {word_count} words")
+    return arguments
+
+
+def main(argv: list = None) -> int:
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    ImageCache.enable_user_cache()
+
+    if arguments.output.suffix not in (".csv", ".npz"):
+        print("Error: the output file must end with .csv or .npz", file=sys.stderr)
+        return 1
+
+    try:
+        result = sweep(
+            arguments.file,
+            dict(arguments.patch),
+            arguments.max_cycles,
+            engine=ENGINES[arguments.engine],
+            workers=arguments.workers,
+            chunk_size=arguments.chunk_size,
+            model=MODELS[arguments.model],
+        )
+    except AssemblerError as ex:
+        print(ex, file=sys.stderr)
+        return 1
+
+    if arguments.output.suffix == ".csv":
+        result.to_csv(arguments.output)
+    else:
+        result.to_npz(arguments.output)
+
+    print(f"{len(result)} runs, {sum(result.cycles)} cycles", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Programs loaded by the tests are cached in a directory of their own, not in the cache of the user
+os.environ["SSEM_IMAGE_CACHE"] = tempfile.mkdtemp(prefix="ssem-image-cache-")
+atexit.register(shutil.rmtree, os.environ["SSEM_IMAGE_CACHE"], ignore_errors=True)
@@ -173,3 +173,56 @@ class TestBitArray(TestCase):
 
         self.assertEqual("___...___...___...", str(b("111000111000111000")))
 
+
+    def test_from_int_overflow(self):
+        with self.assertRaises(IndexError):
+            # 32 needs 6 digits
+            b(32, 5)
+
+        with self.assertRaises(IndexError):
+            b(-33, 5)
+
+        self.assertEqual(b("1111111"), b(127, 7), "Largest unsigned value")
+        self.assertEqual(b("0000001"), b(-64, 7), "Smallest signed value")
+
+        for value in (-65, -127, -128):
+            with self.assertRaises(IndexError, msg=value):
+                # -127 used to wrap around to 1
+                b(value, 7)
+
+    def test___getitem__(self):
+        x = b("0110100")
+        self.assertEqual(False, x[0])
+        self.assertEqual(True, x[1])
+        self.assertEqual(False, x[-1])
+        self.assertEqual(True, x[-3])
+        self.assertEqual(b("101"), x[2:5])
+        self.assertEqual(b("0100"), x[3:])
+        self.assertEqual(b(""), x[5:2])
+        self.assertEqual(b("0110"), x[0:7:2])
+
+        with self.assertRaises(IndexError):
+            x[7]
+
+    def test___setitem__(self):
+        x = b("0000")
+        x[1] = True
+        x[-1] = 1
+        self.assertEqual(b("0101"), x)
+        x[1] = False
+        self.assertEqual(b("0001"), x)
+
+        with self.assertRaises(IndexError):
+            x[4] = True
+
+    def test___eq__(self):
+        self.assertEqual(b("0101"), b("0101"))
+        self.assertNotEqual(b("0101"), b("01010"), "Same value but different sizes")
+        self.assertNotEqual(b("0101"), [False, True, False, True], "Not a BitArray")
+
+    def test_copy(self):
+        x = b("0101")
+        y = b(x)
+        y[0] = True
+        self.assertEqual(b("0101"), x, "A copy does not share its bits")
+        self.assertEqual(b("1101"), y)
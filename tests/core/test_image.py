@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+from src.core.image import pack_words, unpack_words
+
+
+class TestImage(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_pack_words(self):
+        self.assertEqual(b"\x01\x00\x00\x00\xff\xff\xff\xff", pack_words([1, 0xFFFFFFFF], 32))
+        self.assertEqual(16, len(pack_words([1, 2], 40)), "Words longer than 32 bits take 8 bytes")
+
+        with self.assertRaises(ValueError):
+            pack_words([1], 65)
+
+    def test_unpack_words(self):
+        for word_length, words in ((5, [0, 31]), (32, [7, 0xFFFFFFFF, 0]), (40, [1 << 39, 3])):
+            self.assertEqual(words, unpack_words(pack_words(words, word_length), word_length))
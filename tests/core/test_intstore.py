@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.core.intstore import IntStore
+
+
+class TestIntStore(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test___init__(self):
+        store = IntStore(23, 42)
+        self.assertEqual(42, len(store.words), "Number of words")
+        self.assertEqual(b("00000000000000000000000"), store[41], "Size of words")
+
+    def test_properties(self):
+        store = IntStore(10, 11)
+
+        self.assertEqual(10, store.word_length, "Word length property")
+        self.assertEqual(11, store.word_count, "Word count property")
+
+    def test_bracket_operator(self):
+        store = IntStore(8, 3)
+
+        store[1] = b("10101010")
+
+        self.assertEqual(b("00000000"), store[0])
+        self.assertEqual(b("10101010"), store[1])
+        self.assertEqual(b("00000000"), store[2])
+        self.assertEqual([0, 85, 0], store.words)
+
+        with self.assertRaises(IndexError):
+            store[3] = b("10101010")
+
+        with self.assertRaises(ValueError):
+            store[0] = b("1010101")
+
+    def test_words(self):
+        store = IntStore(8, 3)
+        words = store.words
+
+        words[2] = 15
+        self.assertEqual(b("11110000"), store[2], "Words are the actual storage")
+
+        store.clear()
+        self.assertIs(words, store.words, "Clearing keeps the same list")
+        self.assertEqual([0, 0, 0], words)
+
+    def test_read_write(self):
+        store = IntStore(8, 4)
+        writes = []
+        store.watch(lambda start, stop: writes.append((start, stop)))
+
+        store.write(1, [1, -1, b("11110000")])
+
+        self.assertEqual([0, 1, 255, 15], store.read())
+        self.assertEqual([1, 255], store.read(1, 3))
+        self.assertEqual([(1, 4)], writes)
+
+        with self.assertRaises(ValueError):
+            store.write(0, [256])
+        with self.assertRaises(IndexError):
+            store.write(3, [1, 2])
+
+    def test_watch(self):
+        store = IntStore(8, 4)
+        writes = []
+        store.watch(lambda start, stop: writes.append((start, stop)))
+
+        store[1] = b("10101010")
+        store.words[2] = 1
+        store.clear()
+
+        self.assertEqual([(1, 2), (0, 4)], writes)
+
+    def test___str__(self):
+        store = IntStore(8, 3)
+
+        store[0] = b("10101010")
+        store[1] = b("11111111")
+        store[2] = b("11110000")
+
+        expected_result = """_._._._.
+________
+____...."""
+
+        self.assertEqual(expected_result, str(store))
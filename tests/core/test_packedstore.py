@@ -0,0 +1,137 @@
+from unittest import TestCase, skipIf
+
+try:
+    import numpy as np
+    from src.core.packedstore import PackedStore
+except ImportError:
+    np = None
+
+from src.core.bitarray import b
+from src.core.store import Store
+
+
+@skipIf(np is None, "NumPy is not installed")
+class TestPackedStore(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test___init__(self):
+        store = PackedStore(23, 42)
+        self.assertEqual(np.uint32, store.dtype)
+        self.assertEqual(42 * 4, store.nbytes)
+        self.assertEqual(b("00000000000000000000000"), store[41])
+
+        store = PackedStore(40, 8)
+        self.assertEqual(np.uint64, store.dtype)
+        self.assertEqual(8 * 8, store.nbytes)
+
+        with self.assertRaises(ValueError):
+            PackedStore(65, 8)
+
+    def test_properties(self):
+        store = PackedStore(10, 11)
+
+        self.assertEqual(10, store.word_length, "Word length property")
+        self.assertEqual(11, store.word_count, "Word count property")
+
+    def test_bracket_operator(self):
+        store = PackedStore(8, 3)
+
+        store[1] = b("10101010")
+
+        self.assertEqual(b("00000000"), store[0])
+        self.assertEqual(b("10101010"), store[1])
+        self.assertEqual(b("00000000"), store[2])
+        self.assertEqual(b("10101010"), store[-2])
+
+        with self.assertRaises(IndexError):
+            store[3] = b("10101010")
+
+        with self.assertRaises(ValueError):
+            store[0] = b("1010101")
+
+        word = store[1]
+        word[0] = False
+        self.assertEqual(b("10101010"), store[1], "Words are returned as copies")
+
+    def test_iteration(self):
+        store = PackedStore(4, 3)
+        store[2] = b("0011")
+
+        self.assertEqual([b("0000"), b("0000"), b("0011")], list(store))
+
+    def test_read_write(self):
+        store = PackedStore(8, 4)
+
+        store.write(1, [3, -1, b("00000001")])
+
+        self.assertEqual([0, 3, 255, 128], store.read().tolist())
+        self.assertEqual([3, 255], store.read(1, 3).tolist())
+        self.assertEqual(b("11000000"), store[1])
+
+        store.write(0, np.array([7], dtype=np.uint32))
+        self.assertEqual(7, store.read()[0])
+
+        copy = store.read()
+        copy[0] = 0
+        self.assertEqual(7, store.read()[0], "Reading returns a copy")
+
+        with self.assertRaises(ValueError):
+            store.write(0, [256])
+
+        with self.assertRaises(ValueError):
+            store.write(0, np.array([256], dtype=np.uint32))
+
+        with self.assertRaises(IndexError):
+            store.write(3, [1, 2])
+
+    def test_compare(self):
+        store = PackedStore(8, 3)
+        store.write(0, [1, 2, 3])
+
+        other = PackedStore(8, 3)
+        other.write(0, [1, 5, 3])
+        self.assertEqual([True, False, True], store.compare(other).tolist())
+
+        other = Store(8, 3)
+        other[0] = b(1, 8)
+        self.assertEqual([True, False, False], store.compare(other).tolist())
+
+        self.assertEqual([True, True, True], store.compare([1, 2, 3]).tolist())
+
+        with self.assertRaises(ValueError):
+            store.compare([1, 2])
+
+    def test_clear(self):
+        store = PackedStore(8, 3)
+        store.write(0, [1, 2, 3])
+
+        store.clear()
+
+        self.assertEqual([0, 0, 0], store.read().tolist())
+
+    def test___str__(self):
+        store = PackedStore(8, 3)
+
+        store[0] = b("10101010")
+        store[1] = b("11111111")
+        store[2] = b("11110000")
+
+        expected_result = """_._._._.
+________
+____...."""
+
+        self.assertEqual(expected_result, str(store))
+
+    def test_watch(self):
+        store = PackedStore(8, 4)
+        writes = []
+        store.watch(lambda start, stop: writes.append((start, stop)))
+
+        store[1] = b("10101010")
+        store[-1] = b("10101010")
+        store.write(1, [1, 2])
+        store.clear()
+
+        self.assertEqual([(1, 2), (3, 4), (1, 3), (0, 4)], writes)
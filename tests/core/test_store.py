@@ -77,3 +77,51 @@ ____...."""
 
         self.assertEqual(expected_result, str(store))
 
+
+    def test_clear_does_not_share_words(self):
+        store = Store(8, 3)
+
+        store[0].engrave(0, b("1"))
+
+        self.assertEqual(b("10000000"), store[0])
+        self.assertEqual(b("00000000"), store[1])
+        self.assertEqual(b("00000000"), store[2])
+
+    def test_watch(self):
+        store = Store(8, 4)
+        writes = []
+        store.watch(lambda start, stop: writes.append((start, stop)))
+
+        store[1] = b("10101010")
+        store[-1] = b("10101010")
+        store.clear()
+
+        self.assertEqual([(1, 2), (3, 4), (0, 4)], writes)
+
+    def test_unwatch(self):
+        store = Store(8, 4)
+        writes = []
+        callback = lambda start, stop: writes.append((start, stop))
+        store.watch(callback)
+        store.unwatch(callback)
+
+        store[1] = b("10101010")
+
+        self.assertEqual([], writes)
+
+    def test_read_write(self):
+        store = Store(8, 4)
+        writes = []
+        store.watch(lambda start, stop: writes.append((start, stop)))
+
+        store.write(1, [1, -1, b("11110000")])
+
+        self.assertEqual([0, 1, 255, 15], store.read())
+        self.assertEqual([1, 255], store.read(1, 3))
+        self.assertEqual(b("11111111"), store[2])
+        self.assertEqual([(1, 4)], writes)
+
+        with self.assertRaises(ValueError):
+            store.write(0, [256])
+        with self.assertRaises(IndexError):
+            store.write(3, [1, 2])
@@ -0,0 +1,51 @@
+import json
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from batch import main
+
+
+class TestBatchCommand(TestCase):
+
+    def setUp(self):
+        pass
+
+    def run_main(self, *argv) -> tuple:
+        stderr = StringIO()
+        with redirect_stderr(stderr):
+            status = main(list(argv))
+        return status, stderr.getvalue()
+
+    def test_images_and_report(self):
+        with TemporaryDirectory() as directory:
+            output = Path(directory) / "images"
+            report = Path(directory) / "report.jsonl"
+            status, stderr = self.run_main("samples/ssem", "--output", str(output), "--report", str(report), "--workers", "2")
+
+            images = sorted(str(image.relative_to(output)) for image in output.rglob("*.img"))
+            entries = [json.loads(line) for line in report.read_text().splitlines()]
+
+        self.assertEqual(0, status)
+        self.assertIn("11 programs, 0 with errors", stderr)
+        self.assertEqual(11, len(images))
+        self.assertIn("fibonacci.img", images)
+        self.assertIn("tests/JMP1Test.img", images)
+        self.assertEqual(11, len(entries))
+        self.assertTrue(all(entry["ok"] and entry["image"].endswith(".img") for entry in entries))
+
+    def test_errors(self):
+        with TemporaryDirectory() as directory:
+            broken = Path(directory) / "broken.asm"
+            broken.write_text("00 NUM 1\n01 LDN\n")
+            status, stderr = self.run_main(str(broken), "samples/ssem/fibonacci.asm")
+
+        self.assertEqual(1, status)
+        self.assertIn(f"{broken}:2:7: E104 Missing data for 'LDN' instruction", stderr)
+        self.assertIn("2 programs, 1 with errors", stderr)
+
+        status, stderr = self.run_main("nothing/*.asm")
+        self.assertEqual(1, status)
+        self.assertIn("no program found", stderr)
@@ -0,0 +1,142 @@
+import json
+import os
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from main import main
+from src.machines.trace import TraceReader
+
+
+class TestHeadless(TestCase):
+
+    def setUp(self):
+        pass
+
+    def run_main(self, *argv) -> tuple:
+        stdout = StringIO()
+        stderr = StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status = main(list(argv))
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_json(self):
+        for engine in ("reference", "fast", "compiled", "accelerated"):
+            status, stdout, _ = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--engine", engine)
+
+            self.assertEqual(0, status)
+            output = json.loads(stdout)
+            self.assertEqual(773, output["cycles"], engine)
+            self.assertEqual("stop", output["stop_reason"], engine)
+            self.assertEqual(8, output["ci"], engine)
+            self.assertEqual(0, output["a"], engine)
+            self.assertEqual(1836311903, output["store"][27], engine)
+
+    def test_model(self):
+        for model, word_count in (("ssem-8k", 8192), ("manchester-40", 1024)):
+            status, stdout, _ = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--engine", "fast", "--model", model)
+
+            self.assertEqual(0, status)
+            output = json.loads(stdout)
+            self.assertEqual(773, output["cycles"], model)
+            self.assertEqual(word_count, len(output["store"]), model)
+            self.assertEqual(1836311903, output["store"][27], model)
+
+    def test_snp(self):
+        status, stdout, _ = self.run_main("samples/ssem/tests/JMP1Test.snp", "--headless", "--max-cycles", "50", "--dump", "snp")
+
+        self.assertEqual(0, status)
+        lines = stdout.splitlines()
+        self.assertEqual("; CI: 18", lines[1])
+        self.assertEqual("0000: 00000000000000000000000000000000", lines[3])
+        self.assertEqual("0031: 11111000000000000000000000000000", lines[34])
+
+    def test_strict(self):
+        status, stdout, _ = self.run_main("samples/ssem/tests/JMP1Test.snp", "--headless", "--max-cycles", "50", "--strict")
+
+        self.assertEqual(2, status)
+        self.assertEqual("budget", json.loads(stdout)["stop_reason"])
+
+    def test_profile(self):
+        status, stdout, stderr = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--profile", "json")
+
+        self.assertEqual(0, status)
+        self.assertEqual(773, json.loads(stdout)["cycles"])
+        profile = json.loads(stderr)
+        self.assertEqual(773, profile["cycles"])
+        self.assertEqual(45, profile["cmp_taken"][7])
+
+    def test_trace(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "fibonacci.trace"
+            status, _, _ = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--trace", str(path))
+            lines = list(TraceReader(path).lines())
+
+        self.assertEqual(0, status)
+        self.assertEqual(773, len(lines))
+        self.assertEqual(["01 LDN 31", "02 SUB 00"], lines[:2])
+        self.assertEqual("08 STP 00", lines[-1])
+
+    def test_assembler_error(self):
+        status, _, stderr = self.run_main("README.md", "--headless")
+
+        self.assertEqual(1, status)
+        self.assertIn("File format not recognized", stderr)
+
+    def test_break(self):
+        status, stdout, _ = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--break", "8")
+
+        self.assertEqual(0, status)
+        output = json.loads(stdout)
+        self.assertEqual("break", output["stop_reason"])
+        self.assertEqual("break at 08", output["break"])
+        self.assertEqual(772, output["cycles"])
+
+        status, stdout, _ = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--watch", "31 write if store[31] == 3", "--dump", "snp")
+        self.assertEqual(0, status)
+        self.assertEqual("; break: watch 31 (write) if store[31] == 3", stdout.splitlines()[1])
+
+        status, stdout, stderr = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--break", "if B")
+        self.assertEqual(1, status)
+        self.assertIn("Unknown name 'B'", stderr)
+
+        status, stdout, stderr = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--break", "if A < 0 or store[99] == 1")
+        self.assertEqual(1, status)
+        self.assertIn("Address 99 out of the store", stderr)
+
+    def test_detect_loops(self):
+        status, stdout, _ = self.run_main("samples/ssem/tests/JMP1Test.snp", "--headless", "--max-cycles", "100000", "--detect-loops")
+
+        self.assertEqual(0, status)
+        output = json.loads(stdout)
+        self.assertEqual("loop", output["stop_reason"])
+        self.assertEqual({"entry_cycle": 0, "entry_address": 1, "period": 32}, output["loop"])
+        self.assertLess(output["cycles"], 100)
+
+        status, stdout, _ = self.run_main("samples/ssem/tests/JMP1Test.snp", "--headless", "--detect-loops", "--dump", "snp")
+        self.assertEqual(0, status)
+        self.assertEqual("; loop of 32 cycles entered at cycle 0, address 01", stdout.splitlines()[1])
+
+        status, stdout, _ = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--detect-loops")
+        self.assertIsNone(json.loads(stdout)["loop"])
+
+    def test_cache_stats(self):
+        with TemporaryDirectory() as directory, patch.dict(os.environ, {"SSEM_IMAGE_CACHE": directory}):
+            self.run_main("samples/ssem/fibonacci.asm", "--headless")
+            status, _, stderr = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--cache-stats")
+
+        self.assertEqual(0, status)
+        self.assertIn(f"Image cache {directory}", stderr)
+        self.assertIn("entries: 1, 128 of", stderr)
+        self.assertIn("hits: 1, misses: 0", stderr)
+
+    def test_asm(self):
+        status, stdout, _ = self.run_main("samples/ssem/fibonacci.asm", "--headless", "--dump", "asm")
+
+        self.assertEqual(0, status)
+        lines = stdout.splitlines()
+        self.assertEqual("; CI: 8", lines[1])
+        self.assertEqual(["00 NUM 1", "01 LDN 31", "08 STP", "27 NUM 1836311903"], [lines[3], lines[4], lines[11], lines[30]])
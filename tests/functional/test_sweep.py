@@ -0,0 +1,53 @@
+import csv
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from sweep import main
+
+
+class TestSweepCommand(TestCase):
+
+    def setUp(self):
+        pass
+
+    def run_main(self, *argv) -> tuple:
+        stderr = StringIO()
+        with redirect_stderr(stderr):
+            status = main(list(argv))
+        return status, stderr.getvalue()
+
+    def test_csv(self):
+        with TemporaryDirectory() as directory:
+            output = Path(directory) / "results.csv"
+            status, stderr = self.run_main(
+                "samples/ssem/fibonacci.asm", "--patch", "29=1:47", "--patch", "0=1,2",
+                "--max-cycles", "10000", "--workers", "2", "--output", str(output),
+            )
+            with open(output, newline="") as file:
+                rows = list(csv.DictReader(file))
+
+        self.assertEqual(0, status)
+        self.assertIn("92 runs", stderr)
+        self.assertEqual(92, len(rows))
+        self.assertEqual(("46", "1"), (rows[-2]["patch_29"], rows[-2]["patch_00"]))
+        self.assertEqual("1836311903", rows[-2]["word_27"])
+
+    def test_wrong_output(self):
+        status, stderr = self.run_main("samples/ssem/fibonacci.asm", "--patch", "29=1", "--max-cycles", "10", "--output", "results.txt")
+
+        self.assertEqual(1, status)
+        self.assertIn(".csv or .npz", stderr)
+
+    def test_wrong_address(self):
+        for model, address in (("ssem", "99"), ("ssem", "32"), ("ssem-8k", "8192")):
+            with self.assertRaises(SystemExit, msg=address):
+                self.run_main("samples/ssem/fibonacci.asm", "--patch", f"{address}=1,2", "--max-cycles", "100",
+                              "--model", model, "--output", "results.csv")
+
+        stderr = StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit):
+            main(["samples/ssem/fibonacci.asm", "--patch", "99=1,2", "--max-cycles", "100", "--output", "results.csv"])
+        self.assertIn("patch address 99 out of the store of 32 words", stderr.getvalue())
@@ -0,0 +1,102 @@
+from pathlib import Path
+from random import Random
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.machines.acceleratedssem import AcceleratedSsem
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+
+
+SAMPLES = sorted(Path("samples/ssem").glob("**/*.asm")) + sorted(Path("samples/ssem").glob("**/*.snp"))
+
+
+class EagerSsem(AcceleratedSsem):
+    """AcceleratedSsem looking for loops even in short programs"""
+    min_slice = 16
+    min_budget = 16
+
+
+class TestAcceleratedSsem(TestCase):
+
+    def setUp(self):
+        pass
+
+    def assertSameState(self, expected: Ssem, actual: AcceleratedSsem, message: str):
+        self.assertEqual(expected.ci, actual.ci, f"{message}: CI")
+        self.assertEqual(expected.a, actual.a, f"{message}: A")
+        self.assertEqual(expected.stop_flag, actual.stop_flag, f"{message}: stop flag")
+        self.assertEqual(expected.last_instruction, actual.last_instruction, f"{message}: last instruction")
+        self.assertEqual(expected.last_cycle, actual.last_cycle, f"{message}: cycles")
+        self.assertEqual(str(expected.store), str(actual.store), f"{message}: store")
+
+    def test_samples(self):
+        for sample in SAMPLES:
+            for max_cycles in (1, 100, 773, 5000):
+                reference = Ssem(file=sample)
+                accelerated = EagerSsem(file=sample)
+
+                expected = reference.run(max_cycles=max_cycles)
+                result = accelerated.run(max_cycles=max_cycles)
+
+                self.assertEqual(expected.cycles, result.cycles, f"{sample.name}, {max_cycles} cycles")
+                self.assertEqual(expected.stop_reason, result.stop_reason)
+                self.assertSameState(reference, accelerated, f"{sample.name}, {max_cycles} cycles")
+
+    def test_fibonacci(self):
+        reference = Ssem(file="samples/ssem/fibonacci.asm")
+        accelerated = EagerSsem(file="samples/ssem/fibonacci.asm")
+
+        self.assertEqual(reference.run().cycles, accelerated.run().cycles)
+        self.assertSameState(reference, accelerated, "fibonacci")
+        self.assertGreater(accelerated.accelerated_cycles, 600, "Most of the loop is skipped")
+
+    def test_long_loops(self):
+        factor = FastSsem(file="samples/ssem/factorct.asm")
+        accelerated_factor = AcceleratedSsem(file="samples/ssem/factorct.asm")
+        for machine in (factor, accelerated_factor):
+            machine.store[23] = b(-40000, 32)
+            machine.store[24] = b(39999, 32)
+
+        fibonacci = FastSsem(file="samples/ssem/fibonacci.asm")
+        accelerated_fibonacci = AcceleratedSsem(file="samples/ssem/fibonacci.asm")
+        for machine in (fibonacci, accelerated_fibonacci):
+            machine.store[29] = b(20000, 32)    # Wraps around the word size many times
+
+        for name, fast, accelerated in (("factorct", factor, accelerated_factor), ("fibonacci", fibonacci, accelerated_fibonacci)):
+            self.assertEqual(fast.run().cycles, accelerated.run().cycles, name)
+            self.assertSameState(fast, accelerated, name)
+            self.assertGreater(accelerated.accelerated_cycles, 0.9 * accelerated.last_cycle, name)
+
+    def test_budget(self):
+        for max_cycles in (700, 701, 702, 720, 772, 773):
+            fast = FastSsem(file="samples/ssem/fibonacci.asm")
+            accelerated = EagerSsem(file="samples/ssem/fibonacci.asm")
+
+            self.assertEqual(fast.run(max_cycles=max_cycles).cycles, accelerated.run(max_cycles=max_cycles).cycles)
+            self.assertSameState(fast, accelerated, f"{max_cycles} cycles")
+
+    def test_random_programs(self):
+        random = Random(18)
+        for program in range(200):
+            words = [
+                random.choice((0, 1, 2, 3, 4, 6)) << 13 | random.randrange(32) if random.random() < 0.6
+                else random.choice((0, 1, 2, 5, 30, -1, -3, random.randrange(1 << 32))) % (1 << 32)
+                for _ in range(32)
+            ]
+            fast = FastSsem()
+            accelerated = EagerSsem()
+            fast.store.write(0, words)
+            accelerated.store.write(0, words)
+
+            fast.run(max_cycles=3000)
+            accelerated.run(max_cycles=3000)
+            self.assertSameState(fast, accelerated, f"program {program}")
+
+    def test_observed(self):
+        accelerated = EagerSsem(file="samples/ssem/fibonacci.asm")
+        profiler = accelerated.enable_profiling()
+        accelerated.run()
+
+        self.assertEqual(773, profiler.cycles, "Observers see every instruction")
+        self.assertEqual(0, accelerated.accelerated_cycles)
@@ -1,11 +1,15 @@
 from enum import Enum
+from io import StringIO
 from pathlib import Path
+from time import perf_counter
 from unittest import TestCase
 from unittest.mock import MagicMock, mock_open, patch
 
 from src.core.bitarray import b
 from src.core.store import Store
 from src.machines.assembler import Assembler, AssemblerError
+from src.machines.fastssem import FastSsem
+from src.machines.instructionset import InstructionSet
 from src.machines.ssemmodel import SsemModel
 
 
@@ -32,42 +36,80 @@ class TestAssembler(TestCase):
         self.mock_model.Mnemonic = SampleMnemonic
 
     def test_load_file(self):
-        # Test case: asm file
-        # Arrange
-        mock_self = MagicMock(spec=Assembler)
-        mock_store = MagicMock(spec=Store)
-        mock_self._guess_file_format.return_value = "asm"
-        # Act
-        Assembler.load_file(mock_self, Path("some_path"), mock_store)
-        # Assert
-        mock_self.load_asm.assert_called_once_with(Path("some_path"), mock_store)
-        mock_self.load_snp.assert_not_called()
-
-        # Test case: snp file
-        # Arrange
-        mock_self = MagicMock(spec=Assembler)
-        mock_store = MagicMock(spec=Store)
-        mock_self._guess_file_format.return_value = "snp"
-        # Act
-        Assembler.load_file(mock_self, Path("some_path"), mock_store)
-        # Assert
-        mock_self.load_asm.assert_not_called()
-        mock_self.load_snp.assert_called_once_with(Path("some_path"), mock_store)
-
-        # Test case: unknown format
-        # Arrange
-        mock_self = MagicMock(spec=Assembler)
-        mock_store = MagicMock(spec=Store)
-        mock_self._guess_file_format.return_value = None
-        # Act
-        with self.assertRaises(AssemblerError):
-            Assembler.load_file(mock_self, Path("some_path"), mock_store)
+        assembler = Assembler(SsemModel, cache=None)
+        expected = Store(word_length=32, word_count=32)
+        expected[0] = b("00000000000000000000000000000000")
+        expected[1] = b("11111000000000100000000000000000")
+
+        # asm file, given by its path or open
+        store = Store(word_length=32, word_count=32)
+        with patch("builtins.open", mock_open(read_data="; Some comment\n00 NUM 0\n01 LDN 31 ; Load\n")):
+            assembler.load_file(Path("some_path"), store)
+        self.assertEqual(expected.read(), store.read())
+
+        store = Store(word_length=32, word_count=32)
+        assembler.load_file(StringIO("00 NUM 0\n01 LDN 31\n"), store)
+        self.assertEqual(expected.read(), store.read())
+
+        # snp file
+        store = Store(word_length=32, word_count=32)
+        assembler.load_file(StringIO("0000: 00000000000000000000000000000000\n0001: 11111000000000100000000000000000\n"), store)
+        self.assertEqual(expected.read(), store.read())
+
+        # unknown format, the store is left untouched
+        store = Store(word_length=32, word_count=32)
+        with self.assertRaises(AssemblerError) as context:
+            assembler.load_file(StringIO("foo bar\n"), store)
+        self.assertEqual("E001", context.exception.diagnostics[0].code)
+        self.assertIn("File format not recognized", str(context.exception))
+        self.assertEqual([0] * 32, store.read())
+
+    def test_load_text(self):
+        assembler = Assembler(SsemModel)
+        store = Store(word_length=32, word_count=32)
+        store[5] = b("1" * 32)
+
+        assembler.load_text("00 NUM -1\n01 STP\n", store)
+        self.assertEqual([(1 << 32) - 1, 7 << 13] + [0] * 30, store.read(), "Words after the program cleared")
+
+    def test_assemble(self):
+        assembler = Assembler(SsemModel)
+
+        assembly = assembler.assemble_text("; Some comment\n\n00 JMP 3\n01 SUB 31 ; Comment\n02 CMP\n03 NUM 42\n")
+        self.assertTrue(assembly.ok)
+        self.assertEqual("asm", assembly.format)
+        self.assertEqual([3, 31 | 4 << 13, 6 << 13, 42] + [0] * 28, list(assembly.words))
+        self.assertEqual(32 * 4, len(assembly.image))
+
+        assembly = assembler.assemble(iter(["00: 10100000000000000000000000000000\n", "1:11100000000000000000000000000000"]))
+        self.assertTrue(assembly.ok)
+        self.assertEqual("snp", assembly.format)
+        self.assertEqual([5, 7] + [0] * 30, list(assembly.words))
+
+    def test_assemble_diagnostics(self):
+        assembler = Assembler(SsemModel)
+        test_suite = {
+            "": [(1, 1, "E001")],
+            "; Only a comment\n": [(1, 1, "E001")],
+            "  foo bar\n00 NUM 1\n": [(1, 3, "E001")],
+            "00 NUM 1\n02 NUM 2\n": [(2, 1, "E101")],
+            "00 NUM 1\nxx NUM 2\n": [(2, 1, "E101")],
+            "00 FOO\n01 NUM 1\n": [(1, 4, "E102")],
+            "00 NUM 1\n01 LDN\n02 CMP\n": [(2, 7, "E104")],
+            "00 JMP 32\n01 SUB -1\n02 LDN x\n": [(1, 8, "E105"), (2, 8, "E105"), (3, 8, "E105")],
+            "00 NUM 4294967296\n01 NUM 12a\n": [(1, 8, "E106"), (2, 8, "E106")],
+            "".join(f"{address:02d} NUM 0\n" for address in range(33)): [(33, 1, "E107")],
+            "00: 1010\n": [(1, 5, "E203")],
+            "00:\n01: 10100000000000000000000000000002\n": [(1, 4, "E202"), (2, 5, "E204")],
+            "00: 00000000000000000000000000000000\n00 NUM 1\n": [(2, 1, "E101"), (2, 9, "E202")],
+        }
 
-    def test_load_asm(self):
-        pass
+        for input, expected_output in test_suite.items():
+            assembly = assembler.assemble_text(input)
+            self.assertFalse(assembly.ok, input)
+            self.assertEqual(expected_output, [(d.line, d.column, d.code) for d in assembly.diagnostics], input)
 
-    def test_load_snp(self):
-        pass
+        self.assertEqual("2:7: E104 Missing data for 'LDN' instruction", str(assembler.assemble_text("00 NUM 1\n01 LDN\n").diagnostics[0]))
 
     def test__guess_file_format(self):
         mock_self = MagicMock(spec=Assembler)
@@ -111,6 +153,7 @@ foo bar
     def test_decode_instruction(self):
         mock_self = MagicMock(spec=Assembler)
         mock_self.model = self.mock_model
+        mock_self.instruction_set = InstructionSet(self.mock_model)
 
         test_func = Assembler.decode_instruction
 
@@ -151,4 +194,84 @@ foo bar
                 self.assertEqual(result, expected_output)
 
     def test_disassemble(self):
-        pass
+        assembler = Assembler(SsemModel, cache=None)
+
+        for file in sorted(Path("samples/ssem").glob("**/*.*")):
+            store = Store(32, 32)
+            assembler.load_file(file, store)
+            copy = Store(32, 32)
+            assembler.load_text(assembler.disassemble(store), copy)
+            self.assertEqual(store.read(), copy.read(), f"{file} round-trips")
+
+        store = Store(32, 32)
+        assembler.load_file(Path("samples/ssem/fibonacci.asm"), store)
+        lines = assembler.disassemble(store).splitlines()
+        self.assertEqual(32, len(lines))
+        self.assertEqual(["00 NUM 1", "01 LDN 31", "07 CMP", "08 STP", "09 LDN 27", "18 JMP 30", "29 NUM 46", "30 NUM 0"],
+                         [lines[address] for address in (0, 1, 7, 8, 9, 18, 29, 30)])
+
+    def test_disassemble_reachability(self):
+        assembler = Assembler(SsemModel, cache=None)
+        program = """
+00 NUM 0
+01 CMP
+02 JRP 7
+03 STP
+04 NUM 5
+05 LDN 8
+06 STP
+07 NUM 2
+08 NUM -8192
+"""
+        store = Store(32, 32)
+        assembler.load_text(program, store)
+        store[6] = b("1" * 32)      # Executed as STP, but cannot be written as such
+        lines = assembler.disassemble(store).splitlines()
+
+        self.assertEqual(["00 NUM 0", "01 CMP", "02 JRP 7", "03 STP", "04 NUM 5", "05 LDN 8", "06 NUM -1", "07 NUM 2", "08 NUM -8192", "09 NUM 0"],
+                         lines[:10], "Both outcomes of CMP followed, JRP to 2 + 2 + 1")
+
+        lines = assembler.disassemble(store, ci=3).splitlines()
+        self.assertEqual(["04 JMP 5", "09 JMP 0"], [lines[4], lines[9]], "Starts after CI, JMP to 16392 + 1 modulo 32")
+
+    def test_disassemble_negative_jumps(self):
+        class OddModel(SsemModel):
+            word_count = 24
+
+        assembler = Assembler(OddModel, cache=None)
+        instructions = {1: "JMP 20", 5: "STP", 10: "JRP 21", 20: "NUM 9", 21: "NUM -6"}
+        program = "".join(f"{address:02d} {instructions.get(address, 'NUM 0')}\n" for address in range(24))
+        machine = FastSsem(model=OddModel)
+        assembler.load_text(program, machine.store)
+        self.assertEqual(3, machine.run().cycles, "JMP to 10, JRP to 5")
+
+        lines = assembler.disassemble(machine.store).splitlines()
+        self.assertEqual(["01 JMP 20", "05 STP", "10 JRP 21", "20 NUM 9", "21 NUM -6"],
+                         [lines[1], lines[5], lines[10], lines[20], lines[21]], "Negative offsets taken as the engines do")
+
+    def test_disassemble_large_store(self):
+        class LargeModel(SsemModel):
+            word_count = 1 << 15
+            address_length = 15
+            opcode_start = 16
+
+        assembler = Assembler(LargeModel, cache=None)
+        store = Store(32, LargeModel.word_count)
+        jmp, ldn, sub, stp = 0 << 16, 2 << 16, 4 << 16, 7 << 16
+        words = []
+        for address in range(0, LargeModel.word_count - 4, 4):
+            # Jumping over a constant
+            words += [ldn | address + 3, sub | address + 3, jmp | address + 3, address + 3]
+        words += [stp, 0, 0, 0]
+        store.write(0, words)
+
+        start = perf_counter()
+        text = assembler.disassemble(store, ci=-1)
+        self.assertLess(perf_counter() - start, 1)
+
+        lines = text.splitlines()
+        self.assertEqual(["00000 LDN 3", "00001 SUB 3", "00002 JMP 3", "00003 NUM 3"], lines[:4])
+        self.assertEqual(["32763 NUM 32763", "32764 STP", "32765 NUM 0"], lines[-5:-2])
+        copy = Store(32, LargeModel.word_count)
+        assembler.load_text(text, copy)
+        self.assertEqual(words, copy.read())
@@ -0,0 +1,70 @@
+import asyncio
+from unittest import TestCase
+
+from src.machines.abstractmachine import CycleBudgetExceeded, StopReason
+from src.machines.asyncdriver import run
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+
+
+class TestAsyncDriver(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_run(self):
+        for cls in (Ssem, FastSsem, CompiledSsem):
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            machine.speed = 1000000
+
+            result = asyncio.run(run(machine))
+
+            self.assertEqual(773, result.cycles, cls.__name__)
+            self.assertEqual(StopReason.STOP, result.stop_reason, cls.__name__)
+            self.assertEqual(1836311903, machine.store[27].to_int(), cls.__name__)
+            self.assertTrue(machine.stop_flag, cls.__name__)
+
+    def test_max_cycles(self):
+        machine = FastSsem()
+        machine.speed = 1000000
+
+        result = asyncio.run(run(machine, max_cycles=12345))
+
+        self.assertEqual(12345, result.cycles)
+        self.assertEqual(12345, machine.last_cycle)
+        self.assertEqual(StopReason.BUDGET, result.stop_reason)
+
+        with self.assertRaises(CycleBudgetExceeded):
+            asyncio.run(run(FastSsem(), max_cycles=10, strict=True))
+
+    def test_after_break(self):
+        for cls in (Ssem, FastSsem, CompiledSsem):
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            machine.speed = 1000000
+            machine.add_breakpoint(8)
+            self.assertEqual(StopReason.BREAK, asyncio.run(run(machine)).stop_reason, cls.__name__)
+
+            machine.clear_breakpoints()
+            result = asyncio.run(run(machine))
+            self.assertEqual(StopReason.STOP, result.stop_reason, "The previous break is forgotten")
+            self.assertEqual(1, result.cycles)
+            self.assertIsNone(machine.last_break)
+
+    def test_concurrent_machines(self):
+        async def run_machines():
+            machines = [FastSsem() for _ in range(50)]
+            for number, machine in enumerate(machines):
+                machine.speed = 100 * (number + 1)
+            tasks = [asyncio.create_task(run(machine)) for machine in machines]
+            await asyncio.sleep(0.5)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return machines
+
+        machines = asyncio.run(run_machines())
+
+        for machine in machines:
+            self.assertAlmostEqual(machine.speed * 0.5, machine.last_cycle, delta=machine.speed * 0.1, msg=machine.speed)
+            self.assertTrue(machine.stop_flag, "Cancelled machines are stopped")
@@ -0,0 +1,59 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src.core.image import unpack_words
+from src.core.store import Store
+from src.machines.assembler import Assembler
+from src.machines.batch import assemble_batch, find_programs
+from src.machines.ssemmodel import SsemModel
+
+
+class TestBatch(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_find_programs(self):
+        programs = find_programs(["samples/ssem"])
+        self.assertEqual(11, len(programs))
+        self.assertEqual(Path("samples/ssem/factorct.asm"), programs[0])
+
+        self.assertEqual(9, len(find_programs(["samples/**/*.snp"])))
+        self.assertEqual(
+            [Path("samples/ssem/fibonacci.asm"), Path("samples/ssem/factorct.asm")],
+            find_programs(["samples/ssem/fibonacci.asm", "samples/ssem/*.asm"]),
+            "Files given once, in the order found"
+        )
+
+    def test_assemble_batch(self):
+        with TemporaryDirectory() as directory:
+            broken = Path(directory) / "broken.asm"
+            broken.write_text("00 NUM 1\n01 FOO\n")
+            files = find_programs(["samples/ssem"]) + [broken, Path(directory) / "missing.asm"]
+
+            results = {result.file: result for result in assemble_batch(files, workers=2, chunk_size=2)}
+
+        self.assertEqual(set(files), set(results))
+        for file in files[:11]:
+            store = Store(32, 32)
+            Assembler(SsemModel, cache=None).load_file(file, store)
+            self.assertTrue(results[file].ok, file)
+            self.assertEqual(store.read(), unpack_words(results[file].image, 32), file)
+        self.assertEqual("snp", results[files[-3]].format)
+
+        result = results[broken]
+        self.assertFalse(result.ok)
+        self.assertIsNone(result.image)
+        self.assertEqual({"file": str(broken), "format": "asm", "ok": False,
+                          "diagnostics": [{"line": 2, "column": 4, "code": "E102", "message": "Invalid mnemonic 'FOO'"}]},
+                         result.to_dict())
+        self.assertEqual("E002", results[files[-1]].diagnostics[0].code)
+
+    def test_streaming(self):
+        results = assemble_batch(find_programs(["samples/ssem"]), workers=2, chunk_size=1)
+        first = next(results)
+        self.assertTrue(first.ok)
+        results.close()
+
+        self.assertEqual([], list(assemble_batch([])))
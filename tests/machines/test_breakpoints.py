@@ -0,0 +1,195 @@
+import asyncio
+from unittest import TestCase
+
+from src.machines.abstractmachine import StopReason
+from src.machines.asyncdriver import run
+from src.machines.breakpoints import Breakpoint, Condition, ConditionalBreak, Watchpoint, parse_breakpoint
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+
+
+ENGINES = (Ssem, FastSsem, CompiledSsem)
+
+
+class TestCondition(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_dependencies(self):
+        condition = Condition("A < 0 and store[31] == 46 or store[29] > -1")
+
+        self.assertTrue(condition.uses_a)
+        self.assertFalse(condition.uses_ci)
+        self.assertEqual({29, 31}, condition.addresses)
+        self.assertTrue(Condition("CI == 7").uses_ci)
+
+    def test_evaluate(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+
+        self.assertTrue(Condition("store[29] == 46")(machine))
+        self.assertFalse(Condition("A < 0")(machine))
+        self.assertFalse(Condition("store[27] // store[26] == 0")(machine), "Division by zero is false")
+        machine.instruction_cycles(2)
+        self.assertTrue(Condition("A == -1 and CI == 2")(machine))
+
+    def test_invalid(self):
+        for text in ("A <", "B < 0", "__import__('os')", "store", "store[A]", "A.real", "A < 'a'", "[A]"):
+            with self.assertRaises(ValueError, msg=text):
+                Condition(text)
+
+
+class TestParseBreakpoint(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_parse(self):
+        breakpoint = parse_breakpoint("break 7")
+        self.assertIsInstance(breakpoint, Breakpoint)
+        self.assertEqual(7, breakpoint.address)
+        self.assertIsNone(breakpoint.condition)
+
+        self.assertEqual("break at 07 if A < 0", str(parse_breakpoint("break 7 if A < 0")))
+        self.assertEqual("watch 31 (read/write)", str(parse_breakpoint("watch 31")))
+        self.assertEqual("watch 31 (write)", str(parse_breakpoint("watch 31 write")))
+        self.assertEqual("watch 31 (read) if A == 1", str(parse_breakpoint(" watch 31 read if A == 1 ")))
+        self.assertIsInstance(parse_breakpoint("break if store[31] == 46"), ConditionalBreak)
+        self.assertEqual("break if store[31] == 46", str(parse_breakpoint("break if store[31] == 46")))
+
+    def test_invalid(self):
+        for text in ("", "break", "watch", "watch if A < 0", "break x", "break 7 write", "watch 31 both", "jump 7", "break 7 if"):
+            with self.assertRaises(ValueError, msg=text):
+                parse_breakpoint(text)
+
+
+class TestBreakpoints(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_breakpoint(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            breakpoint = machine.add_breakpoint(8)
+
+            result = machine.run()
+            self.assertEqual(StopReason.BREAK, result.stop_reason, cls.__name__)
+            self.assertIs(breakpoint, machine.last_break)
+            self.assertEqual(772, machine.last_cycle, "Stops before the instruction")
+            self.assertEqual(7, machine.ci.to_int())
+
+            result = machine.run()
+            self.assertEqual(StopReason.STOP, result.stop_reason, "Resumes with the instruction at the breakpoint")
+            self.assertEqual(1, result.cycles)
+            self.assertIsNone(machine.last_break)
+
+    def test_conditional_breakpoint(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            machine.add_breakpoint(9, condition="store[31] == 10")
+
+            self.assertEqual(StopReason.BREAK, machine.run().stop_reason, cls.__name__)
+            self.assertEqual(8, machine.ci.to_int())
+            self.assertEqual(10, machine.store[31].to_int())
+            self.assertEqual(55, machine.store[27].to_int())
+
+    def test_watchpoint(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            watchpoint = machine.add_watchpoint(27, read=False)
+
+            self.assertEqual(StopReason.BREAK, machine.run().stop_reason, cls.__name__)
+            self.assertIs(watchpoint, machine.last_break)
+            self.assertEqual("17 STO 27", machine.last_instruction, "Stops after the instruction")
+
+            machine.remove_breakpoint(watchpoint)
+            machine.add_watchpoint(29, write=False)
+            machine.run()
+            self.assertEqual("06 SUB 29", machine.last_instruction)
+
+    def test_conditional_break(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            machine.add_condition("A < 0")
+
+            machine.run()
+            self.assertEqual("02 SUB 00", machine.last_instruction, cls.__name__)
+            machine.run()
+            self.assertEqual("06 SUB 29", machine.last_instruction, "Stops again once it has become false and true")
+
+            machine.clear_breakpoints()
+            machine.add_condition("store[31] == 46")
+            machine.run()
+            self.assertEqual("05 STO 31", machine.last_instruction, "Evaluated after the writes of store[31]")
+
+    def test_numbers(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        first = machine.add_breakpoint(1)
+        second = machine.add_watchpoint(2)
+
+        self.assertEqual((1, 2), (first.number, second.number))
+        machine.remove_breakpoint(1)
+        self.assertEqual([second], list(machine.breakpoints))
+        with self.assertRaises(KeyError):
+            machine.remove_breakpoint(1)
+        with self.assertRaises(ValueError):
+            machine.add_breakpoint(32)
+        for condition in ("store[32] == 1", "A < 0 or store[99] == 1"):
+            with self.assertRaises(ValueError, msg=condition):
+                machine.add_condition(condition)
+            with self.assertRaises(ValueError, msg=condition):
+                machine.add_breakpoint(1, condition)
+        self.assertEqual([second], list(machine.breakpoints))
+
+    def test_snapshot(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        first = machine.add_breakpoint(1)
+        second = machine.add_breakpoint(2)
+
+        iterator = iter(machine.breakpoints)
+        machine.remove_breakpoint(first)
+        machine.add_watchpoint(3)
+        self.assertEqual([first, second], list(iterator), "Iterating goes through the breakpoints set when it started")
+
+    def test_zero_overhead(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        breakpoint = machine.add_breakpoint(8)
+        watchpoint = machine.add_watchpoint(27)
+        self.assertIn("instruction_cycles", vars(machine))
+
+        machine.remove_breakpoint(breakpoint)
+        machine.remove_breakpoint(watchpoint)
+        self.assertNotIn("instruction_cycles", vars(machine), "Regular execution once the breakpoints are removed")
+        self.assertEqual(StopReason.STOP, machine.run().stop_reason)
+
+    def test_history(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        machine.enable_history(checkpoint_interval=100)
+        machine.add_breakpoint(8)
+        machine.run()
+
+        machine.goto_cycle(150)
+        machine.goto_cycle(700)
+        self.assertEqual(700, machine.last_cycle, "Breakpoints do not interrupt the replay")
+
+    def test_asyncdriver(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        machine.speed = 1000000
+        machine.add_breakpoint(8)
+
+        result = asyncio.run(run(machine))
+        self.assertEqual(StopReason.BREAK, result.stop_reason)
+        self.assertEqual(772, result.cycles)
+
+    def test_control(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        machine.control.call(lambda machine: machine.add_watchpoint(31, read=False))
+        machine.control.step(10)
+        for name, value, done in machine.control.take():
+            machine._apply_command(name, value)
+            done.set()
+
+        self.assertEqual("03 STO 31", machine.last_instruction)
+        self.assertTrue(machine.stop_flag)
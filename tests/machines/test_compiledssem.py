@@ -0,0 +1,125 @@
+from pathlib import Path
+from random import Random
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.core.intstore import IntStore
+from src.machines.compiledssem import CompiledSsem
+from src.machines.ssem import Ssem
+from tests.machines.test_ssem import STP, self_modifying_program
+
+
+SAMPLES = sorted(Path("samples/ssem").glob("**/*.asm")) + sorted(Path("samples/ssem").glob("**/*.snp"))
+
+
+class TestCompiledSsem(TestCase):
+
+    def setUp(self):
+        pass
+
+    def assertSameState(self, expected: Ssem, actual: CompiledSsem, message: str):
+        self.assertEqual(expected.ci, actual.ci, f"{message}: CI")
+        self.assertEqual(expected.a, actual.a, f"{message}: A")
+        self.assertEqual(expected.stop_flag, actual.stop_flag, f"{message}: stop flag")
+        self.assertEqual(expected.last_instruction, actual.last_instruction, f"{message}: last instruction")
+        self.assertEqual(expected.last_cycle, actual.last_cycle, f"{message}: cycles")
+        self.assertEqual(str(expected.store), str(actual.store), f"{message}: store")
+
+    def test_instruction_cycles(self):
+        for sample in SAMPLES:
+            reference = Ssem(file=sample)
+            compiled = CompiledSsem(file=sample)
+            compiled.warm_up_cycles = 0
+
+            for count in (1, 7, 50, 2000):
+                self.assertEqual(
+                    reference.instruction_cycles(count),
+                    compiled.instruction_cycles(count),
+                    f"{sample.name}, cycles performed"
+                )
+                self.assertSameState(reference, compiled, f"{sample.name}, after {count} cycles")
+
+    def test_random_programs(self):
+        # Random words make programs overwriting their own code all the time
+        for seed in range(40):
+            random = Random(seed)
+            reference = Ssem()
+            compiled = CompiledSsem()
+            compiled.warm_up_cycles = 0
+            for address in range(32):
+                word = b(random.getrandbits(32), 32)
+                reference.store[address] = word
+                compiled.store[address] = word
+
+            for _ in range(20):
+                count = random.randint(1, 40)
+                self.assertEqual(
+                    reference.instruction_cycles(count),
+                    compiled.instruction_cycles(count),
+                    f"Seed {seed}, cycles performed"
+                )
+                self.assertSameState(reference, compiled, f"Seed {seed}")
+
+    def test_self_modifying_code(self):
+        compiled = CompiledSsem()
+        compiled.warm_up_cycles = 0
+        self_modifying_program(compiled)
+
+        self.assertEqual(6, compiled.instruction_cycles(1000))
+
+        self.assertEqual(1, compiled.ci.to_int(), "Stopped on the rewritten instruction")
+        self.assertEqual(-5, compiled.store[27].to_int())
+
+    def test_traced_self_modifying_code(self):
+        compiled = CompiledSsem()
+        compiled.warm_up_cycles = 0
+        self_modifying_program(compiled)
+        compiled._compile_block(1)
+        compiled.enable_trace()
+
+        self.assertEqual(6, compiled.instruction_cycles(1000))
+        self.assertEqual(1, compiled.ci.to_int(), "Stopped on the rewritten instruction")
+        self.assertEqual(0, compiled.compiled_blocks, "The block overwritten while tracing has been forgotten")
+
+    def test_external_write(self):
+        compiled = CompiledSsem()
+        compiled.warm_up_cycles = 0
+        compiled.store[1] = b(2 << 13, 32)  # LDN 0
+        compiled.store[2] = b(0, 32)        # JMP 0
+
+        compiled.instruction_cycles(100)
+        self.assertEqual(0, compiled.ci.to_int(), "Looping on the first two words")
+        self.assertEqual(1, compiled.compiled_blocks)
+
+        compiled.store[2] = b(STP, 32)
+
+        self.assertEqual(0, compiled.compiled_blocks, "The block has been forgotten")
+        compiled.clear_state()
+        self.assertEqual(2, compiled.instruction_cycles(100))
+        self.assertTrue(compiled.stop_flag)
+
+    def test_warm_up(self):
+        compiled = CompiledSsem()
+        compiled.warm_up_cycles = 100
+        compiled.store[1] = b(2 << 13, 32)  # LDN 0
+        compiled.store[2] = b(0, 32)        # JMP 0
+
+        self.assertEqual(60, compiled.instruction_cycles(60))
+        self.assertEqual(0, compiled.compiled_blocks, "Nothing compiled during the warm-up")
+        self.assertEqual(60, compiled.instruction_cycles(60))
+        self.assertEqual(1, compiled.compiled_blocks)
+        self.assertEqual(120, compiled.last_cycle)
+
+    def test_replaced_store(self):
+        compiled = CompiledSsem()
+        compiled.warm_up_cycles = 0
+        compiled.store[1] = b(STP, 32)
+        compiled.instruction_cycles(100)
+
+        compiled.clear_state()
+        compiled.store = IntStore(32, 32)
+        compiled.store[1] = b(2 << 13, 32)  # LDN 0
+        compiled.store[2] = b(STP, 32)
+
+        self.assertEqual(2, compiled.instruction_cycles(100))
+        self.assertEqual(2, compiled.ci.to_int())
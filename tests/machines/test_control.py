@@ -0,0 +1,95 @@
+from threading import Thread
+from time import process_time, sleep
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+
+
+class TestControl(TestCase):
+
+    def setUp(self):
+        # An empty store is an endless loop of JMP 0
+        self.machine = FastSsem()
+        self.machine.speed = 100000
+        self.thread = Thread(target=self.machine.start, kwargs={"stopped": True})
+        self.thread.start()
+        self.control = self.machine.control
+
+    def tearDown(self):
+        self.control.quit()
+        self.thread.join(1.0)
+
+    def test_step(self):
+        self.assertTrue(self.control.step(5).wait(1.0))
+
+        self.assertEqual(5, self.machine.last_cycle)
+        self.assertTrue(self.machine.stop_flag)
+
+    def test_run_stop(self):
+        self.control.run().wait(1.0)
+        sleep(0.05)
+        self.control.stop().wait(1.0)
+        cycles = self.machine.last_cycle
+        sleep(0.05)
+
+        self.assertGreater(cycles, 0)
+        self.assertEqual(cycles, self.machine.last_cycle, "Stopped machine does not execute")
+
+    def test_toggle(self):
+        self.control.toggle().wait(1.0)
+        self.assertFalse(self.machine.stop_flag)
+
+        self.control.toggle().wait(1.0)
+        self.assertTrue(self.machine.stop_flag)
+
+    def test_set_speed(self):
+        self.control.set_speed(42).wait(1.0)
+
+        self.assertEqual(42, self.machine.speed)
+
+    def test_reset(self):
+        self.machine.store[1] = b(2 << 13 | 1, 32)  # LDN 1
+        self.control.step(1).wait(1.0)
+        self.assertNotEqual(0, self.machine.a.to_int())
+        self.control.reset().wait(1.0)
+
+        self.assertEqual(0, self.machine.ci.to_int())
+        self.assertEqual(0, self.machine.a.to_int())
+
+    def test_quit(self):
+        self.control.quit().wait(1.0)
+        self.thread.join(1.0)
+
+        self.assertFalse(self.thread.is_alive())
+
+    def test_stopped_is_idle(self):
+        start = process_time()
+        sleep(0.2)
+
+        self.assertLess(process_time() - start, 0.05)
+
+    def test_stop_instruction(self):
+        machine = Ssem()
+        machine.store[1] = b(2 << 13, 32)  # LDN 0
+        machine.store[2] = b(7 << 13, 32)  # STP
+        thread = Thread(target=machine.start)
+        thread.start()
+        sleep(0.05)
+        machine.control.quit()
+        thread.join(1.0)
+
+        self.assertEqual(2, machine.last_cycle)
+        self.assertTrue(machine.stop_flag)
+
+    def test_step_back(self):
+        self.machine.store[1] = b(2 << 13 | 1, 32)  # LDN 1
+        self.machine.enable_history()
+        self.control.step(3).wait(1.0)
+
+        self.control.step_back(2).wait(1.0)
+
+        self.assertEqual(1, self.machine.last_cycle)
+        self.assertEqual(1, self.machine.ci.to_int())
+        self.assertTrue(self.machine.stop_flag)
@@ -0,0 +1,94 @@
+from pathlib import Path
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.core.intstore import IntStore
+from src.core.store import Store
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+
+
+SAMPLES = sorted(Path("samples/ssem").glob("**/*.asm")) + sorted(Path("samples/ssem").glob("**/*.snp"))
+
+
+class TestFastSsem(TestCase):
+
+    def setUp(self):
+        pass
+
+    def assertSameState(self, expected: Ssem, actual: FastSsem, message: str):
+        self.assertEqual(expected.ci, actual.ci, f"{message}: CI")
+        self.assertEqual(expected.a, actual.a, f"{message}: A")
+        self.assertEqual(expected.stop_flag, actual.stop_flag, f"{message}: stop flag")
+        self.assertEqual(expected.last_instruction, actual.last_instruction, f"{message}: last instruction")
+        self.assertEqual(expected.last_cycle, actual.last_cycle, f"{message}: cycles")
+        self.assertEqual(str(expected.store), str(actual.store), f"{message}: store")
+
+    def test_instruction_cycle(self):
+        for sample in SAMPLES:
+            reference = Ssem(file=sample)
+            fast = FastSsem(file=sample)
+
+            for cycle in range(300):
+                reference.stop_flag = fast.stop_flag = False
+                reference.instruction_cycle()
+                fast.instruction_cycle()
+
+                self.assertSameState(reference, fast, f"{sample.name}, cycle {cycle}")
+
+                if reference.stop_flag:
+                    break
+
+    def test_instruction_cycle_keeps_stop_flag(self):
+        fast = FastSsem()
+
+        fast.stop_flag = True
+        fast.instruction_cycle()
+
+        self.assertTrue(fast.stop_flag, "Stepping a stopped machine leaves it stopped")
+
+    def test_instruction_cycles(self):
+        for sample in SAMPLES:
+            reference = Ssem(file=sample)
+            fast = FastSsem(file=sample)
+
+            for count in (1, 7, 50, 2000):
+                self.assertEqual(
+                    reference.instruction_cycles(count),
+                    fast.instruction_cycles(count),
+                    f"{sample.name}, cycles performed"
+                )
+                self.assertSameState(reference, fast, f"{sample.name}, after {count} cycles")
+
+    def test_registers(self):
+        fast = FastSsem()
+
+        fast.ci = b(-3, 32)
+        fast.a = b("10100000000000000000000000000001")
+
+        self.assertEqual(b(-3, 32), fast.ci)
+        self.assertEqual(b("10100000000000000000000000000001"), fast.a)
+
+        fast.clear_state()
+
+        self.assertEqual(b(0, 32), fast.ci)
+        self.assertEqual(b(0, 32), fast.a)
+
+    def test_store(self):
+        fast = FastSsem()
+        self.assertIsInstance(fast.store, IntStore)
+
+        fast.store = IntStore(32, 32)
+
+        with self.assertRaises(TypeError):
+            fast.store = Store(32, 32)
+
+    def test_run(self):
+        for sample in SAMPLES:
+            reference = Ssem(file=sample).run(max_cycles=5000)
+            result = FastSsem(file=sample).run(max_cycles=5000)
+
+            self.assertEqual(reference.cycles, result.cycles, sample.name)
+            self.assertEqual(reference.stop_reason, result.stop_reason, sample.name)
+            self.assertEqual(reference.ci, result.ci, sample.name)
+            self.assertEqual(reference.a, result.a, sample.name)
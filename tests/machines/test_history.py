@@ -0,0 +1,132 @@
+from unittest import TestCase
+
+from src.machines.abstractmachine import MachineRuntimeError
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.history import History
+from src.machines.ssem import Ssem
+from tests.machines.test_ssem import self_modifying_program
+from tests.machines.test_trace import LargeStoreModel, large_store_program
+
+
+ENGINES = (Ssem, FastSsem, CompiledSsem)
+
+
+def reference_after(cycles: int, file: str = "samples/ssem/fibonacci.asm") -> Ssem:
+    """Reference machine after the given number of cycles"""
+    reference = Ssem(file=file)
+    reference.instruction_cycles(cycles)
+    return reference
+
+
+class TestHistory(TestCase):
+
+    def setUp(self):
+        pass
+
+    def assertSameState(self, expected: Ssem, actual: Ssem, message: str):
+        self.assertEqual(expected.last_cycle, actual.last_cycle, f"{message}: cycles")
+        self.assertEqual(expected.ci, actual.ci, f"{message}: CI")
+        self.assertEqual(expected.a, actual.a, f"{message}: A")
+        self.assertEqual(str(expected.store), str(actual.store), f"{message}: store")
+
+    def test_step_back(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            machine.enable_history()
+            machine.run()
+
+            self.assertEqual(1, machine.step_back())
+            self.assertSameState(reference_after(772), machine, cls.__name__)
+            self.assertEqual(reference_after(772).last_instruction, machine.last_instruction, cls.__name__)
+            self.assertTrue(machine.stop_flag)
+
+            self.assertEqual(100, machine.step_back(100))
+            self.assertSameState(reference_after(672), machine, cls.__name__)
+
+            self.assertEqual(672, machine.step_back(1000), "Stops at the beginning of the history")
+            self.assertSameState(reference_after(0), machine, cls.__name__)
+            self.assertEqual("", machine.last_instruction)
+
+    def test_goto_cycle(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            history = machine.enable_history(capacity=50, checkpoint_interval=100)
+            machine.run()
+
+            for cycle in (700, 750, 120, 99, 0, 500, 773, 400, 401):
+                machine.goto_cycle(cycle)
+                self.assertSameState(reference_after(cycle), machine, f"{cls.__name__}, cycle {cycle}")
+
+            self.assertLessEqual(len(history), 50, "Bounded log")
+
+    def test_out_of_history(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        machine.instruction_cycles(100)
+        machine.enable_history(capacity=10, checkpoint_interval=1000, max_checkpoints=1)
+        machine.instruction_cycles(100)
+
+        machine.goto_cycle(120)
+        self.assertSameState(reference_after(120), machine, "From the checkpoint taken when enabled")
+
+        with self.assertRaises(MachineRuntimeError):
+            machine.goto_cycle(99)
+
+        with self.assertRaises(MachineRuntimeError):
+            FastSsem().step_back()
+
+    def test_rewind_to_write(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        machine.enable_history()
+        machine.run()
+
+        cycle = machine.rewind_to_write(27)
+
+        self.assertSameState(reference_after(cycle), machine, "Before the write")
+        machine.instruction_cycle()
+        self.assertEqual("17 STO 27", machine.last_instruction)
+        self.assertEqual(1836311903, machine.store[27].to_int())
+        self.assertIsNone(machine.rewind_to_write(20), "Never written")
+
+    def test_self_modifying_code(self):
+        for cls in ENGINES:
+            machine = cls()
+            self_modifying_program(machine)
+            machine.enable_history()
+            machine.run()
+
+            machine.step_back(6)
+            machine.run()
+
+            expected = Ssem()
+            self_modifying_program(expected)
+            expected.run()
+            self.assertSameState(expected, machine, cls.__name__)
+
+    def test_history(self):
+        history = History(capacity=3)
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        machine.observe(history)
+
+        machine.instruction_cycles(5)
+
+        self.assertEqual(3, len(history))
+        self.assertEqual([5, 4, 3], [history.delta(back).cycle for back in range(3)])
+        self.assertEqual(31, history.delta().data, "05 STO 31")
+        self.assertIsNotNone(history.delta().overwritten)
+        self.assertIsNone(history.delta(1).overwritten)
+
+        with self.assertRaises(ValueError):
+            History(capacity=0)
+
+    def test_large_store(self):
+        for cls in ENGINES:
+            machine = cls(model=LargeStoreModel)
+            large_store_program(machine)
+            machine.enable_history()
+            machine.run()
+
+            self.assertEqual(131071, machine.history.delta(1).data, cls.__name__)
+            self.assertEqual(2, machine.step_back(2))
+            self.assertEqual(0, machine.store[131071].to_int(), "STO at 131071 undone")
+            self.assertEqual(1, machine.ci.to_int())
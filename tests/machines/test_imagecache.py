@@ -0,0 +1,129 @@
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.core.store import Store
+from src.machines.assembler import Assembler, AssemblerError
+from src.machines.imagecache import ImageCache
+from src.machines.ssemmodel import SsemModel
+
+
+class SmallModel(SsemModel):
+    word_count = 16
+
+
+class TestImageCache(TestCase):
+
+    def test_load_file(self):
+        with TemporaryDirectory() as directory:
+            cache = ImageCache(Path(directory) / "cache")
+            assembler = Assembler(SsemModel, cache=cache)
+            expected = Store(32, 32)
+            Assembler(SsemModel, cache=None).load_file(Path("samples/ssem/fibonacci.asm"), expected)
+
+            for _ in range(3):
+                store = Store(32, 32)
+                assembler.load_file(Path("samples/ssem/fibonacci.asm"), store)
+                self.assertEqual(expected.read(), store.read())
+            self.assertEqual((1, 2, 1), (cache.misses, cache.hits, cache.writes))
+
+            with patch.object(Assembler, "assemble") as assemble:
+                assembler.load_file(Path("samples/ssem/fibonacci.asm"), Store(32, 32))
+                assemble.assert_not_called()
+
+            # Same source for another geometry
+            small = Assembler(SmallModel, cache=cache)
+            with self.assertRaises(AssemblerError):
+                small.load_file(Path("samples/ssem/fibonacci.asm"), Store(32, 16))
+            self.assertEqual(1, cache.stats()["entries"], "Failed assemblies not cached")
+
+    def test_content_addressed(self):
+        with TemporaryDirectory() as directory:
+            cache = ImageCache(directory)
+            assembler = Assembler(SsemModel, cache=cache)
+            program = Path(directory) / "program.asm"
+
+            program.write_text("00 NUM 1\n")
+            store = Store(32, 32)
+            assembler.load_file(program, store)
+            self.assertEqual(1, store.read()[0])
+
+            program.write_text("00 NUM 2\n")
+            assembler.load_file(program, store)
+            self.assertEqual(2, store.read()[0], "New content, new entry")
+
+            copy = Path(directory) / "copy.asm"
+            copy.write_text("00 NUM 1\n")
+            assembler.load_file(copy, store)
+            self.assertEqual(1, store.read()[0])
+            self.assertEqual((2, 1), (cache.misses, cache.hits), "Same content, same entry")
+
+    def test_damaged_entry(self):
+        with TemporaryDirectory() as directory:
+            cache = ImageCache(directory)
+            key = cache.key(b"00 NUM 1\n", SsemModel)
+            cache.put(key, [1] + [0] * 31, 32)
+            self.assertEqual([1] + [0] * 31, cache.get(key, SsemModel))
+
+            (Path(directory) / f"{key}.img").write_bytes(b"\x01\x00")
+            self.assertIsNone(cache.get(key, SsemModel))
+            self.assertFalse((Path(directory) / f"{key}.img").exists())
+            self.assertEqual([], [path for path in os.listdir(directory) if path.endswith(".tmp")])
+
+    def test_eviction(self):
+        with TemporaryDirectory() as directory:
+            cache = ImageCache(directory, max_size=3 * 32 * 4)
+            keys = [cache.key(str(index).encode(), SsemModel) for index in range(4)]
+            for index, key in enumerate(keys[:3]):
+                cache.put(key, [index] * 32, 32)
+                os.utime(Path(directory) / f"{key}.img", ns=(index, index))
+
+            self.assertIsNotNone(cache.get(keys[0], SsemModel), "Now the most recently used")
+            cache.put(keys[3], [3] * 32, 32)
+
+            self.assertIsNone(cache.get(keys[1], SsemModel), "Least recently used evicted")
+            self.assertEqual([0] * 32, cache.get(keys[0], SsemModel))
+            self.assertEqual([3] * 32, cache.get(keys[3], SsemModel))
+            stats = cache.stats()
+            self.assertEqual((3, 3 * 32 * 4, 1, 4), (stats["entries"], stats["size"], stats["evictions"], stats["writes"]))
+            self.assertIn("hits: 3, misses: 1 (75.0% hits)", cache.report())
+
+            cache.clear()
+            self.assertEqual(0, cache.stats()["entries"])
+
+    def test_eviction_scans(self):
+        with TemporaryDirectory() as directory:
+            cache = ImageCache(directory, max_size=10 * 32 * 4)
+            with patch.object(ImageCache, "_entries", wraps=cache._entries) as entries:
+                for index in range(12):
+                    cache.put(cache.key(str(index).encode(), SsemModel), [index] * 32, 32)
+
+                self.assertEqual(3, entries.call_count, "Scanned on the first write, then once over the bound at each eviction")
+            self.assertEqual(10, cache.stats()["entries"])
+
+    def test_default(self):
+        with patch.dict(os.environ, {"SSEM_IMAGE_CACHE": ""}):
+            self.assertIsNone(ImageCache.default())
+            self.assertIsNone(Assembler(SsemModel).cache)
+        with patch.dict(os.environ, {"SSEM_IMAGE_CACHE": "/some/where"}):
+            self.assertEqual(Path("/some/where"), ImageCache.default().directory)
+            ImageCache.enable_user_cache()
+            self.assertEqual(Path("/some/where"), ImageCache.default().directory, "Still the one chosen")
+
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": "/home/cache"}):
+            del os.environ["SSEM_IMAGE_CACHE"]
+            self.assertIsNone(ImageCache.default(), "Only enabled on demand")
+            ImageCache.enable_user_cache()
+            self.assertEqual(Path("/home/cache/ssem/images"), ImageCache.default().directory)
+
+    def test_unwritable(self):
+        with TemporaryDirectory() as directory:
+            blocker = Path(directory) / "file"
+            blocker.write_text("")
+            cache = ImageCache(blocker / "cache")
+            store = Store(32, 32)
+            Assembler(SsemModel, cache=cache).load_file(Path("samples/ssem/fibonacci.asm"), store)
+            self.assertEqual(0, cache.writes, "Still loads without the cache")
+            self.assertNotEqual([0] * 32, store.read())
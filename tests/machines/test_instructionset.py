@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.machines.instructionset import InstructionSet, Operand
+from src.machines.ssemmodel import SsemModel
+
+
+class TestInstructionSet(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_tables(self):
+        instruction_set = InstructionSet(SsemModel)
+        Mnemonic = SsemModel.Mnemonic
+
+        self.assertEqual([Mnemonic.JMP, Mnemonic.JRP, Mnemonic.LDN, Mnemonic.STO, Mnemonic.SUB, Mnemonic.SUB2, Mnemonic.CMP, Mnemonic.STP],
+                         instruction_set.mnemonics)
+        self.assertEqual(["JMP", "JRP", "LDN", "STO", "SUB", "SUB", "CMP", "STP"], instruction_set.handlers)
+        self.assertEqual([Operand.ADDRESS] * 6 + [Operand.NONE] * 2, instruction_set.operands)
+        self.assertEqual(Operand.VALUE, instruction_set.kinds[Mnemonic.NUM])
+        self.assertNotIn(Mnemonic.NUM, instruction_set.opcodes)
+        self.assertEqual(6, instruction_set.opcodes[Mnemonic.CMP])
+        self.assertEqual(6 << 13, instruction_set.encodings[Mnemonic.CMP])
+        self.assertEqual(frozenset({2, 4, 5}), instruction_set.opcodes_of("LDN", "SUB"))
+
+    def test_encode_decode(self):
+        instruction_set = InstructionSet(SsemModel)
+
+        for mnemonic, opcode in instruction_set.opcodes.items():
+            for data in (0, 1, 31):
+                word = instruction_set.encode(mnemonic, data)
+                self.assertEqual((opcode, data), instruction_set.decode(word))
+                self.assertEqual(b(word, 32), b(mnemonic.value.to_unsigned_int() << 13 | data, 32))
+
+        self.assertEqual((7, 31), instruction_set.decode((1 << 32) - 1), "Other bits ignored")
+
+    def test_of(self):
+        class LargeModel(SsemModel):
+            word_count = 1 << 10
+            address_length = 10
+            opcode_start = 16
+
+        self.assertIs(InstructionSet.of(SsemModel), InstructionSet.of(SsemModel()), "Compiled once per model class")
+        large = InstructionSet.of(LargeModel)
+        self.assertIsNot(InstructionSet.of(SsemModel), large)
+        self.assertEqual((16, 1023), (large.opcode_start, large.address_mask))
+        self.assertEqual(3 << 16 | 1000, large.encode(LargeModel.Mnemonic.STO, 1000))
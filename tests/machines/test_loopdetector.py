@@ -0,0 +1,121 @@
+from unittest import TestCase, skipIf
+
+from src.core.bitarray import b
+from src.machines.abstractmachine import StopReason
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.loopdetector import Loop
+from src.machines.ssem import Ssem
+
+try:
+    from src.core.packedstore import PackedStore
+except ImportError:
+    PackedStore = None
+
+
+ENGINES = (Ssem, FastSsem, CompiledSsem)
+JMP = 0
+
+
+def stuck_fibonacci(cls) -> Ssem:
+    """Fibonacci program jumping back to the same instruction forever instead of stopping"""
+    machine = cls(file="samples/ssem/fibonacci.asm")
+    machine.store[8] = b(JMP << 13 | 25, 32)    # JMP 25
+    machine.store[25] = b(7, 32)
+    return machine
+
+
+def state(machine) -> tuple:
+    return machine.ci.to_int(), machine.a.to_int(), str(machine.store)
+
+
+class TestLoopDetector(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_tight_loop(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/tests/JMP1Test.snp")
+            result = machine.run(max_cycles=100000, detect_loops=True)
+
+            self.assertEqual(StopReason.LOOP, result.stop_reason, cls.__name__)
+            self.assertEqual(Loop(entry_cycle=0, entry_address=1, period=32), result.loop)
+            self.assertLess(result.cycles, 3 * 32, "Found within three periods")
+            self.assertIsNone(machine.loop_detector, "Only enabled for the run")
+            self.assertNotIn("instruction_cycles", vars(machine))
+
+    def test_entry_point(self):
+        for cls in ENGINES:
+            machine = stuck_fibonacci(cls)
+            result = machine.run(max_cycles=100000, detect_loops=True)
+
+            self.assertEqual(Loop(entry_cycle=772, entry_address=8, period=1), result.loop, cls.__name__)
+            self.assertIs(result.loop, machine.last_break)
+
+        machine = Ssem(file="samples/ssem/tests/LDN1Test.snp")
+        loop = machine.run(max_cycles=100000, detect_loops=True).loop
+        reference = Ssem(file="samples/ssem/tests/LDN1Test.snp")
+        states = [state(reference)]
+        for _ in range(loop.entry_cycle + loop.period):
+            reference.instruction_cycle()
+            states.append(state(reference))
+        self.assertEqual(states[loop.entry_cycle], states[loop.entry_cycle + loop.period])
+        self.assertNotEqual(states[loop.entry_cycle - 1], states[loop.entry_cycle - 1 + loop.period])
+        self.assertEqual(len(set(states[loop.entry_cycle:-1])), loop.period)
+
+    def test_no_loop(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            self.assertEqual(StopReason.STOP, machine.run(detect_loops=True).stop_reason, cls.__name__)
+
+            machine = cls(file="samples/ssem/tests/SUB1Test.snp")
+            result = machine.run(max_cycles=5000, detect_loops=True)
+            self.assertEqual(StopReason.BUDGET, result.stop_reason, "A changes on every turn")
+            self.assertIsNone(result.loop)
+
+    def test_enabled(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/tests/JMP1Test.snp")
+            detector = machine.enable_loop_detection()
+
+            self.assertEqual(StopReason.LOOP, machine.run(max_cycles=1000).stop_reason, cls.__name__)
+            self.assertIs(detector, machine.loop_detector)
+            self.assertEqual(StopReason.LOOP, machine.run(max_cycles=1000).stop_reason, "Detects it again")
+
+            machine.disable_loop_detection()
+            self.assertEqual(StopReason.BUDGET, machine.run(max_cycles=1000).stop_reason)
+
+    def test_outside_change(self):
+        for cls in ENGINES:
+            machine = stuck_fibonacci(cls)
+            machine.enable_loop_detection()
+            machine.run(max_cycles=500)
+            machine.store[25] = b(30, 32)   # JMP 25 now goes back to the beginning of the program
+            reference = Ssem()
+            reference.store.write(0, machine.store.read())
+            reference.ci, reference.a = machine.ci, machine.a
+
+            loop = machine.run(max_cycles=100000).loop
+            entry = loop.entry_cycle - 500
+            states = [state(reference)]
+            for _ in range(entry + loop.period):
+                reference.instruction_cycle()
+                states.append(state(reference))
+            self.assertEqual(states[entry], states[entry + loop.period], f"{cls.__name__}: detection restarted from the changed state")
+            self.assertNotEqual(states[entry - 1], states[entry - 1 + loop.period])
+
+    @skipIf(PackedStore is None, "NumPy is not installed")
+    def test_packed_store(self):
+        machine = stuck_fibonacci(Ssem)
+        machine.enable_loop_detection()
+        machine.run(max_cycles=100)
+
+        store = PackedStore(32, 32)
+        store.write(0, machine.store.read())
+        machine.store = store
+        result = machine.run(max_cycles=100000)
+        self.assertEqual(Loop(entry_cycle=772, entry_address=8, period=1), result.loop, "Detected on the new store")
+
+        machine.store[25] = b(30, 32)
+        self.assertEqual(StopReason.LOOP, machine.run(max_cycles=100000).stop_reason, "Writes to the new store restart the detection")
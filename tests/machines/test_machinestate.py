@@ -0,0 +1,81 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.machinestate import HEADER, pack_state, unpack_state
+from src.machines.ssem import Ssem
+
+
+ENGINES = (Ssem, FastSsem, CompiledSsem)
+
+
+class TestMachineState(TestCase):
+
+    def setUp(self):
+        pass
+
+    def running_machine(self, cls) -> Ssem:
+        """Machine stopped in the middle of the Fibonacci program"""
+        machine = cls(file="samples/ssem/fibonacci.asm")
+        machine.run(max_cycles=500)
+        machine.speed = 1234
+        return machine
+
+    def assertSameState(self, expected: Ssem, actual: Ssem, message: str):
+        self.assertEqual(expected.ci, actual.ci, f"{message}: CI")
+        self.assertEqual(expected.a, actual.a, f"{message}: A")
+        self.assertEqual(expected.last_cycle, actual.last_cycle, f"{message}: cycles")
+        self.assertEqual(expected.speed, actual.speed, f"{message}: speed")
+        self.assertEqual(str(expected.store), str(actual.store), f"{message}: store")
+
+    def test_pack(self):
+        for cls in ENGINES:
+            machine = self.running_machine(cls)
+            state = pack_state(machine)
+            self.assertEqual(HEADER.size + 32 * 4, len(state), "Compact")
+
+            for target in ENGINES:
+                restored = target()
+                unpack_state(restored, state)
+                self.assertSameState(machine, restored, f"{cls.__name__} to {target.__name__}")
+
+                machine_copy = self.running_machine(cls)
+                self.assertEqual(machine_copy.run().cycles, restored.run().cycles, "Resumes where it was saved")
+                self.assertSameState(machine_copy, restored, f"{cls.__name__} to {target.__name__}, after the run")
+
+    def test_files(self):
+        with TemporaryDirectory() as directory:
+            for cls in ENGINES:
+                for name in ("state.bin", "state.snp"):
+                    machine = self.running_machine(cls)
+                    file = Path(directory) / name
+                    machine.save_state(file)
+
+                    restored = cls()
+                    restored.load_state(file)
+                    self.assertSameState(machine, restored, f"{cls.__name__}, {name}")
+                    self.assertEqual("", restored.last_instruction)
+
+    def test_snp_program(self):
+        machine = FastSsem()
+        machine.a = b(5, 32)
+        machine.load_state("samples/ssem/tests/JMP1Test.snp")
+
+        self.assertEqual(0, machine.a.to_int(), "Missing registers are reset")
+        self.assertEqual(str(Ssem(file="samples/ssem/tests/JMP1Test.snp").store), str(machine.store))
+
+    def test_invalid(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        state = pack_state(machine)
+
+        for invalid in (b"", state[:10], state[:-4], b"X" + state[1:], state[:7] + bytes([2]) + state[8:]):
+            with self.assertRaises(ValueError):
+                unpack_state(FastSsem(), invalid)
+
+        header = HEADER.unpack_from(state)
+        other_model = HEADER.pack(*header[:2], 40, *header[3:]) + state[HEADER.size:]
+        with self.assertRaises(ValueError):
+            unpack_state(FastSsem(), other_model)
@@ -0,0 +1,108 @@
+from random import Random
+from unittest import TestCase
+
+from src.machines.abstractmachine import MachineRuntimeError
+from src.machines.acceleratedssem import AcceleratedSsem
+from src.machines.assembler import Assembler
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.models import MODELS, Manchester40Model, Ssem8kModel, get_model, model_variant, register_model
+from src.machines.specialization import specialized_cycles, specialized_source
+from src.machines.ssem import Ssem
+from src.machines.ssemmodel import SsemModel
+
+
+class CompilingSsem(CompiledSsem):
+    """CompiledSsem compiling from the first cycle, for short test programs"""
+    warm_up_cycles = 0
+
+
+ENGINES = (Ssem, FastSsem, CompiledSsem, CompilingSsem, AcceleratedSsem)
+
+
+def random_program(random: Random, model: type) -> list:
+    """Words of a random program, mostly instructions with any address that fits"""
+    modulus = 1 << model.word_length
+    return [
+        random.choice((0, 1, 2, 3, 4, 5, 6)) << model.opcode_start | random.randrange(1 << model.address_length) if random.random() < 0.6
+        else random.choice((0, 1, 2, 5, 30, -1, -3, random.randrange(modulus))) % modulus
+        for _ in range(model.word_count)
+    ]
+
+
+class TestModels(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_registry(self):
+        self.assertIs(SsemModel, get_model("ssem"))
+        self.assertIs(Ssem8kModel, get_model("ssem-8k"))
+        self.assertIs(Manchester40Model, get_model("manchester-40"))
+        with self.assertRaises(ValueError):
+            get_model("eniac")
+
+        model = model_variant("test-1k", word_count=1024, address_length=10)
+        self.assertIs(model, MODELS.pop("test-1k"))
+        self.assertTrue(issubclass(model, SsemModel))
+        self.assertEqual((1024, 10, 32), (model.word_count, model.address_length, model.word_length))
+
+        for attributes in ({"word_count": 64}, {"address_length": 14}, {"word_length": 15}, {"word_length": 65}):
+            with self.assertRaises(ValueError, msg=attributes):
+                register_model("test", type("Broken", (SsemModel,), attributes))
+        self.assertNotIn("test", MODELS)
+
+    def test_specialized(self):
+        self.assertIs(specialized_cycles(Ssem8kModel), FastSsem(model=Ssem8kModel)._specialized_cycles, "Generated once per model")
+        self.assertIsNot(specialized_cycles(SsemModel), specialized_cycles(Ssem8kModel))
+
+        source = specialized_source(Ssem8kModel)
+        self.assertIn("address = ci = (ci + 1) & 8191", source)
+        self.assertIn("data = word & 8191", source)
+        self.assertIn("elif opcode == 4 or opcode == 5:", source)
+        self.assertIn("a = -words[data] & 0xffffffffff", specialized_source(Manchester40Model))
+        self.assertIn("% 24", specialized_source(type("Odd", (SsemModel,), {"word_count": 24})))
+
+    def test_wide_words(self):
+        program = "00 NUM 0\n01 LDN 5\n02 SUB 6\n03 STO 7\n04 STP\n05 NUM 549755813887\n06 NUM -1\n"
+        for cls in ENGINES:
+            machine = cls(model=Manchester40Model)
+            machine.assembler.load_text(program, machine.store)
+            machine.run()
+
+            self.assertEqual(40, len(machine.a), cls.__name__)
+            self.assertEqual(-549755813886, machine.a.to_int(), "-(2^39 - 1) - (-1)")
+            self.assertEqual(machine.a, machine.store[7])
+
+    def test_large_store(self):
+        program = {1: "LDN 8000", 2: "STO 8191", 3: "JMP 8190", 8000: "NUM 5", 8190: "NUM 7999"}
+        text = "".join(f"{address:04d} {program.get(address, 'NUM 0')}\n" for address in range(8192))
+        assembler = Assembler(Ssem8kModel, cache=None)
+
+        for cls in ENGINES:
+            machine = cls(model=Ssem8kModel)
+            assembler.load_text(text, machine.store)
+            self.assertEqual(3, machine.instruction_cycles(3))
+
+            self.assertEqual(-5, machine.store[8191].to_int(), cls.__name__)
+            self.assertEqual(7999, machine.ci.to_int(), "Next instruction at 8000")
+            self.assertTrue(machine.instruction_cycle().startswith("8000 JMP 05"))
+
+    def test_engines_agree(self):
+        random = Random(25)
+        odd = type("Odd", (SsemModel,), {"word_count": 24})     # Some addresses out of the store
+        for model, programs in ((SsemModel, 40), (odd, 40), (Manchester40Model, 10), (Ssem8kModel, 3)):
+            for program in range(programs):
+                words = random_program(random, model)
+                states = []
+                for cls in ENGINES:
+                    machine = cls(model=model)
+                    machine.store.write(0, words)
+                    try:
+                        result = machine.run(max_cycles=2000)
+                    except Exception as ex:
+                        states.append((type(ex).__name__, machine.last_cycle, machine.ci.to_int(), machine.store.read()))
+                        continue
+                    states.append((result.cycles, result.ci, result.a, machine.store.read()))
+                self.assertEqual([states[0]] * len(ENGINES), states, f"{model.__name__}, program {program}")
+
@@ -0,0 +1,157 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.machines.fastssem import FastSsem
+from src.machines.pacer import Pacer
+
+
+class FakeClock:
+    """Clock only moving forward when waiting, or by a fixed duration per instruction"""
+
+    def __init__(self, instruction_duration: float = 0.0, oversleep: float = 0.0):
+        self.time = 0.0
+        self.instruction_duration = instruction_duration
+        self.oversleep = oversleep
+
+    def __call__(self) -> float:
+        return self.time
+
+    def wait(self, delay: float):
+        self.time += delay + self.oversleep
+
+
+class SlowMachine(FastSsem):
+    """Machine taking a fixed amount of time of the fake clock per instruction"""
+
+    def __init__(self, clock: FakeClock):
+        super().__init__()
+        self.clock = clock
+        self.stop_flag = False
+
+    def instruction_cycles(self, count: int) -> int:
+        self.clock.time += count * self.clock.instruction_duration
+        return super().instruction_cycles(count)
+
+
+class TestPacer(TestCase):
+
+    def setUp(self):
+        pass
+
+    def run_for(self, pacer: Pacer, clock: FakeClock, duration: float) -> int:
+        executed = 0
+        while clock.time < duration and not pacer.machine.stop_flag:
+            executed += pacer.step(wait=clock.wait)
+        return executed
+
+    def test_typical_speed(self):
+        clock = FakeClock()
+        machine = SlowMachine(clock)
+        pacer = Pacer(machine, clock=clock)
+
+        executed = self.run_for(pacer, clock, 10.0)
+
+        self.assertAlmostEqual(7000, executed, delta=7)
+        self.assertAlmostEqual(700, pacer.achieved, delta=7)
+        self.assertEqual(700, pacer.target)
+        self.assertEqual(0.0, pacer.jitter)
+
+    def test_low_speed(self):
+        clock = FakeClock()
+        machine = SlowMachine(clock)
+        machine.speed = 2
+        pacer = Pacer(machine, clock=clock)
+
+        executed = self.run_for(pacer, clock, 10.0)
+
+        self.assertAlmostEqual(20, executed, delta=1)
+
+    def test_changing_speed(self):
+        clock = FakeClock()
+        machine = SlowMachine(clock)
+        pacer = Pacer(machine, clock=clock)
+
+        executed = self.run_for(pacer, clock, 1.0)
+        machine.speed = 5000
+        executed += self.run_for(pacer, clock, 2.0)
+
+        self.assertAlmostEqual(5700, executed, delta=50)
+
+    def test_drift(self):
+        # Waking up late every time does not slow the machine down
+        clock = FakeClock(oversleep=0.003)
+        machine = SlowMachine(clock)
+        pacer = Pacer(machine, clock=clock)
+
+        executed = self.run_for(pacer, clock, 10.0)
+
+        self.assertAlmostEqual(7000, executed, delta=7)
+        self.assertAlmostEqual(0.0, pacer.jitter, delta=1e-9)
+
+    def test_jitter(self):
+        clock = FakeClock()
+        machine = SlowMachine(clock)
+        pacer = Pacer(machine, clock=clock)
+
+        oversleeps = [0.0, 0.002]
+        executed = 0
+        while clock.time < 1.0:
+            clock.oversleep = oversleeps[executed % 2]
+            executed += 1
+            pacer.step(wait=clock.wait)
+
+        self.assertAlmostEqual(0.001, pacer.jitter, delta=1e-4)
+
+    def test_turbo(self):
+        # The machine takes 1 µs per instruction, far from the 10 M instructions per second requested
+        clock = FakeClock(instruction_duration=1e-6)
+        machine = SlowMachine(clock)
+        machine.speed = 10000000
+        pacer = Pacer(machine, clock=clock)
+        waits = []
+
+        def wait(delay: float):
+            waits.append(delay)
+            clock.wait(delay)
+
+        executed = 0
+        batches = []
+        while clock.time < 1.0:
+            batches.append(pacer.step(wait=wait))
+            executed += batches[-1]
+
+        self.assertEqual(1, len(waits), "Only waits for the first slice")
+        self.assertGreater(executed, 980000)
+        self.assertLessEqual(max(batches), 20000, "Batches stay short")
+
+    def test_stop(self):
+        clock = FakeClock()
+        machine = SlowMachine(clock)
+        machine.speed = 100000
+        machine.store[1] = b(2 << 13, 32)  # LDN 0
+        machine.store[2] = b(7 << 13, 32)  # STP
+        pacer = Pacer(machine, clock=clock)
+
+        executed = self.run_for(pacer, clock, 1.0)
+
+        self.assertEqual(2, executed)
+        self.assertTrue(machine.stop_flag)
+
+    def test_reset(self):
+        clock = FakeClock()
+        machine = SlowMachine(clock)
+        pacer = Pacer(machine, clock=clock)
+        self.run_for(pacer, clock, 1.0)
+
+        pacer.reset()
+        clock.time += 10.0
+
+        self.assertEqual(0.0, pacer.achieved)
+        self.assertLessEqual(pacer.step(wait=clock.wait), 1, "Time spent stopped is not caught up")
+
+    def test_no_asyncio(self):
+        code = "import sys, src.machines.fastssem; print('asyncio' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual("False", output.strip(), "asyncio is only imported by the asynchronous runs")
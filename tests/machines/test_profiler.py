@@ -0,0 +1,119 @@
+import json
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.ssem import Ssem
+from src.machines.ssemmodel import SsemModel
+
+
+ENGINES = (Ssem, FastSsem, CompiledSsem)
+
+Mnemonic = SsemModel.Mnemonic
+
+
+def countdown_program(machine: Ssem):
+    """Count A up from -3 to 0, then stop"""
+    program = {
+        1: b(2 << 13 | 20, 32),     # LDN 20     A = -3
+        2: b(3 << 13 | 21, 32),     # STO 21
+        3: b(2 << 13 | 21, 32),     # LDN 21     loop: A = 3, 2, 1, 0
+        4: b(4 << 13 | 22, 32),     # SUB 22     A = 2, 1, 0, -1
+        5: b(3 << 13 | 23, 32),     # STO 23
+        6: b(2 << 13 | 23, 32),     # LDN 23     A = -2, -1, 0, 1
+        7: b(3 << 13 | 21, 32),     # STO 21
+        8: b(6 << 13, 32),          # CMP        skip the jump while A is negative
+        9: b(7 << 13, 32),          # STP
+        10: b(0 << 13 | 24, 32),    # JMP 24     back to 3
+        20: b(3, 32),
+        22: b(1, 32),
+        24: b(2, 32),
+    }
+    for address, word in program.items():
+        machine.store[address] = word
+
+
+class TestProfiler(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_counters(self):
+        for cls in ENGINES:
+            machine = cls()
+            countdown_program(machine)
+            profiler = machine.enable_profiling()
+
+            result = machine.run(max_cycles=1000)
+
+            self.assertEqual(result.cycles, profiler.cycles, cls.__name__)
+            self.assertEqual([0, 1, 1, 3, 3, 3, 3, 3, 3, 1, 2], profiler.executions[:11], cls.__name__)
+            self.assertEqual(2, profiler.cmp_taken[8], cls.__name__)
+            self.assertEqual(1, profiler.cmp_not_taken[8], cls.__name__)
+            self.assertEqual(3, profiler.reads[21], cls.__name__)
+            self.assertEqual(4, profiler.writes[21], cls.__name__)
+            self.assertEqual(3, profiler.writes[23], cls.__name__)
+            self.assertEqual(2, profiler.reads[24], cls.__name__)
+            self.assertEqual(7, profiler.mnemonics[Mnemonic.LDN], cls.__name__)
+            self.assertEqual(1, profiler.mnemonics[Mnemonic.STP], cls.__name__)
+
+    def test_same_results(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            machine.enable_profiling()
+
+            result = machine.run()
+
+            self.assertEqual(773, result.cycles, cls.__name__)
+            self.assertEqual(1836311903, machine.store[27].to_int(), cls.__name__)
+
+    def test_instruction_cycle(self):
+        for cls in ENGINES:
+            machine = cls()
+            countdown_program(machine)
+            profiler = machine.enable_profiling()
+
+            machine.stop_flag = True
+            machine.instruction_cycle()
+            machine.instruction_cycle()
+
+            self.assertEqual(2, profiler.cycles, cls.__name__)
+            self.assertTrue(machine.stop_flag, cls.__name__)
+
+    def test_reset(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        profiler = machine.enable_profiling()
+        machine.run()
+
+        profiler.reset()
+
+        self.assertEqual(0, profiler.cycles)
+        self.assertEqual(0, sum(profiler.reads))
+        self.assertEqual(0, profiler.mnemonics[Mnemonic.CMP])
+
+    def test_disable(self):
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            machine.enable_profiling()
+
+            machine.disable_profiling()
+
+            self.assertIsNone(machine.profiler)
+            self.assertNotIn("instruction_cycles", vars(machine), "Class methods are used again")
+            self.assertNotIn("instruction_cycle", vars(machine), "Class methods are used again")
+            self.assertEqual(773, machine.run().cycles)
+
+    def test_report(self):
+        machine = Ssem()
+        countdown_program(machine)
+        profiler = machine.enable_profiling()
+        machine.run()
+
+        counters = json.loads(profiler.to_json())
+        report = profiler.report()
+
+        self.assertEqual(profiler.executions, counters["executions"])
+        self.assertEqual(7, counters["mnemonics"]["LDN"])
+        self.assertIn(f"Cycles: {profiler.cycles}", report)
+        self.assertIn("   8         3   13.0%         0         0          2          1", report)
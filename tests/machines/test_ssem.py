@@ -0,0 +1,138 @@
+from unittest import TestCase
+
+from src.core.bitarray import b
+from src.core.store import Store
+from src.machines.abstractmachine import CycleBudgetExceeded, StopReason
+from src.machines.ssem import Ssem
+
+
+STP = 7 << 13
+"""Encoding of the STP instruction"""
+
+
+def self_modifying_program(ssem: Ssem):
+    """Write a program replacing its own first instruction with STP, then jumping back to it"""
+    program = {
+        1: b("00111000000000100000000000000000"),   # LDN 28
+        2: b("11011000000001100000000000000000"),   # STO 27
+        3: b("01111000000000100000000000000000"),   # LDN 30
+        4: b("10000000000001100000000000000000"),   # STO 1
+        5: b("11111000000000000000000000000000"),   # JMP 31
+        28: b(5, 32),
+        30: b(-STP, 32),
+        31: b(0, 32),
+    }
+    for address, word in program.items():
+        ssem.store[address] = word
+
+
+class TestSsem(TestCase):
+
+    def setUp(self):
+        pass
+
+    def run_until_stop(self, ssem: Ssem, max_cycles: int = 1000):
+        ssem.stop_flag = False
+        for _ in range(max_cycles):
+            ssem.instruction_cycle()
+            if ssem.stop_flag:
+                break
+
+    def test_decode_cache(self):
+        ssem = Ssem(file="samples/ssem/fibonacci.asm")
+
+        self.run_until_stop(ssem)
+
+        self.assertEqual(1836311903, ssem.store[27].to_int())
+        stats = ssem.decode_cache_stats
+        self.assertEqual(ssem.last_cycle, stats["hits"] + stats["misses"])
+        self.assertEqual(18, stats["misses"], "Only distinct executed addresses are decoded")
+
+    def test_decode_cache_self_modifying_code(self):
+        ssem = Ssem()
+        self_modifying_program(ssem)
+
+        self.run_until_stop(ssem)
+
+        self.assertEqual(6, ssem.last_cycle)
+        self.assertEqual(1, ssem.ci.to_int(), "Stopped on the rewritten instruction")
+        self.assertEqual(-5, ssem.store[27].to_int())
+        self.assertEqual({"hits": 0, "misses": 6}, ssem.decode_cache_stats)
+
+    def test_decode_cache_external_write(self):
+        ssem = Ssem()
+        ssem.store[1] = b(STP, 32)
+
+        self.run_until_stop(ssem)
+        self.assertEqual(1, ssem.ci.to_int())
+
+        ssem.clear_state()
+        ssem.store[1] = b(2 << 13, 32)  # LDN 0
+        ssem.store[2] = b(STP, 32)
+
+        self.run_until_stop(ssem)
+        self.assertEqual(2, ssem.ci.to_int(), "The new instruction has been executed")
+        self.assertEqual({"hits": 0, "misses": 3}, ssem.decode_cache_stats)
+
+        ssem.clear_state()
+
+        self.run_until_stop(ssem)
+        self.assertEqual(2, ssem.ci.to_int())
+        self.assertEqual({"hits": 2, "misses": 3}, ssem.decode_cache_stats)
+
+    def test_decode_cache_replaced_store(self):
+        ssem = Ssem()
+        ssem.store[1] = b(STP, 32)
+        self.run_until_stop(ssem)
+
+        ssem.clear_state()
+        ssem.store = Store(ssem.model.word_length, ssem.model.word_count)
+        ssem.store[1] = b(2 << 13, 32)  # LDN 0
+        ssem.store[2] = b(STP, 32)
+
+        self.run_until_stop(ssem)
+        self.assertEqual(2, ssem.ci.to_int())
+
+    def test_run(self):
+        ssem = Ssem(file="samples/ssem/fibonacci.asm")
+
+        result = ssem.run()
+
+        self.assertEqual(StopReason.STOP, result.stop_reason)
+        self.assertEqual(773, result.cycles)
+        self.assertEqual(8, result.ci)
+        self.assertEqual(0, result.a)
+        self.assertGreater(result.wall_time, 0)
+        self.assertGreater(result.ips, 0)
+        self.assertEqual(1836311903, ssem.store[27].to_int())
+        self.assertTrue(ssem.stop_flag)
+
+    def test_run_budget(self):
+        ssem = Ssem(file="samples/ssem/fibonacci.asm")
+
+        result = ssem.run(max_cycles=100)
+
+        self.assertEqual(StopReason.BUDGET, result.stop_reason)
+        self.assertEqual(100, result.cycles)
+        self.assertEqual(100, ssem.last_cycle)
+
+        result = ssem.run(max_cycles=1000)
+
+        self.assertEqual(StopReason.STOP, result.stop_reason)
+        self.assertEqual(673, result.cycles, "The second run resumes the first one")
+
+        with self.assertRaises(CycleBudgetExceeded) as context:
+            Ssem(file="samples/ssem/fibonacci.asm").run(max_cycles=10, strict=True)
+        self.assertEqual(10, context.exception.result.cycles)
+
+    def test_run_through_stop(self):
+        ssem = Ssem()
+        ssem.store[1] = b(STP, 32)
+
+        result = ssem.run(max_cycles=100, until_stop=False)
+
+        self.assertEqual(StopReason.BUDGET, result.stop_reason)
+        self.assertEqual(100, result.cycles)
+
+        with self.assertRaises(ValueError):
+            ssem.run(until_stop=False)
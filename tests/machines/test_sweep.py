@@ -0,0 +1,82 @@
+import csv
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipIf
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.core.bitarray import b
+from src.machines.abstractmachine import StopReason
+from src.machines.compiledssem import CompiledSsem
+from src.machines.ssem import Ssem
+from src.machines.sweep import sweep
+
+
+PROGRAM = "samples/ssem/fibonacci.asm"
+
+
+class TestSweep(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_sweep(self):
+        result = sweep(PROGRAM, {29: range(1, 11), 28: (0, 1)}, max_cycles=100, workers=2, chunk_size=3)
+
+        self.assertEqual((29, 28), result.addresses)
+        self.assertEqual(20, len(result))
+        for run, (limit, previous) in enumerate(result.parameters):
+            reference = Ssem(file=PROGRAM)
+            reference.store[29] = b(limit, 32)
+            reference.store[28] = b(previous, 32)
+            expected = reference.run(max_cycles=100)
+
+            message = f"29={limit}, 28={previous}"
+            self.assertEqual(expected.cycles, result.cycles[run], message)
+            self.assertEqual(expected.stop_reason, result.stop_reason(run), message)
+            self.assertEqual(expected.ci, result.ci[run], message)
+            self.assertEqual(expected.a, result.a[run], message)
+            self.assertEqual([reference.store[address].to_int() for address in range(32)], result.store(run), message)
+
+        self.assertEqual((1, 0), result.parameters[0])
+        self.assertEqual((1, 1), result.parameters[1], "Last address varies first")
+        self.assertEqual(StopReason.BUDGET, result.stop_reason(19))
+
+    def test_engine(self):
+        result = sweep(PROGRAM, {29: [46]}, max_cycles=1000, engine=CompiledSsem, workers=1)
+
+        self.assertEqual(773, result.cycles[0])
+        self.assertEqual(1836311903, result.store(0)[27])
+
+    def test_to_csv(self):
+        result = sweep(PROGRAM, {29: [1, 46]}, max_cycles=1000, workers=1)
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "results.csv"
+            result.to_csv(path)
+            with open(path, newline="") as file:
+                rows = list(csv.DictReader(file))
+
+        self.assertEqual(2, len(rows))
+        self.assertEqual("46", rows[1]["patch_29"])
+        self.assertEqual("773", rows[1]["cycles"])
+        self.assertEqual("stop", rows[1]["stop_reason"])
+        self.assertEqual("1836311903", rows[1]["word_27"])
+
+    @skipIf(np is None, "NumPy is not installed")
+    def test_to_npz(self):
+        result = sweep(PROGRAM, {29: range(1, 47)}, max_cycles=1000, workers=2)
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "results.npz"
+            result.to_npz(path)
+            with np.load(path) as archive:
+                self.assertEqual([29], archive["addresses"].tolist())
+                self.assertEqual((46, 1), archive["parameters"].shape)
+                self.assertEqual((46, 32), archive["store"].shape)
+                self.assertEqual(1836311903, archive["store"][45, 27])
+                self.assertTrue(archive["stopped"].all())
+                self.assertEqual(list(result.cycles), archive["cycles"].tolist())
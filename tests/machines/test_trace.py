@@ -0,0 +1,159 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src.machines.compiledssem import CompiledSsem
+from src.machines.fastssem import FastSsem
+from src.machines.instructionset import InstructionSet
+from src.machines.ssem import Ssem
+from src.machines.ssemmodel import SsemModel
+from src.machines.trace import Trace, TraceReader
+
+
+class LargeStoreModel(SsemModel):
+    """Store too large for 16-bit addresses"""
+
+    word_count = 1 << 17
+
+    address_length = 17
+
+    opcode_start = 17
+
+
+def large_store_program(machine):
+    """Load a program reading and writing words above 65535 in a LargeStoreModel machine"""
+    encode = InstructionSet.of(LargeStoreModel).encode
+    Mnemonic = LargeStoreModel.Mnemonic
+    machine.store.write(0, [0, encode(Mnemonic.LDN, 100000), encode(Mnemonic.STO, 131071), encode(Mnemonic.STP)])
+    machine.store.write(100000, [5])
+
+
+ENGINES = (Ssem, FastSsem, CompiledSsem)
+
+
+def executed_instructions(file: str, cycles: int) -> tuple:
+    """Last instruction and A after each cycle of the reference machine"""
+    reference = Ssem(file=file)
+    instructions = []
+    for _ in range(cycles):
+        reference.stop_flag = False
+        reference.instruction_cycle()
+        instructions.append((reference.last_instruction, reference.a.to_unsigned_int()))
+        if reference.stop_flag:
+            break
+    return instructions
+
+
+class TestTrace(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_records(self):
+        expected = executed_instructions("samples/ssem/fibonacci.asm", 1000)
+
+        for cls in ENGINES:
+            machine = cls(file="samples/ssem/fibonacci.asm")
+            trace = machine.enable_trace(capacity=1000)
+
+            machine.run()
+
+            self.assertEqual(773, trace.count, cls.__name__)
+            self.assertEqual([line for line, _ in expected], list(trace.lines()), cls.__name__)
+            self.assertEqual([a for _, a in expected], [record.a for record in trace], cls.__name__)
+
+    def test_ring_buffer(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        trace = machine.enable_trace(capacity=10)
+
+        machine.run()
+
+        self.assertEqual(773, trace.count)
+        self.assertEqual(10, len(trace))
+        records = list(trace)
+        self.assertEqual(list(range(763, 773)), [record.index for record in records])
+        self.assertEqual("08 STP 00", trace.format(records[-1]))
+        self.assertEqual(machine.last_instruction, trace.format(records[-1]))
+
+        with self.assertRaises(ValueError):
+            Trace(machine.model, capacity=0)
+
+    def test_batches(self):
+        for cls in ENGINES:
+            with TemporaryDirectory() as directory:
+                traces = []
+                for batched in (True, False):
+                    machine = cls(file="samples/ssem/fibonacci.asm")
+                    machine.observed_batch_size = 7
+                    trace = machine.enable_trace(capacity=10, file=Path(directory) / f"{batched}.trace")
+                    if not batched:
+                        machine.enable_profiling()
+                    machine.run()
+                    machine.disable_trace()
+                    traces.append((trace.count, list(trace), list(TraceReader(Path(directory) / f"{batched}.trace"))))
+
+            self.assertEqual(traces[1], traces[0], f"{cls.__name__}, in batches or cycle by cycle")
+            self.assertEqual(773, len(traces[0][2]))
+
+    def test_written(self):
+        machine = Ssem(file="samples/ssem/fibonacci.asm")
+        trace = machine.enable_trace()
+
+        machine.instruction_cycles(3)
+
+        first, _, store = list(trace)
+        self.assertIsNone(trace.written(first))
+        self.assertEqual((31, store.a), trace.written(store))
+        self.assertEqual(machine.store[31].to_unsigned_int(), store.a)
+        self.assertEqual(machine.model.Mnemonic.STO, trace.mnemonic(store))
+
+    def test_file(self):
+        expected = executed_instructions("samples/ssem/fibonacci.asm", 1000)
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "fibonacci.trace"
+            machine = CompiledSsem(file="samples/ssem/fibonacci.asm")
+            trace = machine.enable_trace(capacity=1, file=path)
+            trace.flush_size = 100
+            machine.run()
+            machine.disable_trace()
+
+            reader = TraceReader(path)
+            reader.chunk_size = 64
+
+            self.assertEqual(32, reader.word_length)
+            self.assertEqual([line for line, _ in expected], list(reader.lines()))
+            self.assertEqual(list(range(773)), [record.index for record in reader])
+
+            path.write_bytes(b"not a trace")
+            with self.assertRaises(ValueError):
+                TraceReader(path)
+
+    def test_disable(self):
+        machine = FastSsem(file="samples/ssem/fibonacci.asm")
+        trace = machine.enable_trace()
+        profiler = machine.enable_profiling()
+        machine.instruction_cycles(10)
+
+        machine.disable_trace()
+        machine.instruction_cycles(10)
+
+        self.assertIsNone(machine.trace)
+        self.assertEqual(10, trace.count)
+        self.assertEqual(20, profiler.cycles, "Other observers carry on")
+
+        machine.disable_profiling()
+        self.assertNotIn("instruction_cycles", vars(machine), "Class methods are used again")
+
+    def test_large_store(self):
+        for cls in ENGINES:
+            machine = cls(model=LargeStoreModel)
+            large_store_program(machine)
+            trace = machine.enable_trace()
+            machine.run()
+
+            self.assertEqual([(1, 100000), (2, 131071), (3, 0)], [(record.address, record.data) for record in trace], cls.__name__)
+            self.assertEqual((131071, 2 ** 32 - 5), trace.written(list(trace)[1]))
+
+        with TemporaryDirectory() as directory, self.assertRaises(ValueError):
+            Trace(LargeStoreModel, file=Path(directory) / "trace.bin")
@@ -0,0 +1,109 @@
+import random
+from pathlib import Path
+from unittest import TestCase, skipIf
+
+try:
+    import numpy as np
+    from src.machines.vectorssem import VectorSsem
+except ImportError:
+    np = None
+
+from src.core.bitarray import b
+from src.machines.ssem import Ssem
+
+
+SAMPLES = sorted(Path("samples/ssem").glob("**/*.asm")) + sorted(Path("samples/ssem").glob("**/*.snp"))
+
+
+@skipIf(np is None, "NumPy is not installed")
+class TestVectorSsem(TestCase):
+
+    def setUp(self):
+        pass
+
+    def assertSameLane(self, expected: Ssem, vector: "VectorSsem", lane: int, message: str):
+        self.assertEqual(expected.ci.to_int(), vector.ci[lane], f"{message}: CI")
+        self.assertEqual(expected.a.to_int(), vector.a[lane], f"{message}: A")
+        self.assertEqual(expected.stop_flag, vector.stopped[lane], f"{message}: stop flag")
+        self.assertEqual(expected.last_cycle, vector.cycles[lane], f"{message}: cycles")
+        self.assertEqual(
+            [expected.store[address].to_unsigned_int() for address in range(expected.store.word_count)],
+            vector.words[lane].tolist(),
+            f"{message}: store"
+        )
+
+    def test_samples(self):
+        for sample in SAMPLES:
+            reference = Ssem(file=sample)
+            vector = VectorSsem(3, file=sample)
+
+            for cycle in range(300):
+                if not reference.stop_flag or cycle == 0:
+                    reference.stop_flag = False
+                    reference.instruction_cycle()
+                vector.step()
+
+                for lane in range(3):
+                    self.assertSameLane(reference, vector, lane, f"{sample.name}, lane {lane}, cycle {cycle}")
+
+    def test_data_per_lane(self):
+        # Each lane computes a different element of the Fibonacci sequence
+        vector = VectorSsem(40, file="samples/ssem/fibonacci.asm")
+        vector.set_word(29, np.arange(1, 41))
+
+        vector.run(10000)
+
+        self.assertTrue(vector.stopped.all())
+        for lane in range(40):
+            reference = Ssem(file="samples/ssem/fibonacci.asm")
+            reference.store[29] = b(lane + 1, 32)
+            reference.run()
+            self.assertSameLane(reference, vector, lane, f"lane {lane}")
+
+    def test_random_programs(self):
+        lanes = 64
+        generator = random.Random(1948)
+        programs = [[generator.randrange(1 << 16) for _ in range(32)] for _ in range(lanes)]
+        references = []
+        for program in programs:
+            reference = Ssem()
+            for address, word in enumerate(program):
+                reference.store[address] = b(word, 32)
+            references.append(reference)
+        vector = VectorSsem(lanes)
+        vector.words[:] = np.array(programs, dtype=np.uint32)
+
+        for cycle in range(200):
+            for reference in references:
+                if reference.last_cycle == 0 or not reference.stop_flag:
+                    reference.stop_flag = False
+                    reference.instruction_cycle()
+            vector.step()
+
+            for lane, reference in enumerate(references):
+                self.assertSameLane(reference, vector, lane, f"lane {lane}, cycle {cycle}")
+
+    def test_run(self):
+        vector = VectorSsem(5, file="samples/ssem/fibonacci.asm")
+        vector.set_word(29, [1, 2, 3, 46, 1000])
+
+        executed = vector.run(1000)
+
+        self.assertEqual([False, False, False, False, True], (vector.cycles == 1000).tolist())
+        self.assertEqual([True, True, True, True, False], vector.stopped.tolist())
+        self.assertEqual(vector.cycles.sum(), executed)
+        self.assertEqual(1836311903, vector.words[3, 27])
+
+        self.assertEqual(0, VectorSsem(5).run(0))
+
+    def test_clear_state(self):
+        vector = VectorSsem(2, file="samples/ssem/fibonacci.asm")
+        vector.run(10000)
+
+        vector.clear_state()
+
+        self.assertEqual([0, 0], vector.ci.tolist())
+        self.assertEqual([0, 0], vector.a.tolist())
+        self.assertEqual([0, 0], vector.cycles.tolist())
+        self.assertFalse(vector.stopped.any())
+        self.assertEqual(2, vector.step())